@@ -1,7 +1,6 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+from estado import BufferSazonal
 
-def holt_winters_multiplicativo(series, L, alpha, beta, gamma, h):
+def holt_winters_multiplicativo(series, L, alpha, beta, gamma, h, guardar_historico=False):
     """
     Implementação do método Holt-Winters Multiplicativo do zero.
 
@@ -11,7 +10,8 @@ def holt_winters_multiplicativo(series, L, alpha, beta, gamma, h):
     :param beta: parâmetro de suavização para a tendência (0 < beta < 1)
     :param gamma: parâmetro de suavização para a sazonalidade (0 < gamma < 1)
     :param h: número de passos à frente para prever
-    :return: lista com os h valores previstos
+    :param guardar_historico: se True, também retorna a lista com todos os fatores sazonais calculados
+    :return: lista com os h valores previstos e lista de valores ajustados (e o histórico dos fatores, se pedido)
     """
     # 1. Verificação inicial
     if len(series) < L:
@@ -21,10 +21,9 @@ def holt_winters_multiplicativo(series, L, alpha, beta, gamma, h):
     nivel_anterior = sum(series[0:L]) / L
     tendencia_anterior = (sum(series[L:2*L]) - sum(series[0:L])) / L**2 if len(series) >= 2*L else (series[L-1] - series[0]) / (L-1)
     
-    fatores_sazonais = []
-    # Divide cada valor do primeiro ciclo pela média do ciclo para obter os fatores
-    for i in range(L):
-        fatores_sazonais.append(series[i] / nivel_anterior)
+    # Divide cada valor do primeiro ciclo pela média do ciclo para obter os fatores.
+    # Só os últimos L fatores são usados, então eles ficam em um buffer circular de tamanho fixo
+    fatores_sazonais = BufferSazonal([series[i] / nivel_anterior for i in range(L)], guardar_historico=guardar_historico)
     
     # Lista para armazenar os valores ajustados (para referência)
     ajustados = [] 
@@ -34,7 +33,7 @@ def holt_winters_multiplicativo(series, L, alpha, beta, gamma, h):
         valor_atual = series[t]
         
         # Último fator sazonal correspondente (do ciclo anterior)
-        fator_sazonal_anterior = fatores_sazonais[t-L]
+        fator_sazonal_anterior = fatores_sazonais.proximo()
 
         # Cálculo do Nível
         nivel_atual = alpha * (valor_atual / fator_sazonal_anterior) + (1 - alpha) * (nivel_anterior + tendencia_anterior)
@@ -45,8 +44,8 @@ def holt_winters_multiplicativo(series, L, alpha, beta, gamma, h):
         # Cálculo da Sazonalidade
         fator_sazonal_atual = gamma * (valor_atual / nivel_atual) + (1 - gamma) * fator_sazonal_anterior
         
-        # Adiciona o novo fator sazonal à lista
-        fatores_sazonais.append(fator_sazonal_atual)
+        # Substitui o fator usado pelo novo fator sazonal
+        fatores_sazonais.avancar(fator_sazonal_atual)
         
         # Atualiza as variáveis para a próxima iteração
         nivel_anterior = nivel_atual
@@ -58,63 +57,17 @@ def holt_winters_multiplicativo(series, L, alpha, beta, gamma, h):
     # 4. Previsão para h passos à frente
     previsao = []
     for i in range(h):
-        # O índice do fator sazonal é pego do último ciclo completo conhecido
-        indice_sazonal = len(series) - L + i
-        
-        valor_previsto = (nivel_anterior + (i + 1) * tendencia_anterior) * fatores_sazonais[indice_sazonal]
+        # O fator sazonal é pego do último ciclo completo conhecido; para h > L o ciclo se repete
+        valor_previsto = (nivel_anterior + (i + 1) * tendencia_anterior) * fatores_sazonais[i % L]
         previsao.append(valor_previsto)
         
+    if guardar_historico:
+        return previsao, ajustados, fatores_sazonais.historico
     return previsao, ajustados
 
 
 # --- SCRIPT PRINCIPAL ---
 
-
-dados_consumo_norte = [
-    # 2021
-    829320, 798266, 811549, 863586, 857418, 902817, 864643, 921609, 988246, 975713, 958134, 946016,
-    # 2022
-    878646, 829751, 886754, 860992, 899520, 899714, 923014, 995812, 1032570, 1044150, 982073, 989692, 
-    # 2023
-    908625, 864397, 948603, 986381, 999291, 1044383, 1036735, 1123220, 1186719, 1222328, 1235789, 1171554
-]
-
-dados_consumo_nordeste = [
-    # 2021
-    2763245, 2623494, 2731576, 2778757, 2541573, 2567474, 2478002, 2462687, 2660694, 2679149, 2668151, 2831641,
-    # 2022
-    2687342, 2575410, 2805342, 2628482, 2676007, 2469464, 2467219, 2492009, 2614394, 2653200, 2807406, 2839078, 
-    # 2023
-    2805490, 2778417, 2861484, 2795542, 2923572, 2711658, 2611503, 2703657, 2874947, 2899670, 3119037, 3097684
-]
-
-dados_consumo_sudeste = [
-    # 2021
-    6604401, 6235408, 6357289, 6390169, 5526107, 5549613, 5404190, 5472932, 5975072, 5758807, 5674137, 6024669,
-    # 2022
-    5992623, 6037501, 6641314, 6255459, 5701319, 5493254, 5538689, 5545784, 5694638, 5755198, 5951934, 6316138, 
-    # 2023
-    5855814, 6333221, 6529244, 6888977, 5936009, 5838541, 5751791, 5929765, 6212348, 6607791, 6880970, 7080334
-]
-
-dados_consumo_sul = [
-    # 2021
-    2273434, 2119585, 2205119, 2122892, 1881304, 1873584, 1964097, 1982015, 1836742, 1878103, 1945066, 2082091,
-    # 2022
-    2347818, 2348276, 2392262, 1963868, 1873783, 1994035, 1988103, 1948832, 1980822, 1936082, 2004807, 2202811, 
-    # 2023
-    2347985, 2605102, 2503873, 2354968, 2049470, 2064325, 2112131, 2062813, 2052123, 2210632, 2176246, 2446622
-]
-
-dados_consumo_centro_oeste = [
-    # 2021
-    1183630, 1099086, 1150854, 1203491, 1067692, 1119338, 1000703, 1010658, 1250428, 1260246, 1146710, 1214616,
-    # 2022
-    1157091, 1128228, 1194911, 1163440, 1126353, 1059951, 1058762, 1093208, 1182829, 1216586, 1203484, 1268871, 
-    # 2023
-    1152181, 1149605, 1223054, 1227059, 1170399, 1129768, 1071272, 1179502, 1318676, 1479546, 1529415, 1522554
-]
-
 # Parâmetros definidos pelo usuário
 ALPHA = 0.3
 BETA = 0.1
@@ -122,78 +75,31 @@ GAMMA = 0.2
 L = 12 # Ciclo sazonal de 12 meses
 H = 12 # Prever os próximos 12 meses (2024)
 
-# Chamar a função para obter a previsão de cada região
-previsao_2024_norte, _ = holt_winters_multiplicativo(dados_consumo_norte, L, ALPHA, BETA, GAMMA, H)
-
-previsao_2024_nordeste, _ = holt_winters_multiplicativo(dados_consumo_nordeste, L, ALPHA, BETA, GAMMA, H)
-
-previsao_2024_sudeste, _ = holt_winters_multiplicativo(dados_consumo_sudeste, L, ALPHA, BETA, GAMMA, H)
-
-previsao_2024_sul, _ = holt_winters_multiplicativo(dados_consumo_sul, L, ALPHA, BETA, GAMMA, H)
-
-previsao_2024_centro_oeste, _ = holt_winters_multiplicativo(dados_consumo_centro_oeste, L, ALPHA, BETA, GAMMA, H)
-
-# Exibir os resultados para cada região
-
-meses = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho", 
+meses = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho",
          "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
 
-#Norte 
-print("Resultados para região Norte")
-for i in range(len(previsao_2024_norte)):
-    print(f"{meses[i]} de 2024: {previsao_2024_norte[i]:.1f}")
-
-#Nordeste
-print("Resultados para região Nordeste")
-for i in range(len(previsao_2024_nordeste)):
-    print(f"{meses[i]} de 2024: {previsao_2024_nordeste[i]:.1f}")
-
-#Sudeste
-print("Resultados para região Sudeste")
-for i in range(len(previsao_2024_sudeste)):
-    print(f"{meses[i]} de 2024: {previsao_2024_sudeste[i]:.1f}")
-
-#Sul
-print("Resultados para região Sul")
-for i in range(len(previsao_2024_sul)):
-    print(f"{meses[i]} de 2024: {previsao_2024_sul[i]:.1f}")
-
-#Centro Oeste
-print("Resultados para região Centro Oeste")
-for i in range(len(previsao_2024_centro_oeste)):
-    print(f"{meses[i]} de 2024: {previsao_2024_centro_oeste[i]:.1f}")
-
-# --- Visualização ---
-
-# Criar a série histórica 
-indice_historico = pd.date_range(start='2020-01-01', periods=len(dados_consumo_norte), freq='MS')
-serie_historica = pd.Series(dados_consumo_norte, index=indice_historico)
-
-
-# 1. Pegar o último ponto da série histórica para ser o ponto de conexão
-ponto_de_conexao_indice = serie_historica.index[-1]
-ponto_de_conexao_valor = serie_historica.iloc[-1]
-ponto_de_conexao = pd.Series([ponto_de_conexao_valor], index=[ponto_de_conexao_indice])
-
-# 2. Criar a série de previsão 
-indice_previsao = pd.date_range(start='2023-01-01', periods=H, freq='MS')
-serie_previsao = pd.Series(previsao_2024_norte, index=indice_previsao)
+if __name__ == "__main__":
+    import os
 
-# 3. Concatenar o ponto de conexão com a série de previsão
-serie_previsao_continua = pd.concat([ponto_de_conexao, serie_previsao])
+    from dados_regionais import carregar_consumo_regional
+    from graficos import renderizar_graficos
 
-# Plotar os resultados
-plt.figure(figsize=(14, 7))
-plt.plot(serie_historica, label='Dados Históricos (2020-2022)', color='blue')
+    # Histórico 2021-2023 de cada região (dados/consumo_mensal.csv)
+    consumo = carregar_consumo_regional()
 
-# Plotar a nova série de previsão contínua
-plt.plot(serie_previsao_continua, label='Previsão Holt-Winters (2023)', linestyle='--', color='red')
+    # Chamar a função para obter a previsão de cada região e exibir os resultados
+    previsoes = []
+    for regiao, dados_consumo in consumo.items():
+        previsao_2024, _ = holt_winters_multiplicativo(list(dados_consumo), L, ALPHA, BETA, GAMMA, H)
+        previsoes.append(previsao_2024)
 
-plt.title('Previsão de Consumo de Energia com Holt-Winters (Visualização Contínua)')
-plt.xlabel('Ano')
-plt.ylabel('Consumo (Wh/mês)')
-plt.legend()
-plt.grid(axis='y', linestyle='--', alpha=0.7)
-plt.show()
+        print(f"Resultados para região {regiao}")
+        for i in range(len(previsao_2024)):
+            print(f"{meses[i]} de 2024: {previsao_2024[i]:.1f}")
 
-#Repetindo o processo para as outras regiões
\ No newline at end of file
+    # --- Visualização ---
+    # Um gráfico (histórico + previsão) por região, gravado em arquivo sem abrir janelas
+    pasta_graficos = os.path.join(os.path.dirname(os.path.abspath(__file__)), "graficos")
+    caminhos = renderizar_graficos(pasta_graficos, list(consumo), list(consumo.values()), previsoes,
+                                   inicio="2021-01", max_workers=1)
+    print(f"{len(caminhos)} gráficos gravados em {pasta_graficos}")
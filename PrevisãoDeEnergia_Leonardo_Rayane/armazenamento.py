@@ -0,0 +1,167 @@
+import json
+import os
+
+import numpy as np
+
+from carregamento import ColecaoSeries
+from holt_winters_lote import holt_winters_multiplicativo_lote
+from otimizacao import ajustar_parametros
+
+
+# Arquivos que compõem um armazém de séries em disco
+ARQUIVO_VALORES = "valores.bin"      # float64 contíguo com todas as séries, uma após a outra
+ARQUIVO_INICIOS = "inicios.npy"      # int64 (séries + 1): início de cada série em valores.bin
+ARQUIVO_MESES = "meses.npy"          # datetime64[M] com o mês de cada valor
+ARQUIVO_IDS = "ids.json"             # identificadores das séries, na ordem do armazém
+
+
+class EscritorArmazem:
+    """
+    Grava séries em um armazém em disco uma a uma, sem precisar ter todas na memória.
+
+    Uso::
+
+        with EscritorArmazem("pasta") as escritor:
+            for id_serie, valores, meses in fonte:
+                escritor.adicionar(id_serie, valores, meses)
+    """
+
+    def __init__(self, pasta):
+        self.pasta = pasta
+        os.makedirs(pasta, exist_ok=True)
+        self._valores = open(os.path.join(pasta, ARQUIVO_VALORES), "wb")
+        self._meses = []
+        self._inicios = [0]
+        self._ids = []
+
+    def adicionar(self, id_serie, valores, meses=None):
+        valores = np.ascontiguousarray(valores, dtype=np.float64)
+        self._valores.write(valores.tobytes())
+        self._inicios.append(self._inicios[-1] + len(valores))
+        self._ids.append(id_serie)
+        if meses is not None:
+            self._meses.append(np.asarray(meses, dtype="datetime64[M]"))
+
+    def fechar(self):
+        self._valores.close()
+        np.save(os.path.join(self.pasta, ARQUIVO_INICIOS), np.array(self._inicios, dtype=np.int64))
+        if self._meses:
+            np.save(os.path.join(self.pasta, ARQUIVO_MESES), np.concatenate(self._meses))
+        with open(os.path.join(self.pasta, ARQUIVO_IDS), "w", encoding="utf-8") as arquivo:
+            json.dump(self._ids, arquivo, ensure_ascii=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+
+def salvar_armazem(colecao, pasta):
+    """
+    Grava uma ``ColecaoSeries`` (por exemplo, vinda de ``carregar_series``) como armazém em disco.
+    """
+    with EscritorArmazem(pasta) as escritor:
+        for k, (id_serie, valores) in enumerate(colecao):
+            meses = None
+            if colecao.meses is not None:
+                meses = colecao.meses[colecao.inicios[k]:colecao.inicios[k + 1]]
+            escritor.adicionar(id_serie, valores, meses)
+
+
+def abrir_armazem(pasta):
+    """
+    Abre o armazém como uma ``ColecaoSeries`` cujos valores são um ``numpy.memmap``.
+
+    Nada é lido do disco até que uma série seja acessada; cada série continua sendo uma
+    visão sem cópia.
+    """
+    inicios = np.load(os.path.join(pasta, ARQUIVO_INICIOS), mmap_mode="r")
+    with open(os.path.join(pasta, ARQUIVO_IDS), encoding="utf-8") as arquivo:
+        ids = json.load(arquivo)
+
+    n_valores = int(inicios[-1])
+    if n_valores:
+        valores = np.memmap(os.path.join(pasta, ARQUIVO_VALORES), dtype=np.float64, mode="r", shape=(n_valores,))
+    else:
+        valores = np.empty(0)
+
+    caminho_meses = os.path.join(pasta, ARQUIVO_MESES)
+    meses = np.load(caminho_meses, mmap_mode="r") if os.path.exists(caminho_meses) else None
+    return ColecaoSeries(ids, inicios, valores, meses)
+
+
+def percorrer_blocos(pasta, tamanho_bloco=4096):
+    """
+    Percorre o armazém em blocos de séries consecutivas de mesmo comprimento.
+
+    Cada bloco é mapeado do disco separadamente (``numpy.memmap`` com deslocamento) e
+    liberado quando o próximo é pedido, de modo que a memória usada depende do tamanho do
+    bloco e não do tamanho do armazém.
+
+    :param pasta: pasta do armazém
+    :param tamanho_bloco: número máximo de séries por bloco
+    :return: gerador de tuplas (primeira, bloco), em que ``primeira`` é o índice da primeira
+        série do bloco e ``bloco`` é uma matriz (séries x tempo) somente leitura
+    """
+    inicios = np.load(os.path.join(pasta, ARQUIVO_INICIOS), mmap_mode="r")
+    caminho_valores = os.path.join(pasta, ARQUIVO_VALORES)
+    n_series = len(inicios) - 1
+    itemsize = np.dtype(np.float64).itemsize
+
+    primeira = 0
+    while primeira < n_series:
+        comprimento = int(inicios[primeira + 1] - inicios[primeira])
+        ultima = min(primeira + tamanho_bloco, n_series)
+        comprimentos = np.diff(inicios[primeira:ultima + 1])
+        diferentes = np.flatnonzero(comprimentos != comprimento)
+        if len(diferentes):
+            ultima = primeira + int(diferentes[0])
+
+        if comprimento:
+            bloco = np.memmap(caminho_valores, dtype=np.float64, mode="r",
+                              offset=int(inicios[primeira]) * itemsize, shape=(ultima - primeira, comprimento))
+        else:
+            bloco = np.empty((ultima - primeira, 0))
+        yield primeira, bloco
+        del bloco
+        primeira = ultima
+
+
+def prever_armazem(pasta, L, h, alpha=None, beta=None, gamma=None, metrica="sse",
+                   tamanho_bloco=4096, arquivo_saida=None):
+    """
+    Ajusta (se alpha, beta e gamma forem None) e prevê todas as séries do armazém, bloco a bloco.
+
+    :param pasta: pasta do armazém
+    :param L: comprimento do período sazonal
+    :param h: número de passos à frente para prever
+    :param alpha: parâmetros fixos (escalares) ou None para ajustar por série
+    :param beta: ver alpha
+    :param gamma: ver alpha
+    :param metrica: métrica usada no ajuste ("sse" ou "mape")
+    :param tamanho_bloco: número de séries processadas de cada vez
+    :param arquivo_saida: se informado, as previsões são gravadas nesse arquivo como um
+        ``numpy.memmap`` (séries x h) em vez de ficarem na memória
+    :return: matriz (séries x h) com as previsões, na ordem do armazém
+    """
+    inicios = np.load(os.path.join(pasta, ARQUIVO_INICIOS), mmap_mode="r")
+    n_series = len(inicios) - 1
+    if arquivo_saida is None:
+        previsao = np.empty((n_series, h))
+    else:
+        previsao = np.memmap(arquivo_saida, dtype=np.float64, mode="w+", shape=(n_series, h))
+
+    for primeira, bloco in percorrer_blocos(pasta, tamanho_bloco):
+        if alpha is None:
+            parametros = ajustar_parametros(bloco, L, metrica=metrica)
+            alpha_bloco, beta_bloco, gamma_bloco = parametros.alpha, parametros.beta, parametros.gamma
+        else:
+            alpha_bloco, beta_bloco, gamma_bloco = alpha, beta, gamma
+        previsao[primeira:primeira + bloco.shape[0]], _ = holt_winters_multiplicativo_lote(
+            bloco, L, alpha_bloco, beta_bloco, gamma_bloco, h
+        )
+
+    if arquivo_saida is not None:
+        previsao.flush()
+    return previsao
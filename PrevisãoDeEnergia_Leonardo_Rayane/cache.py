@@ -0,0 +1,297 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from holt_winters_lote import holt_winters_lote
+from instrumentacao import contar
+from otimizacao import ParametrosAjustados, ajustar_parametros, ajustar_parametros_e_estado, otimizar_estado_inicial
+
+
+# Muda sempre que a recursão ou o ajuste mudarem de forma a alterar os resultados, para que
+# entradas antigas deixem de ser encontradas (hw-2: valores ausentes e corte de picos na recursão)
+VERSAO_MODELO = "hw-2"
+
+TAMANHO_MAXIMO_PADRAO = 512 * 2**20
+
+# Limite de parâmetros por consulta do SQLite
+_CHAVES_POR_CONSULTA = 500
+
+
+def chave_serie(serie, **parametros):
+    """
+    Chave de conteúdo: hash dos bytes da série (float64) e dos parâmetros do modelo.
+
+    Duas chamadas com os mesmos valores e parâmetros geram a mesma chave, não importa de
+    onde a série veio; qualquer mudança em um único valor gera outra chave.
+
+    :param serie: valores da série
+    :param parametros: parâmetros que influenciam o resultado (L, h, alpha, inicializacao,
+        limite_huber, ...)
+    :return: chave hexadecimal
+    """
+    valores = np.ascontiguousarray(serie, dtype=np.float64)
+    resumo = hashlib.blake2b(valores.tobytes(), digest_size=16)
+    resumo.update(json.dumps([VERSAO_MODELO, len(valores), sorted(parametros.items())], default=repr).encode())
+    return resumo.hexdigest()
+
+
+class CachePrevisao:
+    """
+    Cache em disco (SQLite) de resultados indexados por ``chave_serie``.
+
+    Cada entrada guarda uma sequência de vetores float64 (ex: previsão, ajustados e
+    parâmetros). Ler uma entrada marca o seu último acesso; quando o total gravado passa de
+    ``tamanho_maximo`` bytes (ou de ``max_entradas``), as entradas usadas há mais tempo são
+    removidas (LRU). O número de entradas e o total de bytes ficam na tabela ``totais``,
+    mantida por gatilhos, então conferir os limites a cada gravação não percorre o cache.
+
+    Uso::
+
+        with CachePrevisao("previsoes.sqlite") as cache:
+            resultado = cache.obter(chave)
+            if resultado is None:
+                cache.guardar(chave, previsao, ajustados)
+    """
+
+    def __init__(self, caminho, tamanho_maximo=TAMANHO_MAXIMO_PADRAO, max_entradas=None):
+        self.caminho = caminho
+        self.tamanho_maximo = tamanho_maximo
+        self.max_entradas = max_entradas
+        pasta = os.path.dirname(os.path.abspath(caminho))
+        os.makedirs(pasta, exist_ok=True)
+        self._conexao = sqlite3.connect(caminho)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        # Sem isso o INSERT OR REPLACE não dispara o gatilho de remoção da linha substituída
+        self._conexao.execute("PRAGMA recursive_triggers=ON")
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS entradas ("
+            " chave TEXT PRIMARY KEY, comprimentos TEXT NOT NULL, valores BLOB NOT NULL,"
+            " tamanho INTEGER NOT NULL, ultimo_acesso INTEGER NOT NULL)"
+        )
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS entradas_acesso ON entradas (ultimo_acesso)")
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS totais ("
+            " id INTEGER PRIMARY KEY CHECK (id = 0), entradas INTEGER NOT NULL, tamanho INTEGER NOT NULL)"
+        )
+        # Arquivos criados antes da tabela de totais começam com a contagem atual
+        self._conexao.execute(
+            "INSERT OR IGNORE INTO totais SELECT 0, COUNT(*), COALESCE(SUM(tamanho), 0) FROM entradas"
+        )
+        self._conexao.execute(
+            "CREATE TRIGGER IF NOT EXISTS entradas_inserir AFTER INSERT ON entradas BEGIN"
+            " UPDATE totais SET entradas = entradas + 1, tamanho = tamanho + NEW.tamanho; END"
+        )
+        self._conexao.execute(
+            "CREATE TRIGGER IF NOT EXISTS entradas_remover AFTER DELETE ON entradas BEGIN"
+            " UPDATE totais SET entradas = entradas - 1, tamanho = tamanho - OLD.tamanho; END"
+        )
+        self._conexao.commit()
+
+    def _totais(self):
+        return self._conexao.execute("SELECT entradas, tamanho FROM totais").fetchone()
+
+    def __len__(self):
+        return self._totais()[0]
+
+    def __contains__(self, chave):
+        return self._conexao.execute("SELECT 1 FROM entradas WHERE chave = ?", (chave,)).fetchone() is not None
+
+    def tamanho(self):
+        """
+        Total de bytes guardados nos valores das entradas.
+        """
+        return self._totais()[1]
+
+    def obter(self, chave):
+        """
+        :return: lista de vetores guardada para a chave, ou None se não estiver no cache
+        """
+        return self.obter_varios([chave]).get(chave)
+
+    def obter_varios(self, chaves):
+        """
+        Busca várias chaves com poucas consultas ao banco.
+
+        :return: dicionário {chave: lista de vetores} só com as chaves encontradas
+        """
+        encontrados = {}
+        chaves = list(chaves)
+        for inicio in range(0, len(chaves), _CHAVES_POR_CONSULTA):
+            lote = chaves[inicio:inicio + _CHAVES_POR_CONSULTA]
+            marcadores = ",".join("?" * len(lote))
+            for chave, comprimentos, valores in self._conexao.execute(
+                f"SELECT chave, comprimentos, valores FROM entradas WHERE chave IN ({marcadores})", lote
+            ):
+                vetor = np.frombuffer(valores, dtype=np.float64)
+                encontrados[chave] = np.split(vetor, np.cumsum(json.loads(comprimentos))[:-1])
+
+        if encontrados:
+            agora = time.time_ns()
+            self._conexao.executemany("UPDATE entradas SET ultimo_acesso = ? WHERE chave = ?",
+                                      [(agora, chave) for chave in encontrados])
+            self._conexao.commit()
+        return encontrados
+
+    def guardar(self, chave, *vetores):
+        """
+        Grava (ou substitui) os vetores de uma chave.
+        """
+        self.guardar_varios([(chave, vetores)])
+
+    def guardar_varios(self, entradas):
+        """
+        Grava várias entradas em uma única transação e aplica os limites de tamanho.
+
+        :param entradas: sequência de pares (chave, sequência de vetores)
+        """
+        agora = time.time_ns()
+        linhas = []
+        for chave, vetores in entradas:
+            vetores = [np.ascontiguousarray(v, dtype=np.float64).ravel() for v in vetores]
+            valores = b"".join(v.tobytes() for v in vetores)
+            linhas.append((chave, json.dumps([len(v) for v in vetores]), valores, len(valores), agora))
+        self._conexao.executemany("INSERT OR REPLACE INTO entradas VALUES (?, ?, ?, ?, ?)", linhas)
+        self._conexao.commit()
+        self._remover_excedentes()
+
+    def _remover_excedentes(self):
+        # Dentro dos limites não há nada a ler; fora deles, só as entradas mais antigas que
+        # cobrem o excesso são percorridas (pelo índice de acesso) e removidas de uma vez
+        entradas, tamanho = self._totais()
+        remover_por_contagem = 0 if self.max_entradas is None else max(entradas - self.max_entradas, 0)
+        if remover_por_contagem == 0 and tamanho <= self.tamanho_maximo:
+            return
+
+        remover = 0
+        for (tamanho_entrada,) in self._conexao.execute(
+            "SELECT tamanho FROM entradas ORDER BY ultimo_acesso, rowid"
+        ):
+            if remover >= remover_por_contagem and tamanho <= self.tamanho_maximo:
+                break
+            remover += 1
+            tamanho -= tamanho_entrada
+        self._conexao.execute(
+            "DELETE FROM entradas WHERE chave IN (SELECT chave FROM entradas ORDER BY ultimo_acesso, rowid LIMIT ?)",
+            (remover,),
+        )
+        self._conexao.commit()
+
+    def limpar(self):
+        self._conexao.execute("DELETE FROM entradas")
+        self._conexao.commit()
+
+    def fechar(self):
+        self._conexao.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+
+def prever_com_cache(series, L, h, cache, alpha=None, beta=None, gamma=None, phi=1.0,
+                     sazonalidade="multiplicativa", metrica="sse", inicializacao="primeiro_ciclo",
+                     limite_huber=None):
+    """
+    Igual a ``otimizacao.ajustar_e_prever`` (ou a ``holt_winters_lote`` com parâmetros fixos),
+    mas só ajusta e prevê as séries cujo conteúdo ou parâmetros mudaram desde a última vez.
+
+    As séries que faltam no cache são processadas juntas em um único lote; as demais saem
+    direto do cache, sem ajuste. A estratégia de inicialização e o corte de picos fazem parte
+    da chave, assim como os valores ausentes (NaN) da série.
+
+    :param series: matriz (séries x tempo) ou uma única série
+    :param L: comprimento do período sazonal
+    :param h: número de passos à frente para prever
+    :param cache: ``CachePrevisao`` aberto
+    :param alpha: parâmetros fixos (escalar ou um por série) ou None para ajustar por série
+    :param beta: ver alpha
+    :param gamma: ver alpha
+    :param phi: amortecimento da tendência (escalar)
+    :param sazonalidade: "multiplicativa" ou "aditiva"
+    :param metrica: métrica usada no ajuste ("sse" ou "mape")
+    :param inicializacao: estratégia de ``inicializar_lote`` ou "otimizada" (estado ajustado
+        com ``otimizar_estado_inicial``)
+    :param limite_huber: corte dos desvios em número de escalas; None não corta
+    :return: tupla (previsao, ajustados, parametros), como em ``ajustar_e_prever``
+    """
+    dados = np.asarray(series, dtype=np.float64)
+    serie_unica = dados.ndim == 1
+    if serie_unica:
+        dados = dados[np.newaxis, :]
+    n_series, n = dados.shape
+
+    if not isinstance(inicializacao, str):
+        raise ValueError("O cache só aceita a inicialização como nome de estratégia.")
+    modelo = {"L": L, "h": h, "phi": float(phi), "sazonalidade": sazonalidade,
+              "inicializacao": inicializacao,
+              "limite_huber": None if limite_huber is None else float(limite_huber)}
+    if alpha is None:
+        modelo["ajuste"] = metrica
+        fixos = None
+    else:
+        fixos = np.stack([np.broadcast_to(np.asarray(p, dtype=np.float64), (n_series,)) for p in (alpha, beta, gamma)], axis=1)
+
+    chaves = []
+    for k in range(n_series):
+        parametros_serie = modelo if fixos is None else dict(modelo, parametros=fixos[k].tolist())
+        chaves.append(chave_serie(dados[k], **parametros_serie))
+
+    encontrados = cache.obter_varios(chaves)
+    faltando = np.array([k for k, chave in enumerate(chaves) if chave not in encontrados], dtype=np.intp)
+    contar("cache_acertos", n_series - len(faltando))
+    contar("cache_faltas", len(faltando))
+
+    previsao = np.empty((n_series, h))
+    ajustados = np.empty((n_series, n - L))
+    parametros = np.empty((n_series, 4))
+
+    if len(faltando):
+        bloco = dados[faltando]
+        estado = inicializacao
+        if fixos is None:
+            if inicializacao == "otimizada":
+                ajuste, estado = ajustar_parametros_e_estado(bloco, L, metrica=metrica, phi=phi,
+                                                             sazonalidade=sazonalidade, limite_huber=limite_huber)
+            else:
+                ajuste = ajustar_parametros(bloco, L, metrica=metrica, phi=phi, sazonalidade=sazonalidade,
+                                            inicializacao=inicializacao, limite_huber=limite_huber)
+            novos = np.column_stack([ajuste.alpha, ajuste.beta, ajuste.gamma, ajuste.erro])
+        else:
+            novos = np.column_stack([fixos[faltando], np.full(len(faltando), np.nan)])
+            if inicializacao == "otimizada":
+                estado = otimizar_estado_inicial(bloco, L, novos[:, 0], novos[:, 1], novos[:, 2], phi,
+                                                 sazonalidade, limite_huber=limite_huber)
+        previsao[faltando], ajustados[faltando] = holt_winters_lote(
+            bloco, L, novos[:, 0], novos[:, 1], novos[:, 2], h, phi=phi, sazonalidade=sazonalidade,
+            inicializacao=estado, limite_huber=limite_huber
+        )
+        parametros[faltando] = novos
+        cache.guardar_varios(
+            (chaves[k], (previsao[k], ajustados[k], parametros[k])) for k in faltando
+        )
+
+    for k, chave in enumerate(chaves):
+        if chave in encontrados:
+            previsao[k], ajustados[k], parametros[k] = encontrados[chave]
+
+    if serie_unica:
+        return previsao[0], ajustados[0], ParametrosAjustados(*(float(v) for v in parametros[0]))
+    return previsao, ajustados, ParametrosAjustados(*parametros.T)
+
+
+if __name__ == "__main__":
+    from dados_regionais import carregar_consumo_regional
+
+    consumo = carregar_consumo_regional()
+    with CachePrevisao(os.path.join(os.path.dirname(os.path.abspath(__file__)), "dados", "cache_previsoes.sqlite")) as cache:
+        for rodada in (1, 2):
+            inicio = time.perf_counter()
+            previsao, _, _ = prever_com_cache(list(consumo.values()), L=12, h=12, cache=cache)
+            print(f"Rodada {rodada}: {time.perf_counter() - inicio:.3f}s ({len(cache)} entradas no cache)")
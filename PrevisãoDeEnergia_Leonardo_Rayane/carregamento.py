@@ -0,0 +1,140 @@
+import os
+
+import numpy as np
+
+
+class ColecaoSeries:
+    """
+    Conjunto de séries guardado em formato colunar.
+
+    Todos os valores ficam em um único vetor contíguo (float64, ou float32 quando pedido no
+    carregamento), ordenado por série e por mês;
+    ``inicios[k]:inicios[k + 1]`` delimita a série ``ids[k]``. Acessar uma série devolve uma
+    visão desse vetor (sem cópia), pronta para ser passada às funções do Holt-Winters.
+    """
+
+    def __init__(self, ids, inicios, valores, meses=None):
+        self.ids = ids
+        self.inicios = inicios
+        self.valores = valores
+        self.meses = meses
+        self._posicao = {id_serie: k for k, id_serie in enumerate(ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, id_serie):
+        return id_serie in self._posicao
+
+    def __getitem__(self, id_serie):
+        k = self._posicao[id_serie]
+        return self.valores[self.inicios[k]:self.inicios[k + 1]]
+
+    def __iter__(self):
+        for k, id_serie in enumerate(self.ids):
+            yield id_serie, self.valores[self.inicios[k]:self.inicios[k + 1]]
+
+    def comprimentos(self):
+        """
+        Vetor com o número de observações de cada série.
+        """
+        return np.diff(self.inicios)
+
+    def meses_da_serie(self, id_serie):
+        """
+        Meses (datetime64[M]) correspondentes aos valores da série.
+        """
+        k = self._posicao[id_serie]
+        return self.meses[self.inicios[k]:self.inicios[k + 1]]
+
+    def matriz(self):
+        """
+        Visão (séries x tempo) dos valores, sem cópia. Exige que todas as séries tenham o
+        mesmo comprimento, como pede ``holt_winters_multiplicativo_lote``.
+        """
+        comprimentos = self.comprimentos()
+        if len(comprimentos) == 0:
+            return self.valores.reshape(0, 0)
+        if np.any(comprimentos != comprimentos[0]):
+            raise ValueError("As séries têm comprimentos diferentes; use prever_em_paralelo ou acesse cada série.")
+        return self.valores.reshape(len(comprimentos), comprimentos[0])
+
+    def como_dict(self):
+        """
+        Dicionário {id: visão da série}, na ordem das séries.
+        """
+        return dict(iter(self))
+
+
+def agrupar_series(codigos, ids, meses, valores, dtype=np.float64):
+    """
+    Ordena observações em formato longo por série e mês e monta a ``ColecaoSeries``.
+
+    :param codigos: vetor de inteiros com o índice (em ``ids``) da série de cada observação
+    :param ids: identificadores das séries, na ordem dos códigos
+    :param meses: vetor datetime64[M] com o mês de cada observação
+    :param valores: vetor com o valor de cada observação
+    :param dtype: tipo do vetor de valores: np.float64 (padrão) ou np.float32
+    :return: ColecaoSeries
+    """
+    codigos = np.asarray(codigos)
+    meses = np.asarray(meses, dtype="datetime64[M]")
+    valores = np.asarray(valores, dtype=dtype)
+
+    # Série e mês viram uma única chave inteira; a reordenação só é feita se os dados não
+    # vierem já ordenados por ela
+    if len(codigos):
+        mes_inteiro = meses.astype(np.int64)
+        primeiro_mes = mes_inteiro.min()
+        chave = codigos.astype(np.int64) * (mes_inteiro.max() - primeiro_mes + 1) + (mes_inteiro - primeiro_mes)
+        if not np.all(chave[1:] > chave[:-1]):
+            ordem = np.argsort(chave, kind="stable")
+            codigos, meses, valores = codigos[ordem], meses[ordem], valores[ordem]
+
+    fronteiras = np.flatnonzero(codigos[1:] != codigos[:-1]) + 1
+    inicios = np.concatenate(([0], fronteiras, [len(codigos)]))
+    ids_presentes = np.asarray(ids, dtype=object)[codigos[inicios[:-1]]] if len(codigos) else np.array([], dtype=object)
+
+    return ColecaoSeries(list(ids_presentes), inicios, np.ascontiguousarray(valores), meses)
+
+
+def carregar_series(caminho, coluna_serie="serie", coluna_mes="mes", coluna_valor="valor", formato=None,
+                    dtype=np.float64):
+    """
+    Lê um arquivo CSV ou Parquet em formato longo (série, mês, valor) e agrupa por série.
+
+    A leitura é feita pelo leitor colunar do pandas (sem laço em Python sobre as linhas) e
+    os valores ficam em um único vetor contíguo. Com ``dtype=np.float32`` o vetor ocupa metade
+    da memória e as séries já saem no tipo usado por ``holt_winters_lote(..., dtype=np.float32)``.
+
+    :param caminho: caminho do arquivo
+    :param coluna_serie: nome da coluna com o identificador da série
+    :param coluna_mes: nome da coluna com o mês (ex: "2021-01" ou uma data)
+    :param coluna_valor: nome da coluna com o valor observado
+    :param formato: "csv" ou "parquet"; por padrão é deduzido da extensão do arquivo
+    :param dtype: tipo dos valores: np.float64 (padrão) ou np.float32
+    :return: ColecaoSeries
+    """
+    import pandas as pd
+
+    if formato is None:
+        extensao = os.path.splitext(caminho)[1].lower()
+        formato = "parquet" if extensao in (".parquet", ".pq") else "csv"
+
+    colunas = [coluna_serie, coluna_mes, coluna_valor]
+    if formato == "parquet":
+        tabela = pd.read_parquet(caminho, columns=colunas)
+    elif formato == "csv":
+        opcoes = {}
+        try:
+            import pyarrow  # noqa: F401
+            opcoes["engine"] = "pyarrow"
+        except ImportError:
+            pass
+        tabela = pd.read_csv(caminho, usecols=colunas, dtype={coluna_serie: str, coluna_valor: dtype}, **opcoes)
+    else:
+        raise ValueError(f"Formato desconhecido: {formato}. Use 'csv' ou 'parquet'.")
+
+    codigos, ids = pd.factorize(tabela[coluna_serie], sort=False)
+    meses = pd.to_datetime(tabela[coluna_mes]).to_numpy().astype("datetime64[M]")
+    return agrupar_series(codigos, ids, meses, tabela[coluna_valor].to_numpy(dtype=dtype), dtype)
@@ -0,0 +1,76 @@
+import os
+
+# Consumo residencial mensal de energia por região (MWh/mês).
+# Histórico de janeiro de 2021 a dezembro de 2023 (o mesmo usado em Holt_winters.py e nos
+# scripts de cada região) e valores reais de 2024 (os mesmos de Comparação.py).
+
+# O carregador (pandas) só é importado ao carregar os dados, para que importar as constantes
+# deste módulo seja barato
+PASTA_DADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dados")
+
+ARQUIVO_CONSUMO = os.path.join(PASTA_DADOS, "consumo_mensal.csv")
+ARQUIVO_CONSUMO_REAL_2024 = os.path.join(PASTA_DADOS, "consumo_real_2024.csv")
+
+
+def carregar_consumo_regional():
+    """
+    Histórico 2021-2023 como {região: série}, na ordem em que as regiões aparecem nos scripts.
+    """
+    from carregamento import carregar_series
+
+    return carregar_series(ARQUIVO_CONSUMO).como_dict()
+
+
+def carregar_consumo_real_2024():
+    """
+    Consumo real de 2024 como {região: série}, usado para comparar com as previsões.
+    """
+    from carregamento import carregar_series
+
+    return carregar_series(ARQUIVO_CONSUMO_REAL_2024).como_dict()
+
+
+def gerar_series_sinteticas(n_series, comprimento, L=12, semente=0):
+    """
+    Séries sintéticas com o perfil das cinco regiões, para testes de desempenho.
+
+    De cada região são estimados o nível, o crescimento por ciclo, o perfil sazonal (razão
+    entre cada mês e a média do seu ano) e o ruído em torno desse perfil. A série k segue o
+    perfil da região k % 5, com escala sorteada entre 0,5 e 2 vezes a original; para L
+    diferente de 12 o perfil sazonal é interpolado para L pontos por ciclo.
+
+    :param n_series: número de séries
+    :param comprimento: número de observações de cada série
+    :param L: comprimento do período sazonal das séries geradas
+    :param semente: semente do gerador aleatório
+    :return: matriz (séries x comprimento) float64, sempre positiva
+    """
+    import numpy as np
+
+    historico = np.array(list(carregar_consumo_regional().values()))
+    n_regioes = historico.shape[0]
+    anos = historico.reshape(n_regioes, -1, 12)
+    media_anual = anos.mean(axis=2)
+    perfil = (anos / media_anual[:, :, np.newaxis]).mean(axis=1)
+    ruido = (anos / media_anual[:, :, np.newaxis] - perfil[:, np.newaxis, :]).std(axis=(1, 2))
+    crescimento = (media_anual[:, -1] / media_anual[:, 0]) ** (1 / (anos.shape[1] - 1)) - 1
+
+    if L != 12:
+        posicoes = np.arange(L) * 12 / L
+        perfil = np.array([np.interp(posicoes, np.arange(13), np.r_[p, p[0]]) for p in perfil])
+        perfil /= perfil.mean(axis=1, keepdims=True)
+
+    gerador = np.random.default_rng(semente)
+    regiao = np.arange(n_series) % n_regioes
+    escala = gerador.uniform(0.5, 2.0, n_series) * media_anual[regiao, 0]
+    ciclos = np.arange(comprimento) / L
+
+    series = np.empty((n_series, comprimento))
+    for inicio in range(0, n_series, 4096):
+        fatia = slice(inicio, inicio + 4096)
+        r = regiao[fatia]
+        tendencia = (1 + crescimento[r, np.newaxis]) ** np.minimum(ciclos, 50)
+        sazonal = perfil[r][:, np.arange(comprimento) % L]
+        choque = 1 + ruido[r, np.newaxis] * gerador.standard_normal((len(r), comprimento))
+        series[fatia] = escala[fatia, np.newaxis] * tendencia * sazonal * np.maximum(choque, 0.1)
+    return series
@@ -0,0 +1,351 @@
+"""
+Medição de desempenho do motor de previsão.
+
+Cada caso mede uma operação (recursão/ajuste do estado, previsão, busca de parâmetros,
+backtest e métricas) para uma combinação de número de séries, comprimento, período sazonal
+e horizonte, com dados sintéticos gerados a partir das cinco regiões
+(``dados_regionais.gerar_series_sinteticas``). Para cada caso são informados o tempo
+(melhor de algumas repetições), a vazão em pontos por segundo e o pico de memória alocada
+(``tracemalloc``, medido em uma execução separada).
+
+Uso::
+
+    python desempenho.py                          # conjunto rápido
+    python desempenho.py --conjunto completo --json atual.json
+    python desempenho.py --json atual.json --comparar base.json   # aponta regressões
+    python desempenho.py --dtype float32          # mesmos casos em precisão simples
+    python desempenho.py --comparar-precisao      # float32 x float64 nas cinco regiões
+    python desempenho.py --servico                # pedidos por segundo do servico.py em localhost
+"""
+import argparse
+import asyncio
+import gc
+import json
+import multiprocessing
+import time
+import tracemalloc
+from collections import namedtuple
+
+import numpy as np
+
+import nucleo_jit
+from dados_regionais import gerar_series_sinteticas
+from holt_winters_lote import holt_winters_lote, inicializar_lote, prever_lote
+from metricas import calcular_metricas
+from otimizacao import ajustar_parametros
+from validacao import backtest
+
+
+Caso = namedtuple("Caso", ["operacao", "n_series", "comprimento", "L", "h"])
+
+# Operações medidas; cada uma recebe (dados, caso) e devolve quantos pontos processou
+OPERACOES = {}
+
+
+def _operacao(nome):
+    def registrar(funcao):
+        OPERACOES[nome] = funcao
+        return funcao
+    return registrar
+
+
+@_operacao("recursao")
+def _medir_recursao(dados, caso):
+    holt_winters_lote(dados, caso.L, 0.3, 0.1, 0.2, caso.h, dtype=dados.dtype)
+    return dados.size
+
+
+@_operacao("previsao")
+def _medir_previsao(dados, caso):
+    nivel, tendencia, fatores_sazonais = (c.astype(dados.dtype, copy=False) for c in inicializar_lote(dados, caso.L))
+    prever_lote(nivel, tendencia, fatores_sazonais, caso.h)
+    return caso.n_series * caso.h
+
+
+@_operacao("ajuste")
+def _medir_ajuste(dados, caso):
+    ajustar_parametros(dados, caso.L)
+    return dados.size
+
+
+@_operacao("backtest")
+def _medir_backtest(dados, caso):
+    backtest(dados, caso.L, caso.h, 0.3, 0.1, 0.2)
+    return dados.size
+
+
+@_operacao("metricas")
+def _medir_metricas(dados, caso):
+    previsto = dados[:, -caso.h:] * 1.01
+    calcular_metricas(previsto, dados[:, -caso.h:], historico=dados, L=caso.L, dtype=dados.dtype)
+    return caso.n_series * caso.h
+
+
+CONJUNTOS = {
+    "rapido": [
+        Caso("recursao", 1, 36, 12, 12),
+        Caso("recursao", 1000, 36, 12, 12),
+        Caso("recursao", 100000, 36, 12, 12),
+        Caso("recursao", 10, 100000, 12, 12),
+        Caso("recursao", 1000, 240, 24, 24),
+        Caso("recursao", 100, 168 * 8, 168, 168),
+        Caso("previsao", 100000, 36, 12, 12),
+        Caso("previsao", 100000, 36, 12, 120),
+        Caso("ajuste", 1, 36, 12, 12),
+        Caso("ajuste", 1000, 36, 12, 12),
+        Caso("ajuste", 100, 168 * 4, 168, 168),
+        Caso("backtest", 1000, 60, 12, 12),
+        Caso("backtest", 100, 240, 24, 24),
+        Caso("metricas", 100000, 36, 12, 12),
+        Caso("metricas", 1000, 1000, 12, 120),
+    ],
+    "completo": [
+        *(Caso("recursao", s, 36, 12, 12) for s in (1, 100, 10000, 100000)),
+        *(Caso("recursao", 100, n, 12, 12) for n in (36, 360, 3600, 36000, 100000)),
+        *(Caso("recursao", 1000, 10 * L, L, L) for L in (12, 24, 168)),
+        *(Caso("previsao", 100000, 36, 12, h) for h in (1, 12, 120, 1000)),
+        *(Caso("ajuste", s, 36, 12, 12) for s in (1, 100, 10000)),
+        *(Caso("ajuste", 100, 4 * L, L, L) for L in (12, 24, 168)),
+        Caso("ajuste", 10, 100000, 12, 12),
+        *(Caso("backtest", s, 120, 12, h) for s in (100, 10000) for h in (1, 12, 24)),
+        *(Caso("metricas", s, 36, 12, 12) for s in (1, 1000, 100000)),
+        *(Caso("metricas", 1000, 1200, 12, h) for h in (12, 120, 1000)),
+    ],
+}
+
+
+def medir_caso(caso, repeticoes=3, tempo_minimo=0.2, dtype=np.float64):
+    """
+    Mede um caso: melhor tempo entre as repetições, vazão e pico de memória.
+
+    Uma execução de aquecimento vem antes das medições (compilação do Numba, caches). As
+    repetições continuam até ``repeticoes`` execuções ou ``tempo_minimo`` segundos, o que
+    vier por último.
+
+    :param dtype: tipo dos dados sintéticos; recursão, previsão e métricas seguem esse tipo,
+        enquanto ajuste e backtest convertem para float64
+    :return: dicionário com o caso, ``dtype``, ``tempo`` (s), ``pontos_por_segundo`` e ``pico_mb``
+    """
+    dados = gerar_series_sinteticas(caso.n_series, caso.comprimento, caso.L).astype(dtype, copy=False)
+    operacao = OPERACOES[caso.operacao]
+    pontos = operacao(dados, caso)
+
+    tempos = []
+    inicio = time.perf_counter()
+    while len(tempos) < repeticoes or time.perf_counter() - inicio < tempo_minimo:
+        gc.collect()
+        t = time.perf_counter()
+        operacao(dados, caso)
+        tempos.append(time.perf_counter() - t)
+        if len(tempos) >= 100:
+            break
+
+    gc.collect()
+    tracemalloc.start()
+    operacao(dados, caso)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    melhor = min(tempos)
+    return dict(caso._asdict(), dtype=np.dtype(dtype).name, tempo=melhor, pontos_por_segundo=pontos / melhor,
+                pico_mb=pico / 2**20)
+
+
+def comparar(atuais, base, tolerancia=0.2):
+    """
+    Casos que ficaram mais lentos (ou usaram mais memória) que ``base`` além da tolerância.
+
+    :param atuais: resultados de ``medir_caso``
+    :param base: resultados de uma execução anterior (ex: lidos do JSON)
+    :param tolerancia: piora relativa aceita (0.2 = 20%)
+    :return: lista de tuplas (resultado, medida, razão atual / base)
+    """
+    def chave(resultado):
+        # Resultados gravados antes da opção --dtype são float64
+        return tuple(resultado[c] for c in Caso._fields) + (resultado.get("dtype", "float64"),)
+
+    anteriores = {chave(r): r for r in base}
+    regressoes = []
+    for resultado in atuais:
+        anterior = anteriores.get(chave(resultado))
+        if anterior is None:
+            continue
+        for medida in ("tempo", "pico_mb"):
+            if anterior[medida] > 0 and resultado[medida] / anterior[medida] > 1 + tolerancia:
+                regressoes.append((resultado, medida, resultado[medida] / anterior[medida]))
+    return regressoes
+
+
+def comparar_precisao(L=12, h=12):
+    """
+    Compara a previsão em float32 com a em float64 nas cinco regiões: parâmetros ajustados
+    (em float64) no histórico 2021-2023 e previsão de 2024 nas duas precisões, nos dois núcleos.
+
+    :return: lista de dicionários com a região, o núcleo, o MAPE contra o consumo real de 2024
+        em cada precisão e a maior diferença relativa entre as duas previsões
+    """
+    from dados_regionais import carregar_consumo_real_2024, carregar_consumo_regional
+
+    consumo = carregar_consumo_regional()
+    historico = np.array(list(consumo.values()))
+    reais = np.array(list(carregar_consumo_real_2024().values()))
+    parametros = ajustar_parametros(historico, L)
+
+    linhas = []
+    for usar_jit in (True, False) if nucleo_jit.JIT_DISPONIVEL else (False,):
+        previsoes = {
+            dtype: holt_winters_lote(historico, L, parametros.alpha, parametros.beta, parametros.gamma, h,
+                                     usar_jit=usar_jit, dtype=dtype)[0]
+            for dtype in (np.float64, np.float32)
+        }
+        mape = {dtype: calcular_metricas(previsao, reais, dtype=dtype)["mape"]
+                for dtype, previsao in previsoes.items()}
+        diferenca = np.abs(previsoes[np.float32] / previsoes[np.float64] - 1).max(axis=1)
+        for k, regiao in enumerate(consumo):
+            linhas.append({"regiao": regiao, "nucleo": "Numba" if usar_jit else "NumPy",
+                           "mape_float64": float(mape[np.float64][k]), "mape_float32": float(mape[np.float32][k]),
+                           "diferenca_maxima": float(diferenca[k])})
+    return linhas
+
+
+def _servir(fila):
+    # Processo filho: serviço HTTP em uma porta livre, informada ao processo pai pela fila
+    from servico import iniciar_servidor
+
+    async def executar():
+        servidor, _ = await iniciar_servidor("127.0.0.1", 0)
+        fila.put(servidor.sockets[0].getsockname()[1])
+        async with servidor:
+            await servidor.serve_forever()
+
+    asyncio.run(executar())
+
+
+async def _cliente(porta, corpos, manter_conexao, latencias):
+    # Envia os pedidos em sequência, por uma conexão persistente ou por uma conexão cada
+    conexao = None
+    for corpo in corpos:
+        t = time.perf_counter()
+        if conexao is None:
+            conexao = await asyncio.open_connection("127.0.0.1", porta)
+        leitor, escritor = conexao
+        escritor.write(f"POST /forecast HTTP/1.1\r\nContent-Length: {len(corpo)}\r\n"
+                       f"Connection: {'keep-alive' if manter_conexao else 'close'}\r\n\r\n".encode() + corpo)
+        cabecalho = await leitor.readuntil(b"\r\n\r\n")
+        if not cabecalho.startswith(b"HTTP/1.1 200"):
+            raise RuntimeError(f"Resposta inesperada do serviço: {cabecalho.splitlines()[0].decode()}")
+        tamanho = int(cabecalho.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+        await leitor.readexactly(tamanho)
+        if not manter_conexao:
+            escritor.close()
+            conexao = None
+        latencias.append(time.perf_counter() - t)
+    if conexao is not None:
+        conexao[1].close()
+
+
+def medir_servico(n_pedidos=5000, conexoes=64, manter_conexao=True, series_distintas=None, L=12):
+    """
+    Vazão do serviço HTTP (``servico.py``) em localhost com pedidos ``/forecast`` de uma série.
+
+    O serviço roda em um processo separado; ``conexoes`` clientes concorrentes enviam os
+    pedidos em sequência, cada um pela sua conexão. Com ``series_distintas`` menor que o número
+    de pedidos as séries se repetem e os pedidos repetidos saem do cache de estados do serviço.
+
+    :param n_pedidos: total de pedidos
+    :param conexoes: clientes concorrentes
+    :param manter_conexao: True usa conexões persistentes; False abre uma conexão por pedido
+    :param series_distintas: quantas séries diferentes são enviadas; None = uma por pedido
+    :return: dicionário com ``pedidos_por_segundo`` e as latências p50 e p99 (ms)
+    """
+    series = gerar_series_sinteticas(series_distintas or n_pedidos, 3 * L, L)
+    corpos = [json.dumps({"serie": series[k % len(series)].tolist(), "L": L, "alpha": 0.3, "beta": 0.1,
+                          "gamma": 0.2}).encode() for k in range(n_pedidos)]
+
+    fila = multiprocessing.Queue()
+    processo = multiprocessing.Process(target=_servir, args=(fila,), daemon=True)
+    processo.start()
+    try:
+        porta = fila.get(timeout=60)
+
+        async def executar():
+            # Aquecimento (importações, primeiro lote) fora da medição
+            await _cliente(porta, corpos[:1], False, [])
+            latencias = []
+            inicio = time.perf_counter()
+            await asyncio.gather(*(_cliente(porta, corpos[k::conexoes], manter_conexao, latencias)
+                                   for k in range(conexoes)))
+            return time.perf_counter() - inicio, latencias
+
+        tempo, latencias = asyncio.run(executar())
+    finally:
+        processo.terminate()
+        processo.join()
+
+    p50, p99 = np.percentile(latencias, [50, 99]) * 1000
+    return {"pedidos": n_pedidos, "conexoes": conexoes, "manter_conexao": manter_conexao,
+            "series_distintas": series_distintas or n_pedidos, "tempo": tempo,
+            "pedidos_por_segundo": n_pedidos / tempo, "latencia_p50_ms": p50, "latencia_p99_ms": p99}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede o desempenho do motor de previsão.")
+    parser.add_argument("--conjunto", choices=sorted(CONJUNTOS), default="rapido")
+    parser.add_argument("--operacao", choices=sorted(OPERACOES), action="append",
+                        help="mede só essas operações (pode ser repetido)")
+    parser.add_argument("--json", metavar="ARQUIVO", help="grava os resultados em JSON")
+    parser.add_argument("--comparar", metavar="ARQUIVO", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.2)
+    parser.add_argument("--dtype", choices=("float64", "float32"), default="float64",
+                        help="precisão dos dados em recursão, previsão e métricas")
+    parser.add_argument("--comparar-precisao", action="store_true",
+                        help="só compara as previsões float32 e float64 das cinco regiões")
+    parser.add_argument("--servico", action="store_true",
+                        help="só mede os pedidos por segundo do serviço HTTP em localhost")
+    parser.add_argument("--pedidos", type=int, default=5000, help="com --servico, total de pedidos")
+    args = parser.parse_args(argv)
+
+    if args.servico:
+        print(f"{'cenário':<34}{'pedidos/s':>11}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+        for nome, opcoes in (("conexão persistente, séries novas", {}),
+                             ("conexão persistente, do cache", {"series_distintas": 100}),
+                             ("uma conexão por pedido", {"manter_conexao": False})):
+            r = medir_servico(args.pedidos, **opcoes)
+            print(f"{nome:<34}{r['pedidos_por_segundo']:>11,.0f}{r['latencia_p50_ms']:>10.1f}"
+                  f"{r['latencia_p99_ms']:>10.1f}", flush=True)
+        return 0
+
+    if args.comparar_precisao:
+        print(f"{'região':<14}{'núcleo':<8}{'MAPE float64':>14}{'MAPE float32':>14}{'dif. máxima':>13}")
+        for linha in comparar_precisao():
+            print(f"{linha['regiao']:<14}{linha['nucleo']:<8}{linha['mape_float64']:>14.4%}"
+                  f"{linha['mape_float32']:>14.4%}{linha['diferenca_maxima']:>13.1e}")
+        return 0
+
+    casos = [c for c in CONJUNTOS[args.conjunto] if not args.operacao or c.operacao in args.operacao]
+    print(f"Núcleo: {'Numba' if nucleo_jit.JIT_DISPONIVEL else 'NumPy'}; dados em {args.dtype}")
+    print(f"{'operacao':<10}{'series':>8}{'compr.':>8}{'L':>5}{'h':>6}{'tempo (s)':>12}{'pontos/s':>14}{'pico (MB)':>11}")
+
+    resultados = []
+    for caso in casos:
+        r = medir_caso(caso, dtype=np.dtype(args.dtype))
+        resultados.append(r)
+        print(f"{caso.operacao:<10}{caso.n_series:>8}{caso.comprimento:>8}{caso.L:>5}{caso.h:>6}"
+              f"{r['tempo']:>12.4f}{r['pontos_por_segundo']:>14,.0f}{r['pico_mb']:>11.1f}", flush=True)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo:
+            json.dump(resultados, arquivo, indent=2)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            regressoes = comparar(resultados, json.load(arquivo), args.tolerancia)
+        for resultado, medida, razao in regressoes:
+            print(f"REGRESSÃO {resultado['operacao']} ({resultado['n_series']} x {resultado['comprimento']}, "
+                  f"L={resultado['L']}, h={resultado['h']}): {medida} {razao:.2f}x")
+        return 1 if regressoes else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
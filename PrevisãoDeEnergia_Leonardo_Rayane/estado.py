@@ -0,0 +1,193 @@
+import json
+from array import array
+
+
+class BufferSazonal:
+    """
+    Buffer circular de tamanho fixo com os últimos L fatores sazonais.
+
+    A recursão só lê o fator de L passos atrás, então basta guardar L valores: o fator lido
+    para a próxima observação é sobrescrito pelo fator novo e a posição avança. Os valores
+    ficam em um ``array`` de floats (sem um objeto Python por fator). O histórico de todos os
+    fatores calculados só é mantido quando ``guardar_historico`` é True.
+    """
+
+    __slots__ = ("L", "fatores", "posicao", "historico")
+
+    def __init__(self, fatores_iniciais, posicao=0, guardar_historico=False):
+        self.fatores = array("d", fatores_iniciais)
+        self.L = len(self.fatores)
+        self.posicao = posicao % self.L
+        self.historico = list(self.fatores) if guardar_historico else None
+
+    def proximo(self):
+        """
+        Fator do ciclo anterior correspondente à próxima observação.
+        """
+        return self.fatores[self.posicao]
+
+    def avancar(self, fator_sazonal_atual):
+        """
+        Substitui o fator da próxima observação pelo fator recém-calculado e avança uma posição.
+        """
+        self.fatores[self.posicao] = fator_sazonal_atual
+        self.posicao = (self.posicao + 1) % self.L
+        if self.historico is not None:
+            self.historico.append(fator_sazonal_atual)
+
+    def em_ordem(self):
+        """
+        Lista com os L fatores a partir da próxima observação.
+        """
+        return [self[i] for i in range(self.L)]
+
+    def __getitem__(self, i):
+        # i passos à frente da próxima observação, dentro do último ciclo conhecido
+        if not 0 <= i < self.L:
+            raise IndexError("O buffer sazonal guarda apenas os últimos L fatores.")
+        return self.fatores[(self.posicao + i) % self.L]
+
+    def __len__(self):
+        return self.L
+
+
+class EstadoHoltWinters:
+    """
+    Estado do Holt-Winters depois de processar uma série.
+
+    Guarda apenas o necessário para continuar a recursão: nível, tendência e os últimos L
+    fatores sazonais (em um ``BufferSazonal``), além dos parâmetros de suavização. Com ele,
+    uma nova observação é incorporada em O(1) por ``atualizar`` e a previsão sai de ``prever``
+    sem reprocessar o histórico.
+
+    Por padrão é o modelo multiplicativo sem amortecimento; ``phi`` < 1 amortece a tendência
+    e ``sazonalidade="aditiva"`` troca razões por diferenças, como em ``holt_winters_lote``.
+    """
+
+    __slots__ = ("L", "alpha", "beta", "gamma", "nivel", "tendencia", "fatores_sazonais", "n_observacoes",
+                 "phi", "sazonalidade")
+
+    def __init__(self, L, alpha, beta, gamma, nivel, tendencia, fatores_sazonais, posicao=0, n_observacoes=0,
+                 phi=1.0, sazonalidade="multiplicativa"):
+        if len(fatores_sazonais) != L:
+            raise ValueError("O estado precisa de exatamente L fatores sazonais.")
+        if sazonalidade not in ("multiplicativa", "aditiva"):
+            raise ValueError(f"Sazonalidade desconhecida: {sazonalidade}. Use 'multiplicativa' ou 'aditiva'.")
+        self.L = L
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.nivel = nivel
+        self.tendencia = tendencia
+        self.fatores_sazonais = BufferSazonal(fatores_sazonais, posicao)
+        self.n_observacoes = n_observacoes
+        self.phi = phi
+        self.sazonalidade = sazonalidade
+
+    @classmethod
+    def a_partir_da_serie(cls, series, L, alpha, beta, gamma, phi=1.0, sazonalidade="multiplicativa"):
+        """
+        Inicializa o estado com o primeiro ciclo (mesmas regras de ``holt_winters_multiplicativo``)
+        e incorpora o restante da série.
+
+        :param series: lista de valores da série temporal
+        :param L: comprimento do período sazonal
+        :param alpha: parâmetro de suavização para o nível
+        :param beta: parâmetro de suavização para a tendência
+        :param gamma: parâmetro de suavização para a sazonalidade
+        :param phi: amortecimento da tendência (1 = sem amortecimento)
+        :param sazonalidade: "multiplicativa" ou "aditiva"
+        :return: EstadoHoltWinters pronto para prever ou receber novas observações
+        """
+        if len(series) < L:
+            raise ValueError("A série temporal precisa ter pelo menos um ciclo sazonal completo (L).")
+
+        nivel = sum(series[0:L]) / L
+        tendencia = (sum(series[L:2*L]) - sum(series[0:L])) / L**2 if len(series) >= 2*L else (series[L-1] - series[0]) / (L-1)
+        if sazonalidade == "aditiva":
+            fatores_sazonais = [series[i] - nivel for i in range(L)]
+        else:
+            fatores_sazonais = [series[i] / nivel for i in range(L)]
+
+        estado = cls(L, alpha, beta, gamma, nivel, tendencia, fatores_sazonais, posicao=0, n_observacoes=L,
+                     phi=phi, sazonalidade=sazonalidade)
+        for valor in series[L:]:
+            estado.atualizar(valor)
+        return estado
+
+    def atualizar(self, valor_atual):
+        """
+        Incorpora uma nova observação ao estado (um passo da recursão, em O(1)).
+
+        :param valor_atual: valor observado no próximo período
+        """
+        fator_sazonal_anterior = self.fatores_sazonais.proximo()
+        tendencia_amortecida = self.phi * self.tendencia
+
+        if self.sazonalidade == "aditiva":
+            nivel_atual = self.alpha * (valor_atual - fator_sazonal_anterior) + (1 - self.alpha) * (self.nivel + tendencia_amortecida)
+            fator_novo = self.gamma * (valor_atual - nivel_atual) + (1 - self.gamma) * fator_sazonal_anterior
+        else:
+            nivel_atual = self.alpha * (valor_atual / fator_sazonal_anterior) + (1 - self.alpha) * (self.nivel + tendencia_amortecida)
+            fator_novo = self.gamma * (valor_atual / nivel_atual) + (1 - self.gamma) * fator_sazonal_anterior
+        self.tendencia = self.beta * (nivel_atual - self.nivel) + (1 - self.beta) * tendencia_amortecida
+        self.fatores_sazonais.avancar(fator_novo)
+        self.nivel = nivel_atual
+        self.n_observacoes += 1
+
+    def prever(self, h):
+        """
+        Previsão para h passos à frente a partir do estado atual.
+
+        :param h: número de passos à frente para prever
+        :return: lista com os h valores previstos
+        """
+        previsao = []
+        amortecimento = 0.0
+        potencia = 1.0
+        for i in range(h):
+            potencia *= self.phi
+            amortecimento += potencia
+            fator_sazonal = self.fatores_sazonais[i % self.L]
+            if self.sazonalidade == "aditiva":
+                previsao.append((self.nivel + amortecimento * self.tendencia) + fator_sazonal)
+            else:
+                previsao.append((self.nivel + amortecimento * self.tendencia) * fator_sazonal)
+        return previsao
+
+    def para_dict(self):
+        """
+        Representação do estado com tipos simples, pronta para ser salva em JSON.
+        """
+        return {
+            "L": self.L,
+            "alpha": self.alpha,
+            "beta": self.beta,
+            "gamma": self.gamma,
+            "nivel": self.nivel,
+            "tendencia": self.tendencia,
+            "fatores_sazonais": list(self.fatores_sazonais.fatores),
+            "posicao": self.fatores_sazonais.posicao,
+            "n_observacoes": self.n_observacoes,
+            "phi": self.phi,
+            "sazonalidade": self.sazonalidade,
+        }
+
+    @classmethod
+    def de_dict(cls, dados):
+        """
+        Reconstrói o estado a partir do dicionário gerado por ``para_dict`` (dicionários antigos,
+        sem ``phi`` e ``sazonalidade``, voltam como o modelo multiplicativo sem amortecimento).
+        """
+        return cls(**dados)
+
+    def para_json(self):
+        return json.dumps(self.para_dict())
+
+    @classmethod
+    def de_json(cls, texto):
+        return cls.de_dict(json.loads(texto))
+
+    def __repr__(self):
+        return (f"EstadoHoltWinters(L={self.L}, nivel={self.nivel:.1f}, tendencia={self.tendencia:.1f}, "
+                f"n_observacoes={self.n_observacoes})")
@@ -0,0 +1,144 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from holt_winters_lote import holt_winters_multiplicativo_lote
+from otimizacao import ajustar_parametros
+
+
+# Resultado por série, na mesma ordem da entrada
+ResultadoPrevisao = namedtuple("ResultadoPrevisao", ["previsao", "alpha", "beta", "gamma", "erro"])
+
+
+def _processar_bloco(tarefa):
+    """
+    Ajusta (se necessário) e prevê um bloco de séries de mesmo comprimento. Executada nos processos do pool.
+    """
+    bloco, L, h, parametros, metrica = tarefa
+    if parametros is None:
+        ajuste = ajustar_parametros(bloco, L, metrica=metrica)
+        alpha, beta, gamma, erro = ajuste.alpha, ajuste.beta, ajuste.gamma, ajuste.erro
+    else:
+        alpha, beta, gamma = parametros
+        erro = np.full(bloco.shape[0], np.nan)
+
+    previsao, _ = holt_winters_multiplicativo_lote(bloco, L, alpha, beta, gamma, h)
+    return previsao, alpha, beta, gamma, erro
+
+
+def _montar_tarefas(series, L, h, parametros, metrica, tamanho_bloco):
+    """
+    Agrupa as séries por comprimento e divide cada grupo em blocos contíguos.
+
+    Retorna a lista de tarefas e, para cada tarefa, os índices originais das séries.
+    """
+    if isinstance(series, np.ndarray) and series.ndim == 2:
+        grupos = {series.shape[1]: np.arange(series.shape[0])}
+        matriz = series
+    else:
+        matriz = None
+        por_comprimento = {}
+        for indice, serie in enumerate(series):
+            por_comprimento.setdefault(len(serie), []).append(indice)
+        grupos = {n: np.array(indices) for n, indices in por_comprimento.items()}
+
+    tarefas, indices_tarefas = [], []
+    for n in sorted(grupos):
+        indices = grupos[n]
+        for inicio in range(0, len(indices), tamanho_bloco):
+            indices_bloco = indices[inicio:inicio + tamanho_bloco]
+            if matriz is not None:
+                bloco = np.ascontiguousarray(matriz[indices_bloco[0]:indices_bloco[-1] + 1], dtype=np.float64)
+            else:
+                bloco = np.array([series[i] for i in indices_bloco], dtype=np.float64)
+
+            parametros_bloco = None
+            if parametros is not None:
+                parametros_bloco = tuple(p[indices_bloco] for p in parametros)
+            tarefas.append((bloco, L, h, parametros_bloco, metrica))
+            indices_tarefas.append(indices_bloco)
+    return tarefas, indices_tarefas
+
+
+def prever_em_paralelo(series, L, h, alpha=None, beta=None, gamma=None, metrica="sse",
+                       max_workers=None, tamanho_bloco=None):
+    """
+    Ajusta e prevê muitas séries distribuindo blocos de séries entre processos.
+
+    Cada processo recebe um bloco inteiro de séries de mesmo comprimento e o resolve com o
+    motor vetorizado, de modo que o custo de comunicação entre processos é pago uma vez por
+    bloco e não uma vez por série. O resultado sai sempre na ordem da entrada.
+
+    :param series: matriz (séries x tempo) ou lista de séries (os comprimentos podem variar)
+    :param L: comprimento do período sazonal
+    :param h: número de passos à frente para prever
+    :param alpha: se alpha, beta e gamma forem None, os parâmetros são ajustados por série;
+        caso contrário são usados como estão (escalares ou um valor por série)
+    :param beta: ver alpha
+    :param gamma: ver alpha
+    :param metrica: métrica usada no ajuste ("sse" ou "mape")
+    :param max_workers: número de processos; 1 executa tudo no processo atual
+    :param tamanho_bloco: séries por tarefa; por padrão divide o trabalho em cerca de quatro
+        blocos por processo, entre 64 e 4096 séries cada
+    :return: ResultadoPrevisao com a matriz de previsões (séries x h) e os parâmetros usados
+    """
+    parametros_informados = [p is not None for p in (alpha, beta, gamma)]
+    if any(parametros_informados) and not all(parametros_informados):
+        raise ValueError("Informe alpha, beta e gamma juntos, ou nenhum deles para ajustá-los.")
+    parametros = None
+    n_series = len(series)
+    if all(parametros_informados):
+        parametros = tuple(
+            np.broadcast_to(np.asarray(p, dtype=np.float64), (n_series,)) for p in (alpha, beta, gamma)
+        )
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if tamanho_bloco is None:
+        tamanho_bloco = min(max(-(-n_series // (4 * max_workers)), 64), 4096)
+
+    tarefas, indices_tarefas = _montar_tarefas(series, L, h, parametros, metrica, tamanho_bloco)
+
+    if max_workers == 1 or len(tarefas) == 1:
+        resultados = map(_processar_bloco, tarefas)
+        return _juntar_resultados(resultados, indices_tarefas, n_series, h)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        resultados = executor.map(_processar_bloco, tarefas)
+        return _juntar_resultados(resultados, indices_tarefas, n_series, h)
+
+
+def _juntar_resultados(resultados, indices_tarefas, n_series, h):
+    """
+    Coloca o resultado de cada bloco de volta na posição original das séries.
+    """
+    previsao = np.empty((n_series, h))
+    alpha, beta, gamma, erro = (np.empty(n_series) for _ in range(4))
+    for indices, (previsao_bloco, alpha_bloco, beta_bloco, gamma_bloco, erro_bloco) in zip(indices_tarefas, resultados):
+        previsao[indices] = previsao_bloco
+        alpha[indices] = alpha_bloco
+        beta[indices] = beta_bloco
+        gamma[indices] = gamma_bloco
+        erro[indices] = erro_bloco
+    return ResultadoPrevisao(previsao, alpha, beta, gamma, erro)
+
+
+if __name__ == "__main__":
+    from dados_regionais import carregar_consumo_regional
+
+    L = 12 # Ciclo sazonal de 12 meses
+    H = 12 # Prever os próximos 12 meses (2024)
+
+    consumo_regional = carregar_consumo_regional()
+    resultado = prever_em_paralelo(list(consumo_regional.values()), L, H)
+
+    meses = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho",
+             "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
+
+    for i, regiao in enumerate(consumo_regional):
+        print(f"Resultados para região {regiao} "
+              f"(alpha={resultado.alpha[i]:.3f}, beta={resultado.beta[i]:.3f}, gamma={resultado.gamma[i]:.3f})")
+        for j in range(H):
+            print(f"{meses[j]} de 2024: {resultado.previsao[i, j]:.1f}")
@@ -0,0 +1,175 @@
+import os
+
+import numpy as np
+
+
+def nome_quantil(quantil):
+    """
+    Nome da coluna de um quantil (ex: 0.1 -> "p10", 0.5 -> "p50").
+    """
+    return f"p{round(quantil * 100):02d}"
+
+
+def tabela_longa(ids, valores, inicio, nome="valor", extras=None):
+    """
+    Converte uma matriz (séries x tempo) em uma tabela longa (serie, mes, valor).
+
+    A tabela é montada com ``np.repeat`` e ``ravel`` sobre a matriz inteira, sem laço sobre
+    as linhas; a coluna ``serie`` é categórica (códigos inteiros + lista de ids), então não
+    é criada uma string por linha.
+
+    :param ids: identificadores das séries
+    :param valores: matriz (séries x tempo)
+    :param inicio: mês (datetime64[M] ou "AAAA-MM") da primeira coluna; um só ou um por série
+    :param nome: nome da coluna de valores
+    :param extras: dicionário {coluna: matriz (séries x tempo)} com colunas adicionais
+    :return: pandas.DataFrame
+    """
+    import pandas as pd
+
+    valores = np.asarray(valores, dtype=np.float64)
+    n_series, n = valores.shape
+    inicios = np.broadcast_to(np.asarray(inicio, dtype="datetime64[M]"), (n_series,))
+    meses = (inicios[:, np.newaxis] + np.arange(n)).ravel()
+
+    colunas = {
+        "serie": pd.Categorical.from_codes(np.repeat(np.arange(n_series), n), categories=pd.Index(list(ids), dtype=object)),
+        "mes": meses.astype("datetime64[s]"),
+        nome: valores.ravel(),
+    }
+    for coluna, matriz in (extras or {}).items():
+        colunas[coluna] = np.asarray(matriz, dtype=np.float64).ravel()
+    return pd.DataFrame(colunas)
+
+
+def _como_colunas(tabela):
+    # ParametrosAjustados, ModeloSelecionado ou dicionário -> {coluna: valores}
+    return tabela._asdict() if hasattr(tabela, "_asdict") else dict(tabela)
+
+
+def tabela_por_serie(ids, **colunas):
+    """
+    Tabela com uma linha por série (ex: parâmetros ajustados, métricas de erro).
+
+    :param colunas: vetores com um valor por série
+    """
+    import pandas as pd
+
+    return pd.DataFrame({"serie": list(ids), **{nome: np.asarray(valores) for nome, valores in colunas.items()}})
+
+
+def exportar_parquet(pasta, ids, previsao, inicio_previsao, ajustados=None, inicio_ajustados=None, reais=None,
+                     intervalos=None, parametros=None, metricas=None, compressao="snappy"):
+    """
+    Grava previsões, valores ajustados, intervalos, parâmetros e métricas de todas as séries
+    como arquivos Parquet (um por tabela) em ``pasta``.
+
+    :param pasta: pasta de saída (criada se não existir)
+    :param ids: identificadores das séries
+    :param previsao: matriz (séries x h)
+    :param inicio_previsao: mês do primeiro valor previsto; um só ou um por série
+    :param ajustados: matriz (séries x (n - L)) com os valores ajustados, opcional
+    :param inicio_ajustados: mês do primeiro valor ajustado
+    :param reais: matriz (séries x (n - L)) com os valores observados nos mesmos meses dos
+        ajustados, gravada ao lado deles
+    :param intervalos: ``IntervalosPrevisao`` (de ``intervalos.prever_intervalos``); os
+        quantis viram colunas da tabela de previsões
+    :param parametros: ``ParametrosAjustados``, ``ModeloSelecionado`` ou dicionário
+        {parâmetro: um valor por série}
+    :param metricas: dicionário de ``metricas.calcular_metricas`` (um valor por série)
+    :param compressao: compressão do Parquet ("snappy", "zstd", None, ...)
+    :return: dicionário {tabela: caminho do arquivo gravado}
+    """
+    os.makedirs(pasta, exist_ok=True)
+
+    extras = None
+    if intervalos is not None:
+        extras = {nome_quantil(q): intervalos.valores[j] for j, q in enumerate(intervalos.quantis)}
+    tabelas = {"previsoes": tabela_longa(ids, previsao, inicio_previsao, "previsao", extras)}
+
+    if ajustados is not None:
+        tabelas["ajustados"] = tabela_longa(ids, ajustados, inicio_ajustados, "ajustado",
+                                            None if reais is None else {"real": reais})
+    if parametros is not None:
+        tabelas["parametros"] = tabela_por_serie(ids, **_como_colunas(parametros))
+    if metricas is not None:
+        tabelas["metricas"] = tabela_por_serie(ids, **metricas)
+
+    caminhos = {}
+    for nome, tabela in tabelas.items():
+        caminhos[nome] = os.path.join(pasta, f"{nome}.parquet")
+        tabela.to_parquet(caminhos[nome], index=False, compression=compressao)
+    return caminhos
+
+
+def exportar_excel(caminho, planilhas):
+    """
+    Grava várias tabelas em um arquivo Excel, uma por planilha, cada uma de uma só vez
+    (``DataFrame.to_excel``), sem escrever célula por célula.
+
+    :param caminho: arquivo .xlsx
+    :param planilhas: dicionário {nome da planilha: pandas.DataFrame}
+    """
+    import pandas as pd
+
+    with pd.ExcelWriter(caminho) as escritor:
+        for nome, tabela in planilhas.items():
+            tabela.to_excel(escritor, sheet_name=nome[:31], index=not isinstance(tabela.index, pd.RangeIndex))
+
+
+def resumo_excel(caminho, ids, previsao, inicio_previsao, reais=None, parametros=None, metricas=None):
+    """
+    Resumo em Excel no estilo de Comparação_previsãoxreal.xlsx: uma linha por série e uma
+    coluna por mês, com as planilhas "Previstos", "Reais" e "Erro relativo" (quando os
+    valores reais são informados), "Parâmetros" e "Métricas".
+
+    Pensado para resumos: o Excel limita cada planilha a cerca de um milhão de linhas;
+    para volumes maiores use ``exportar_parquet``.
+
+    :param inicio_previsao: mês do primeiro valor previsto; se as séries começarem a prever
+        em meses diferentes, as colunas passam a ser os passos do horizonte (+1, +2, ...)
+    :param reais: matriz (séries x h) com os valores observados nos meses previstos
+    """
+    import pandas as pd
+
+    from metricas import erro_relativo
+
+    previsao = np.asarray(previsao, dtype=np.float64)
+    inicios = np.unique(np.asarray(inicio_previsao, dtype="datetime64[M]"))
+    if len(inicios) == 1:
+        meses = (inicios[0] + np.arange(previsao.shape[1])).astype(str)
+    else:
+        meses = [f"+{k}" for k in range(1, previsao.shape[1] + 1)]
+    indice = pd.Index(list(ids), name="serie")
+
+    planilhas = {"Previstos": pd.DataFrame(previsao, index=indice, columns=meses)}
+    if reais is not None:
+        planilhas["Reais"] = pd.DataFrame(np.asarray(reais, dtype=np.float64), index=indice, columns=meses)
+        planilhas["Erro relativo"] = pd.DataFrame(erro_relativo(previsao, reais), index=indice, columns=meses)
+    if parametros is not None:
+        planilhas["Parâmetros"] = pd.DataFrame(_como_colunas(parametros), index=indice)
+    if metricas is not None:
+        planilhas["Métricas"] = pd.DataFrame(metricas, index=indice)
+    exportar_excel(caminho, planilhas)
+
+
+if __name__ == "__main__":
+    from dados_regionais import carregar_consumo_real_2024, carregar_consumo_regional
+    from holt_winters_lote import holt_winters_multiplicativo_lote
+    from metricas import calcular_metricas
+    from otimizacao import ajustar_parametros
+
+    L, H = 12, 12
+    consumo = carregar_consumo_regional()
+    reais = np.array(list(carregar_consumo_real_2024().values()))
+    dados = np.array(list(consumo.values()))
+
+    parametros = ajustar_parametros(dados, L)
+    previsao, ajustados = holt_winters_multiplicativo_lote(dados, L, parametros.alpha, parametros.beta, parametros.gamma, H)
+    metricas = calcular_metricas(previsao, reais, historico=dados, L=L)
+
+    pasta = os.path.join(os.path.dirname(os.path.abspath(__file__)), "exportacao")
+    caminhos = exportar_parquet(pasta, list(consumo), previsao, "2024-01", ajustados, "2022-01", dados[:, L:],
+                                parametros=parametros, metricas=metricas)
+    resumo_excel(os.path.join(pasta, "resumo.xlsx"), list(consumo), previsao, "2024-01", reais, parametros, metricas)
+    print("\n".join(caminhos.values()))
@@ -0,0 +1,174 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from instrumentacao import etapa
+
+
+FORMATOS = ("png", "svg")
+
+# Renderizador do processo atual (um por processo do pool, criado na primeira tarefa)
+_renderizador = None
+
+
+class RenderizadorGraficos:
+    """
+    Desenha o gráfico histórico + previsão de várias séries reaproveitando uma única figura.
+
+    A figura é criada uma vez, direto no canvas Agg (sem ``pyplot`` e sem janela), com as
+    linhas, a faixa do intervalo e os textos já posicionados; para cada série só os dados e
+    o título são trocados antes de salvar. O visual segue o dos scripts regionais.
+
+    :param tamanho: tamanho da figura em polegadas
+    :param dpi: resolução das imagens PNG
+    """
+
+    def __init__(self, tamanho=(14, 7), dpi=100):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.dates import DateFormatter, YearLocator
+        from matplotlib.figure import Figure
+
+        self.dpi = dpi
+        self.figura = Figure(figsize=tamanho)
+        FigureCanvasAgg(self.figura)
+        self.eixos = self.figura.add_subplot()
+
+        self.linha_historico, = self.eixos.plot([], [], label="Dados Históricos", color="blue")
+        self.linha_previsao, = self.eixos.plot([], [], label="Previsão Holt-Winters", linestyle="--", color="red")
+        self.faixa = None
+
+        # Marcas anuais fixas: bem mais baratas que o localizador automático de datas
+        self.eixos.xaxis_date()
+        self.eixos.xaxis.set_major_locator(YearLocator())
+        self.eixos.xaxis.set_major_formatter(DateFormatter("%Y"))
+        self.eixos.set_xlabel("Ano")
+        self.eixos.set_ylabel("Consumo (MWh/mês)")
+        self.eixos.grid(axis="y", linestyle="--", alpha=0.7)
+        self.eixos.legend(loc="upper left")
+
+    def desenhar(self, caminho, titulo, meses_historico, historico, meses_previsao, previsao, intervalo=None):
+        """
+        Atualiza a figura com uma série e grava a imagem em ``caminho``.
+
+        :param caminho: arquivo de saída; o formato vem da extensão (.png ou .svg)
+        :param titulo: título do gráfico
+        :param meses_historico: vetor datetime64 com os meses do histórico
+        :param historico: valores do histórico
+        :param meses_previsao: vetor datetime64 com os meses previstos
+        :param previsao: valores previstos
+        :param intervalo: tupla opcional (inferior, superior) para desenhar a faixa de previsão
+        """
+        from matplotlib.dates import date2num
+
+        x_historico = date2num(meses_historico)
+        x_previsao = date2num(meses_previsao)
+        self.linha_historico.set_data(x_historico, historico)
+        # A previsão começa no último ponto do histórico, para a linha ficar contínua
+        self.linha_previsao.set_data(np.r_[x_historico[-1:], x_previsao], np.r_[historico[-1:], previsao])
+
+        if self.faixa is not None:
+            self.faixa.remove()
+            self.faixa = None
+        if intervalo is not None:
+            inferior, superior = intervalo
+            self.faixa = self.eixos.fill_between(x_previsao, inferior, superior, color="red", alpha=0.15, linewidth=0)
+
+        self.eixos.set_title(titulo)
+        self.eixos.relim()
+        self.eixos.autoscale_view()
+        # Compressão PNG mínima: arquivos um pouco maiores, gravação bem mais rápida
+        opcoes = {"pil_kwargs": {"compress_level": 1}} if caminho.endswith(".png") else {}
+        self.figura.savefig(caminho, dpi=self.dpi, **opcoes)
+
+
+def _nome_arquivo(id_serie, formato):
+    # Identificadores viram nomes de arquivo seguros (ex: "Centro-Oeste" -> "Centro-Oeste.png")
+    return re.sub(r"[^\w\-.]+", "_", str(id_serie)) + "." + formato
+
+
+def _renderizar_bloco(tarefa):
+    global _renderizador
+    pasta, formato, ids, meses_historico, historicos, meses_previsao, previsoes, intervalos, titulo = tarefa
+    if _renderizador is None:
+        _renderizador = RenderizadorGraficos()
+
+    caminhos = []
+    for k, id_serie in enumerate(ids):
+        caminho = os.path.join(pasta, _nome_arquivo(id_serie, formato))
+        intervalo = None if intervalos is None else (intervalos[0][k], intervalos[1][k])
+        _renderizador.desenhar(caminho, titulo.format(id=id_serie), meses_historico[k], historicos[k],
+                               meses_previsao[k], previsoes[k], intervalo)
+        caminhos.append(caminho)
+    return caminhos
+
+
+def renderizar_graficos(pasta, ids, historicos, previsoes, inicio="2021-01", intervalos=None, formato="png",
+                        titulo="Previsão de Consumo de Energia com Holt-Winters ({id})",
+                        max_workers=None, tamanho_bloco=None):
+    """
+    Grava um gráfico (histórico + previsão) por série em ``pasta``, sem abrir janelas.
+
+    As séries são divididas em blocos e cada bloco é desenhado por um processo do pool,
+    que reaproveita a mesma figura para todas as séries que recebe.
+
+    :param pasta: pasta de saída (criada se não existir)
+    :param ids: identificadores das séries; dão o nome dos arquivos e o título
+    :param historicos: matriz (séries x tempo) ou lista de séries com o histórico
+    :param previsoes: matriz (séries x h) com as previsões
+    :param inicio: mês do primeiro valor do histórico ("AAAA-MM"); um só ou um por série
+    :param intervalos: tupla opcional (inferior, superior) de matrizes (séries x h), por
+        exemplo dois quantis de ``intervalos.prever_intervalos``
+    :param formato: "png" ou "svg"
+    :param titulo: título dos gráficos; ``{id}`` é trocado pelo identificador da série
+    :param max_workers: número de processos; 1 desenha tudo no processo atual
+    :param tamanho_bloco: séries por tarefa; por padrão divide as séries em 4 tarefas por processo
+    :return: lista com os caminhos gravados, na ordem das séries
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconhecido: {formato}. Use um de {FORMATOS}.")
+    os.makedirs(pasta, exist_ok=True)
+
+    ids = list(ids)
+    n_series = len(ids)
+    inicios = np.broadcast_to(np.asarray(inicio, dtype="datetime64[M]"), (n_series,))
+    meses_historico = [inicios[k] + np.arange(len(historicos[k])) for k in range(n_series)]
+    meses_previsao = [meses_historico[k][-1] + 1 + np.arange(len(previsoes[k])) for k in range(n_series)]
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if tamanho_bloco is None:
+        tamanho_bloco = max(-(-n_series // (4 * max_workers)), 1)
+
+    tarefas = []
+    for inicio_bloco in range(0, n_series, tamanho_bloco):
+        fatia = slice(inicio_bloco, inicio_bloco + tamanho_bloco)
+        intervalos_bloco = None if intervalos is None else (intervalos[0][fatia], intervalos[1][fatia])
+        tarefas.append((pasta, formato, ids[fatia], meses_historico[fatia], historicos[fatia],
+                        meses_previsao[fatia], previsoes[fatia], intervalos_bloco, titulo))
+
+    with etapa("graficos", itens=n_series):
+        if max_workers == 1 or len(tarefas) <= 1:
+            blocos = list(map(_renderizar_bloco, tarefas))
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                blocos = list(executor.map(_renderizar_bloco, tarefas))
+    return [caminho for bloco in blocos for caminho in bloco]
+
+
+if __name__ == "__main__":
+    import time
+
+    from dados_regionais import carregar_consumo_regional
+    from intervalos import prever_intervalos
+
+    consumo = carregar_consumo_regional()
+    intervalos = prever_intervalos(list(consumo.values()), L=12, h=12, alpha=0.3, beta=0.1, gamma=0.2, semente=0)
+
+    inicio = time.perf_counter()
+    caminhos = renderizar_graficos(
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "graficos"), list(consumo),
+        list(consumo.values()), intervalos.previsao, intervalos=(intervalos.valores[0], intervalos.valores[-1]),
+    )
+    print(f"{len(caminhos)} gráficos gravados em {time.perf_counter() - inicio:.2f}s")
@@ -0,0 +1,225 @@
+"""
+Previsão hierárquica (ex: país -> região -> estado -> distribuidora -> subestação) com
+reconciliação das previsões de todos os níveis.
+
+As séries agregadas são obtidas da matriz de soma S (esparsa, nós x séries da base), as
+previsões de todos os nós saem do motor em lote e a reconciliação torna o conjunto coerente
+(cada agregado igual à soma dos seus filhos) por um dos métodos:
+
+- ``bottom_up``: soma as previsões da base.
+- ``top_down``: divide a previsão do total pelas proporções históricas de cada série da base.
+- ``ols``, ``wls`` e ``mint``: projeção ỹ = ŷ - W C' (C W C')⁻¹ C ŷ, em que C = [I  -S_agg]
+  são as restrições de soma e W é diagonal: identidade (``ols``), número de séries da base
+  sob cada nó (``wls``, escala estrutural) ou variância dos erros de 1 passo de cada nó
+  (``mint``, versão diagonal do MinT).
+
+A forma com as restrições resolve um sistema esparso do tamanho do número de agregados
+(C W C' só liga um agregado aos seus ancestrais e descendentes), em vez de inverter S'W⁻¹S,
+que é densa sempre que há um total comum; por isso escala para centenas de milhares de nós.
+"""
+from collections import namedtuple
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import splu
+
+from holt_winters_lote import _como_vetor, como_indicador_aditivo, holt_winters_lote, inicializar_lote
+from instrumentacao import etapa
+from otimizacao import _residuos_a_partir_do_estado, ajustar_parametros
+
+
+METODOS_RECONCILIACAO = ("bottom_up", "top_down", "ols", "wls", "mint")
+
+# Previsões de todos os nós (agregados primeiro, depois a base), antes e depois da reconciliação
+PrevisaoHierarquica = namedtuple("PrevisaoHierarquica", ["nomes", "previsao_base", "previsao", "parametros"])
+
+
+class Hierarquia:
+    """
+    Estrutura de agregação definida pelo caminho de cada série da base, do nível mais alto
+    ao mais baixo, ex: ("Sudeste", "SP", "Distribuidora 1", "Subestação 7").
+
+    Os nós ficam ordenados por nível: o total (índice 0), os agregados de cada nível e, por
+    último, as séries da base, na ordem de ``caminhos``.
+
+    :param caminhos: um caminho (sequência de rótulos) por série da base
+    :param nome_total: nome do nó que soma todas as séries
+    :param separador: usado para formar o nome de cada nó a partir do caminho
+    """
+
+    def __init__(self, caminhos, nome_total="Total", separador="/"):
+        caminhos = [tuple(caminho) for caminho in caminhos]
+        nomes_base = [separador.join(caminho) for caminho in caminhos]
+        if len(set(nomes_base)) != len(nomes_base):
+            raise ValueError("Há séries da base com o mesmo caminho.")
+
+        indices = {(): 0}
+        nomes, niveis = [nome_total], [0]
+        linhas, colunas = [], []
+        for j, caminho in enumerate(caminhos):
+            linhas.append(0)
+            colunas.append(j)
+            for profundidade in range(1, len(caminho)):
+                prefixo = caminho[:profundidade]
+                indice = indices.get(prefixo)
+                if indice is None:
+                    indice = indices[prefixo] = len(nomes)
+                    nomes.append(separador.join(prefixo))
+                    niveis.append(profundidade)
+                linhas.append(indice)
+                colunas.append(j)
+        if not set(nomes_base).isdisjoint(nomes):
+            raise ValueError("Uma série da base não pode ser também agregado de outras.")
+
+        # Reordena os agregados por nível, mantendo a ordem de aparição dentro de cada nível
+        ordem = np.argsort(niveis, kind="stable")
+        nova_posicao = np.empty_like(ordem)
+        nova_posicao[ordem] = np.arange(len(ordem))
+
+        self.n_agregados = len(nomes)
+        self.n_base = len(caminhos)
+        self.nomes = [nomes[i] for i in ordem] + nomes_base
+        self.niveis = np.concatenate([np.asarray(niveis)[ordem], [len(caminho) for caminho in caminhos]])
+        self.agregacao = sparse.csr_matrix(
+            (np.ones(len(linhas)), (nova_posicao[linhas], colunas)), shape=(self.n_agregados, self.n_base)
+        )
+        self.matriz_soma = sparse.vstack([self.agregacao, sparse.identity(self.n_base, format="csr")], format="csr")
+
+    @property
+    def n_nos(self):
+        return self.n_agregados + self.n_base
+
+    def agregar(self, base):
+        """
+        Séries de todos os nós a partir das séries da base (S @ base).
+
+        :param base: matriz (séries da base x tempo)
+        :return: matriz (nós x tempo), agregados primeiro
+        """
+        base = np.asarray(base, dtype=np.float64)
+        return np.concatenate([self.agregacao @ base, base])
+
+
+def _pesos(hierarquia, metodo, residuos):
+    # Diagonal de W para os métodos por projeção
+    if metodo == "ols":
+        return np.ones(hierarquia.n_nos)
+    if metodo == "wls":
+        return np.asarray(hierarquia.matriz_soma.sum(axis=1)).ravel()
+    if residuos is None:
+        raise ValueError("O método 'mint' precisa dos resíduos de 1 passo de cada nó.")
+    variancia = np.nanmean(np.asarray(residuos, dtype=np.float64) ** 2, axis=1)
+    # Nós com erro nulo (ex: séries constantes) ficam com um peso mínimo para o sistema não ficar singular
+    return np.maximum(variancia, 1e-12 * max(np.nanmax(variancia), 1.0))
+
+
+def _projetar(hierarquia, previsoes, pesos):
+    # ỹ = ŷ - W C' (C W C')⁻¹ C ŷ, com C = [I  -S_agg] e W = diag(pesos)
+    n_agregados = hierarquia.n_agregados
+    agregacao = hierarquia.agregacao
+    pesos_agregados, pesos_base = pesos[:n_agregados], pesos[n_agregados:]
+
+    sistema = sparse.diags(pesos_agregados) + agregacao @ sparse.diags(pesos_base) @ agregacao.T
+    incoerencia = previsoes[:n_agregados] - agregacao @ previsoes[n_agregados:]
+
+    # Numa árvore, eliminar os agregados do nível mais baixo para o mais alto não cria
+    # preenchimento: os vizinhos de um nó ainda não eliminado são os seus ancestrais, que já
+    # estão ligados entre si. Os nós estão ordenados por nível, então basta inverter a ordem.
+    # O sistema é simétrico positivo definido e dispensa pivotamento.
+    inversa = slice(None, None, -1)
+    fatoracao = splu(sparse.csc_matrix(sistema[inversa][:, inversa]), permc_spec="NATURAL",
+                     diag_pivot_thresh=0, options={"SymmetricMode": True})
+    multiplicadores = fatoracao.solve(incoerencia[inversa])[inversa]
+
+    ajuste_agregados = pesos_agregados[:, np.newaxis] * multiplicadores
+    ajuste_base = pesos_base[:, np.newaxis] * (agregacao.T @ multiplicadores)
+    return np.concatenate([previsoes[:n_agregados] - ajuste_agregados, previsoes[n_agregados:] + ajuste_base])
+
+
+def reconciliar(hierarquia, previsoes, metodo="mint", historico_base=None, residuos=None):
+    """
+    Torna as previsões de todos os nós coerentes com a hierarquia.
+
+    :param hierarquia: Hierarquia
+    :param previsoes: matriz (nós x h), na ordem de ``hierarquia.nomes``
+    :param metodo: um de METODOS_RECONCILIACAO
+    :param historico_base: matriz (séries da base x tempo); obrigatória para "top_down"
+    :param residuos: matriz (nós x tempo) com os erros de 1 passo; obrigatória para "mint"
+    :return: matriz (nós x h) reconciliada
+    """
+    if metodo not in METODOS_RECONCILIACAO:
+        raise ValueError(f"Método de reconciliação desconhecido: {metodo!r}. Use um de {METODOS_RECONCILIACAO}.")
+    previsoes = np.asarray(previsoes, dtype=np.float64)
+    if previsoes.shape[0] != hierarquia.n_nos:
+        raise ValueError(f"Esperadas previsões para {hierarquia.n_nos} nós, recebidas {previsoes.shape[0]}.")
+
+    with etapa("reconciliacao", itens=previsoes.size):
+        if metodo == "bottom_up":
+            return hierarquia.agregar(previsoes[hierarquia.n_agregados:])
+        if metodo == "top_down":
+            if historico_base is None:
+                raise ValueError("O método 'top_down' precisa do histórico das séries da base.")
+            totais = np.asarray(historico_base, dtype=np.float64).sum(axis=1)
+            proporcoes = totais / totais.sum()
+            return hierarquia.agregar(proporcoes[:, np.newaxis] * previsoes[0])
+        return _projetar(hierarquia, previsoes, _pesos(hierarquia, metodo, residuos))
+
+
+def _erros_um_passo(dados, L, alpha, beta, gamma, phi, sazonalidade):
+    # Erros de 1 passo de cada nó, com a previsão feita antes de ver o valor (os ajustados de
+    # holt_winters_lote já incorporam a observação e subestimariam a variância); NaN onde falta dado
+    n_nos = dados.shape[0]
+    aditivo = como_indicador_aditivo(sazonalidade, None if isinstance(sazonalidade, str) else n_nos)
+    nivel, tendencia, fatores_sazonais = inicializar_lote(dados, L, aditivo)
+    parametros = [_como_vetor(v, n_nos, nome) for v, nome in ((alpha, "alpha"), (beta, "beta"), (gamma, "gamma"),
+                                                               (phi, "phi"))]
+    residuos = _residuos_a_partir_do_estado(dados, L, *parametros, aditivo, nivel, tendencia, fatores_sazonais.copy())
+    residuos[np.isnan(dados[:, L:])] = np.nan
+    return residuos
+
+
+def prever_hierarquia(hierarquia, base, L, h, metodo="mint", alpha=None, beta=None, gamma=None, phi=1.0,
+                      sazonalidade="multiplicativa", metrica="sse"):
+    """
+    Agrega as séries da base, prevê todos os nós com o motor em lote e reconcilia.
+
+    :param hierarquia: Hierarquia
+    :param base: matriz (séries da base x tempo), na ordem dos caminhos da hierarquia
+    :param L: comprimento do período sazonal
+    :param h: número de passos à frente para prever
+    :param metodo: um de METODOS_RECONCILIACAO
+    :param alpha: parâmetros fixos para todos os nós; sem eles (None), alpha, beta e gamma
+        são ajustados para cada nó
+    :param phi: amortecimento da tendência (1 = sem amortecimento)
+    :param sazonalidade: "multiplicativa" ou "aditiva"
+    :param metrica: métrica do ajuste ("sse" ou "mape")
+    :return: PrevisaoHierarquica com as previsões de cada nó antes (``previsao_base``) e depois
+        da reconciliação; ``parametros`` é o ParametrosAjustados do ajuste, ou None
+    """
+    dados = hierarquia.agregar(base)
+    parametros = None
+    if alpha is None or beta is None or gamma is None:
+        parametros = ajustar_parametros(dados, L, metrica=metrica, phi=phi, sazonalidade=sazonalidade)
+        alpha, beta, gamma = parametros.alpha, parametros.beta, parametros.gamma
+
+    previsao, _ = holt_winters_lote(dados, L, alpha, beta, gamma, h, phi, sazonalidade)
+    residuos = _erros_um_passo(dados, L, alpha, beta, gamma, phi, sazonalidade) if metodo == "mint" else None
+    reconciliada = reconciliar(hierarquia, previsao, metodo, historico_base=base, residuos=residuos)
+    return PrevisaoHierarquica(hierarquia.nomes, previsao, reconciliada, parametros)
+
+
+if __name__ == "__main__":
+    from dados_regionais import carregar_consumo_real_2024, carregar_consumo_regional
+    from metricas import calcular_metricas
+
+    L, H = 12, 12
+    consumo = carregar_consumo_regional()
+    reais = np.array(list(carregar_consumo_real_2024().values()))
+    hierarquia = Hierarquia([(regiao,) for regiao in consumo], nome_total="Brasil")
+    reais_nos = hierarquia.agregar(reais)
+
+    print(f"{'método':<10}{'MAPE Brasil':>12}{'MAPE regiões':>14}")
+    for metodo in METODOS_RECONCILIACAO:
+        resultado = prever_hierarquia(hierarquia, np.array(list(consumo.values())), L, H, metodo=metodo)
+        mape = calcular_metricas(resultado.previsao, reais_nos)["mape"]
+        print(f"{metodo:<10}{mape[0]:>12.2%}{mape[1:].mean():>14.2%}")
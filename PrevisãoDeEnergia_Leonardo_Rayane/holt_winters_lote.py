@@ -0,0 +1,452 @@
+import warnings
+
+import numpy as np
+
+import nucleo_jit
+from instrumentacao import etapa
+
+# Variantes da componente sazonal: "multiplicativa" (valor = base * fator) ou "aditiva" (valor = base + fator)
+SAZONALIDADES = ("multiplicativa", "aditiva")
+
+# Estratégias de ``inicializar_lote`` para o estado inicial (nível, tendência e fatores sazonais)
+INICIALIZACOES = ("primeiro_ciclo", "decomposicao", "minimos_quadrados")
+
+
+def _como_vetor(valor, n_series, nome, dtype=np.float64):
+    """
+    Converte um parâmetro escalar (ou um valor por série) em um vetor de tamanho n_series.
+    """
+    vetor = np.asarray(valor, dtype=dtype)
+    if vetor.ndim > 1 or (vetor.ndim == 1 and vetor.shape[0] not in (1, n_series)):
+        raise ValueError(f"O parâmetro {nome} deve ser um escalar ou ter um valor por série.")
+    return np.broadcast_to(vetor, (n_series,))
+
+
+def como_indicador_aditivo(sazonalidade, n_series=None):
+    """
+    Converte a variante sazonal em um indicador de modelo aditivo.
+
+    :param sazonalidade: "multiplicativa", "aditiva" ou um vetor com uma dessas por série
+    :param n_series: número de séries, para validar o vetor
+    :return: um bool (mesma variante para todas as séries) ou um vetor de bools por série
+    """
+    if isinstance(sazonalidade, str):
+        if sazonalidade not in SAZONALIDADES:
+            raise ValueError(f"Sazonalidade desconhecida: {sazonalidade}. Use uma de {SAZONALIDADES}.")
+        return sazonalidade == "aditiva"
+
+    variantes = np.asarray(sazonalidade)
+    if variantes.dtype == bool:
+        aditivo = variantes
+    else:
+        desconhecidas = set(np.unique(variantes)) - set(SAZONALIDADES)
+        if desconhecidas:
+            raise ValueError(f"Sazonalidade desconhecida: {desconhecidas}. Use uma de {SAZONALIDADES}.")
+        aditivo = variantes == "aditiva"
+    if n_series is not None and aditivo.shape != (n_series,):
+        raise ValueError("A sazonalidade deve ser uma só ou ter um valor por série.")
+    # Vetor uniforme vira um único bool, para usar o caminho sem np.where
+    if aditivo.all() or not aditivo.any():
+        return bool(aditivo.flat[0]) if aditivo.size else False
+    return aditivo
+
+
+def remover_sazonalidade(valor, componente, aditivo):
+    """
+    Diferença (modelo aditivo) ou razão (multiplicativo) entre ``valor`` e ``componente``.
+    """
+    if aditivo is True:
+        return valor - componente
+    if aditivo is False:
+        return valor / componente
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(aditivo, valor - componente, valor / componente)
+
+
+def aplicar_sazonalidade(base, fator, aditivo):
+    """
+    Soma (modelo aditivo) ou produto (multiplicativo) de ``base`` pelo fator sazonal.
+    """
+    if aditivo is True:
+        return base + fator
+    if aditivo is False:
+        return base * fator
+    return np.where(aditivo, base + fator, base * fator)
+
+
+def inicializar_lote(dados, L, aditivo=False, metodo="primeiro_ciclo", ciclos=None):
+    """
+    Estado inicial da recursão para cada linha de ``dados``, que começa no instante L.
+
+    Estratégias (``metodo``), todas em forma fechada para o lote inteiro:
+
+    - "primeiro_ciclo" (mesmas regras de ``holt_winters_multiplicativo``): o nível é a média
+      do primeiro ciclo, a tendência vem da diferença entre os dois primeiros ciclos (ou do
+      primeiro ciclo, se a série tiver menos de 2L valores) e os fatores sazonais são os
+      valores do primeiro ciclo divididos pelo nível (ou menos o nível, no modelo aditivo).
+    - "decomposicao": decomposição clássica sobre ``ciclos`` ciclos (pelo menos 2): média
+      móvel centrada como tendência, fatores pela média por mês da razão (ou diferença) entre
+      a série e a média móvel, e nível e tendência pela reta de mínimos quadrados da série
+      dessazonalizada.
+    - "minimos_quadrados": regressão da série em reta + efeito de cada mês (soma zero), sobre
+      ``ciclos`` ciclos; funciona com pouco mais de um ciclo. No modelo multiplicativo os
+      fatores são a média por mês da razão entre a série e a reta ajustada.
+
+    Nas duas últimas, o nível é o da reta no instante L - 1, logo antes da recursão.
+
+    Valores ausentes (NaN) no trecho usado são trocados pela média do mesmo mês nos demais
+    ciclos do trecho (ou pela média da série, se o mês estiver ausente em todos).
+
+    :param dados: matriz (séries x tempo)
+    :param L: comprimento do período sazonal
+    :param aditivo: indicador de ``como_indicador_aditivo``
+    :param metodo: um de INICIALIZACOES
+    :param ciclos: quantos ciclos do início da série são usados; None usa todos os completos
+        ("decomposicao") ou a série inteira ("minimos_quadrados")
+    :return: tupla (nivel, tendencia, fatores_sazonais); os fatores formam um buffer circular
+        (séries x L) em que a coluna t % L guarda o fator do instante t - L até ser
+        sobrescrita no instante t
+    """
+    trecho = 2 * L if metodo == "primeiro_ciclo" else (dados.shape[1] if ciclos is None else ciclos * L)
+    if np.isnan(dados[:, :trecho]).any():
+        dados = _preencher_faltantes(dados[:, :trecho], L)
+
+    if metodo == "decomposicao":
+        return _inicializar_decomposicao(dados, L, aditivo, ciclos)
+    if metodo == "minimos_quadrados":
+        return _inicializar_minimos_quadrados(dados, L, aditivo, ciclos)
+    if metodo != "primeiro_ciclo":
+        raise ValueError(f"Inicialização desconhecida: {metodo!r}. Use uma de {INICIALIZACOES}.")
+
+    n = dados.shape[1]
+    soma_primeiro_ciclo = dados[:, 0:L].sum(axis=1)
+    nivel = soma_primeiro_ciclo / L
+    if n >= 2 * L:
+        tendencia = (dados[:, L:2*L].sum(axis=1) - soma_primeiro_ciclo) / L**2
+    else:
+        tendencia = (dados[:, L-1] - dados[:, 0]) / (L - 1)
+
+    aditivo_coluna = aditivo if isinstance(aditivo, bool) else aditivo[:, np.newaxis]
+    fatores_sazonais = remover_sazonalidade(dados[:, 0:L], nivel[:, np.newaxis], aditivo_coluna)
+    return nivel, tendencia, fatores_sazonais
+
+
+def _preencher_faltantes(valores, L):
+    # NaN -> média do mesmo mês nos outros ciclos; se o mês faltar em todos, média da série
+    n_series, m = valores.shape
+    por_ciclo = np.column_stack([valores, np.full((n_series, -m % L), np.nan)]).reshape(n_series, -1, L)
+    with np.errstate(invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        media_mes = np.nanmean(por_ciclo, axis=1)
+        media_mes = np.where(np.isnan(media_mes), np.nanmean(valores, axis=1, keepdims=True), media_mes)
+    return np.where(np.isnan(valores), media_mes[:, np.arange(m) % L], valores)
+
+
+def escala_inicial_lote(dados, L):
+    """
+    Escala inicial dos erros de 1 passo para o limite de Huber: 1,4826 vezes a mediana das
+    variações absolutas entre valores consecutivos do primeiro ciclo. Como essas variações
+    incluem o movimento sazonal, a escala começa folgada e se ajusta aos resíduos ao longo da
+    recursão. Séries sem variação no primeiro ciclo não são limitadas.
+
+    :return: vetor com uma escala por série
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        escala = 1.4826 * np.nanmedian(np.abs(np.diff(dados[:, :L], axis=1)), axis=1)
+    return np.where(np.isfinite(escala) & (escala > 0), escala, np.inf)
+
+
+def limitar_observacao(valor_atual, previsto, escala, limite_huber):
+    """
+    Limite de Huber: o desvio entre a observação e a previsão de 1 passo é cortado em
+    ``limite_huber`` vezes a escala robusta, e a escala é atualizada com o desvio cortado
+    (peso ``nucleo_jit.SUAVIZACAO_ESCALA``). Observações ausentes (NaN) viram a própria
+    previsão e não alteram a escala.
+
+    :param escala: escala atual de cada série (de ``escala_inicial_lote``)
+    :return: tupla (valor a usar na atualização, nova escala)
+    """
+    residuo = valor_atual - previsto
+    corte = limite_huber * escala
+    faltantes = np.isnan(residuo)
+    limitado = np.where(faltantes, 0.0, np.clip(residuo, -corte, corte))
+    suavizacao = nucleo_jit.SUAVIZACAO_ESCALA
+    with np.errstate(invalid="ignore"):
+        nova_escala = np.sqrt((1 - suavizacao) * escala * escala + suavizacao * limitado * limitado)
+    return previsto + limitado, np.where(faltantes, escala, nova_escala)
+
+
+def _reta(valores, fim):
+    # Reta de mínimos quadrados de cada linha sobre t = 0..m-1; devolve o valor em ``fim`` e a inclinação
+    m = valores.shape[1]
+    t = np.arange(m) - (m - 1) / 2
+    inclinacao = valores @ t / (t @ t) if m > 1 else np.zeros(valores.shape[0])
+    return valores.mean(axis=1) + inclinacao * (fim - (m - 1) / 2), inclinacao
+
+
+def _normalizar_fatores(fatores, aditivo_coluna):
+    # Fatores com média 1 (multiplicativo) ou 0 (aditivo) em cada série
+    return remover_sazonalidade(fatores, fatores.mean(axis=1, keepdims=True), aditivo_coluna)
+
+
+def _inicializar_decomposicao(dados, L, aditivo, ciclos):
+    n_series, n = dados.shape
+    k = n // L if ciclos is None else min(ciclos, n // L)
+    if k < 2:
+        raise ValueError("A inicialização por decomposição precisa de pelo menos dois ciclos completos.")
+    valores = dados[:, :k * L]
+    aditivo_coluna = aditivo if isinstance(aditivo, bool) else aditivo[:, np.newaxis]
+
+    # Média móvel centrada (2 x L para L par, L para L ímpar) com somas acumuladas
+    meio = L // 2
+    acumulado = np.concatenate([np.zeros((n_series, 1)), np.cumsum(valores, axis=1)], axis=1)
+    if L % 2 == 0:
+        janela = acumulado[:, L + 1:] - acumulado[:, :-(L + 1)]
+        media_movel = (janela - 0.5 * (valores[:, :-L] + valores[:, L:])) / L
+    else:
+        media_movel = (acumulado[:, L:] - acumulado[:, :-L]) / L
+
+    razao = np.full(valores.shape, np.nan)
+    razao[:, meio:meio + media_movel.shape[1]] = remover_sazonalidade(
+        valores[:, meio:meio + media_movel.shape[1]], media_movel, aditivo_coluna
+    )
+    fatores = _normalizar_fatores(np.nanmean(razao.reshape(n_series, k, L), axis=1), aditivo_coluna)
+
+    dessazonalizada = remover_sazonalidade(valores, np.tile(fatores, k), aditivo_coluna)
+    nivel, tendencia = _reta(dessazonalizada, L - 1)
+    return nivel, tendencia, fatores
+
+
+def _inicializar_minimos_quadrados(dados, L, aditivo, ciclos):
+    n_series, n = dados.shape
+    m = n if ciclos is None else min(n, ciclos * L)
+    valores = dados[:, :m]
+    aditivo_coluna = aditivo if isinstance(aditivo, bool) else aditivo[:, np.newaxis]
+
+    # Colunas: constante, tempo e efeitos dos meses 0..L-2 (o mês L-1 é menos a soma dos demais)
+    t = np.arange(m)
+    efeitos = (t[:, np.newaxis] % L == np.arange(L - 1)).astype(np.float64)
+    efeitos[t % L == L - 1] = -1.0
+    desenho = np.column_stack([np.ones(m), t, efeitos])
+    # O desenho é o mesmo para todas as séries: uma só solução com várias colunas de resposta
+    coeficientes = np.linalg.lstsq(desenho, valores.T, rcond=None)[0]
+    constante, tendencia = coeficientes[0], coeficientes[1]
+
+    fatores_aditivos = np.column_stack([coeficientes[2:].T, -coeficientes[2:].sum(axis=0)])
+    reta = constante[:, np.newaxis] + tendencia[:, np.newaxis] * t
+    with np.errstate(divide="ignore", invalid="ignore"):
+        razao = valores / reta
+    # Completa o último ciclo com NaN para tirar a média por mês com um reshape
+    razao = np.column_stack([razao, np.full((n_series, -m % L), np.nan)]).reshape(n_series, -1, L)
+    fatores_multiplicativos = np.nanmean(razao, axis=1)
+    fatores = np.where(aditivo_coluna, fatores_aditivos, _normalizar_fatores(fatores_multiplicativos, False))
+    return constante + tendencia * (L - 1), tendencia, fatores
+
+
+def estado_inicial_lote(dados, L, aditivo=False, inicializacao="primeiro_ciclo"):
+    """
+    Estado inicial a partir de uma estratégia (nome de ``INICIALIZACOES``) ou de um estado
+    já calculado (ex: ``otimizacao.otimizar_estado_inicial``), que é copiado.
+
+    :return: tupla (nivel, tendencia, fatores_sazonais), como ``inicializar_lote``
+    """
+    if isinstance(inicializacao, str):
+        return inicializar_lote(dados, L, aditivo, inicializacao)
+    nivel, tendencia, fatores_sazonais = inicializacao
+    return (np.array(nivel, dtype=np.float64), np.array(tendencia, dtype=np.float64),
+            np.array(fatores_sazonais, dtype=np.float64))
+
+
+def atualizar_lote(nivel, tendencia, fatores_sazonais, coluna, valor_atual, alpha, beta, gamma, phi=1.0, aditivo=False):
+    """
+    Um passo da recursão para todas as séries: incorpora ``valor_atual`` ao estado.
+
+    :param nivel: vetor com o nível de cada série
+    :param tendencia: vetor com a tendência de cada série
+    :param fatores_sazonais: buffer circular (séries x L); a coluna ``coluna`` é sobrescrita
+    :param coluna: coluna do buffer correspondente a esta observação (t % L)
+    :param valor_atual: vetor com a observação de cada série
+    :param phi: amortecimento da tendência (1 = tendência sem amortecimento)
+    :param aditivo: indicador de ``como_indicador_aditivo``
+    :return: tupla (nivel, tendencia, fator_sazonal_anterior) já atualizados; o fator
+        anterior é o que foi usado neste passo
+
+    Uma observação ausente (NaN) é trocada pela previsão de 1 passo: o nível segue a
+    tendência, a tendência é amortecida e o fator sazonal fica como estava.
+    """
+    fator_sazonal_anterior = fatores_sazonais[:, coluna].copy()
+    tendencia_amortecida = phi * tendencia
+
+    faltantes = np.isnan(valor_atual)
+    if faltantes.any():
+        previsto = aplicar_sazonalidade(nivel + tendencia_amortecida, fator_sazonal_anterior, aditivo)
+        valor_atual = np.where(faltantes, previsto, valor_atual)
+
+    nivel_atual = alpha * remover_sazonalidade(valor_atual, fator_sazonal_anterior, aditivo) + (1 - alpha) * (nivel + tendencia_amortecida)
+    tendencia = beta * (nivel_atual - nivel) + (1 - beta) * tendencia_amortecida
+    fatores_sazonais[:, coluna] = gamma * remover_sazonalidade(valor_atual, nivel_atual, aditivo) + (1 - gamma) * fator_sazonal_anterior
+    return nivel_atual, tendencia, fator_sazonal_anterior
+
+
+def prever_lote(nivel, tendencia, fatores_sazonais, h, posicao=0, phi=1.0, aditivo=False):
+    """
+    Previsão de h passos à frente para várias séries a partir do estado final da recursão.
+
+    Todos os passos do horizonte são calculados de uma vez: (nivel + k * tendencia) para
+    k = 1..h é uma única operação sobre a matriz de saída, e o fator sazonal de cada passo
+    vem do último ciclo conhecido com índice modular, de modo que horizontes maiores que
+    um ciclo (h > L) repetem o ciclo em vez de sair do buffer. Com amortecimento, k é
+    substituído por phi + phi² + ... + phi^k.
+
+    :param nivel: vetor com o nível de cada série
+    :param tendencia: vetor com a tendência de cada série
+    :param fatores_sazonais: matriz (séries x L) com o buffer circular dos fatores
+    :param h: número de passos à frente para prever
+    :param posicao: coluna do buffer correspondente à próxima observação
+    :param phi: amortecimento da tendência; escalar ou um valor por série
+    :param aditivo: indicador de ``como_indicador_aditivo``
+    :return: matriz (séries x h) com as previsões
+    """
+    L = fatores_sazonais.shape[1]
+    colunas = (posicao + np.arange(h)) % L
+
+    # Os passos seguem o tipo do estado, para que um estado float32 dê uma previsão float32
+    phi = np.asarray(phi, dtype=nivel.dtype)
+    passos = np.arange(1, h + 1, dtype=nivel.dtype)
+    if np.any(phi != 1):
+        phi_coluna = phi[:, np.newaxis] if phi.ndim else phi
+        passos = np.cumsum(phi_coluna ** passos, axis=-1)
+
+    previsao = np.multiply(tendencia[:, np.newaxis], passos)
+    previsao += nivel[:, np.newaxis]
+    if aditivo is True:
+        previsao += fatores_sazonais[:, colunas]
+    elif aditivo is False:
+        previsao *= fatores_sazonais[:, colunas]
+    else:
+        previsao = aplicar_sazonalidade(previsao, fatores_sazonais[:, colunas], aditivo[:, np.newaxis])
+    return previsao
+
+
+def holt_winters_lote(series, L, alpha, beta, gamma, h, phi=1.0, sazonalidade="multiplicativa", usar_jit=None,
+                      inicializacao="primeiro_ciclo", limite_huber=None, dtype=np.float64):
+    """
+    Holt-Winters vetorizado para várias séries de uma vez, nas variantes multiplicativa ou
+    aditiva e com tendência opcionalmente amortecida.
+
+    Cada linha de ``series`` é uma série temporal. Nível, tendência e fatores sazonais de
+    todas as séries avançam juntos a cada passo de tempo com operações do NumPy, de modo
+    que o único laço em Python é o laço sobre o tempo. A variante e o amortecimento podem
+    mudar de uma série para outra no mesmo lote.
+
+    Valores ausentes (NaN) são atravessados pela previsão de 1 passo, sem pré-processamento.
+    Com ``limite_huber``, picos são cortados dentro da recursão: o desvio de cada observação
+    em relação à previsão de 1 passo fica limitado a ``limite_huber`` vezes uma escala
+    robusta dos erros, atualizada a cada passo (``limitar_observacao``).
+
+    Com ``dtype=np.float32``, dados, estado, valores ajustados e previsão ficam em precisão
+    simples, com metade da memória. O núcleo compilado lê e grava em float32, mas faz as
+    contas de cada passo em float64; o laço em NumPy faz tudo em float32. A comparação de
+    precisão com float64 está no README.
+
+    :param series: matriz (séries x tempo) ou uma única série; todas com o mesmo comprimento
+    :param L: comprimento do período sazonal (ex: 12 para dados mensais)
+    :param alpha: suavização do nível; escalar ou um valor por série (0 < alpha < 1)
+    :param beta: suavização da tendência; escalar ou um valor por série (0 < beta < 1)
+    :param gamma: suavização da sazonalidade; escalar ou um valor por série (0 < gamma < 1)
+    :param h: número de passos à frente para prever
+    :param phi: amortecimento da tendência (0 < phi <= 1; 1 = sem amortecimento); escalar ou
+        um valor por série
+    :param sazonalidade: "multiplicativa", "aditiva" ou um vetor com uma delas por série
+    :param usar_jit: True usa o núcleo de ``nucleo_jit``, False usa NumPy; None escolhe o
+        núcleo compilado quando o Numba estiver instalado
+    :param inicializacao: estratégia de ``inicializar_lote`` ou um estado inicial já
+        calculado (nivel, tendencia, fatores_sazonais)
+    :param limite_huber: corte dos desvios em número de escalas (ex: 2.5); None não corta
+    :param dtype: np.float64 (padrão) ou np.float32
+    :return: tupla (previsao, ajustados) com formas (séries x h) e (séries x (n - L)); se
+        ``series`` for uma única série, os vetores retornados também são 1-D
+    """
+    dados = np.asarray(series, dtype=dtype)
+    serie_unica = dados.ndim == 1
+    if serie_unica:
+        dados = dados[np.newaxis, :]
+    if dados.ndim != 2:
+        raise ValueError("As séries devem ser fornecidas como uma matriz (séries x tempo).")
+
+    n_series, n = dados.shape
+
+    # 1. Verificação inicial
+    if n < L:
+        raise ValueError("A série temporal precisa ter pelo menos um ciclo sazonal completo (L).")
+
+    alpha = _como_vetor(alpha, n_series, "alpha", dtype)
+    beta = _como_vetor(beta, n_series, "beta", dtype)
+    gamma = _como_vetor(gamma, n_series, "gamma", dtype)
+    phi = _como_vetor(phi, n_series, "phi", dtype)
+    aditivo = como_indicador_aditivo(sazonalidade, None if isinstance(sazonalidade, str) else n_series)
+
+    # 2. Inicialização (por padrão, as mesmas regras da versão escalar, aplicadas a todas as linhas)
+    with etapa("inicializacao", itens=n_series):
+        estado = estado_inicial_lote(dados, L, aditivo, inicializacao)
+        nivel, tendencia, fatores_sazonais = (componente.astype(dtype, copy=False) for componente in estado)
+        escala = None if limite_huber is None else escala_inicial_lote(dados, L).astype(dtype)
+
+    if usar_jit is None:
+        usar_jit = nucleo_jit.JIT_DISPONIVEL
+    if usar_jit:
+        with etapa("recursao", itens=n_series * (n - L)):
+            previsao, ajustados = nucleo_jit.recursao_lote_jit(
+                dados, L, alpha, beta, gamma, h, phi, np.broadcast_to(aditivo, (n_series,)),
+                nivel, tendencia, fatores_sazonais, limite_huber, escala
+            )
+        if serie_unica:
+            return previsao[0], ajustados[0]
+        return previsao, ajustados
+
+    ajustados = np.empty((n_series, n - L), dtype=dtype)
+
+    # 3. Laço sobre o tempo; cada passo atualiza todas as séries de uma vez
+    with etapa("recursao", itens=n_series * (n - L)):
+        for t in range(L, n):
+            valor_atual = dados[:, t]
+            if limite_huber is not None:
+                previsto = aplicar_sazonalidade(nivel + phi * tendencia, fatores_sazonais[:, t % L], aditivo)
+                valor_atual, escala = limitar_observacao(valor_atual, previsto, escala, limite_huber)
+
+            nivel, tendencia, fator_sazonal_anterior = atualizar_lote(
+                nivel, tendencia, fatores_sazonais, t % L, valor_atual, alpha, beta, gamma, phi, aditivo
+            )
+
+            # Valor ajustado (previsão de 1 passo)
+            ajustados[:, t - L] = aplicar_sazonalidade(nivel + phi * tendencia, fator_sazonal_anterior, aditivo)
+
+    # 4. Previsão para h passos à frente (a próxima observação usa a coluna n % L do buffer)
+    with etapa("previsao", itens=n_series * h):
+        previsao = prever_lote(nivel, tendencia, fatores_sazonais, h, posicao=n % L, phi=phi, aditivo=aditivo)
+
+    if serie_unica:
+        return previsao[0], ajustados[0]
+    return previsao, ajustados
+
+
+def holt_winters_multiplicativo_lote(series, L, alpha, beta, gamma, h, usar_jit=None):
+    """
+    Versão vetorizada do Holt-Winters Multiplicativo que processa várias séries de uma vez.
+
+    O resultado coincide com o de ``holt_winters_multiplicativo`` (Holt_winters.py) série a
+    série. É ``holt_winters_lote`` com sazonalidade multiplicativa e sem amortecimento.
+
+    :param series: matriz (séries x tempo) ou uma única série; todas com o mesmo comprimento
+    :param L: comprimento do período sazonal (ex: 12 para dados mensais)
+    :param alpha: suavização do nível; escalar ou um valor por série (0 < alpha < 1)
+    :param beta: suavização da tendência; escalar ou um valor por série (0 < beta < 1)
+    :param gamma: suavização da sazonalidade; escalar ou um valor por série (0 < gamma < 1)
+    :param h: número de passos à frente para prever
+    :param usar_jit: True usa o núcleo de ``nucleo_jit``, False usa NumPy; None escolhe o
+        núcleo compilado quando o Numba estiver instalado
+    :return: tupla (previsao, ajustados) com formas (séries x h) e (séries x (n - L)); se
+        ``series`` for uma única série, os vetores retornados também são 1-D
+    """
+    return holt_winters_lote(series, L, alpha, beta, gamma, h, usar_jit=usar_jit)
@@ -0,0 +1,171 @@
+"""
+Cronômetros por etapa, contadores e perfis sob demanda para as execuções de previsão.
+
+Desligada (o padrão), a instrumentação custa uma verificação de atributo por chamada: as
+funções do motor chamam ``etapa``/``contar`` uma vez por lote, nunca por passo de tempo.
+Para ligar, use ``ativar()`` ou a variável de ambiente ``PREVISAO_INSTRUMENTACAO=1``.
+
+Uso::
+
+    import instrumentacao
+
+    instrumentacao.ativar()
+    with instrumentacao.etapa("recursao", itens=dados.size):
+        ...
+    instrumentacao.contar("cache_acertos")
+    print(instrumentacao.INSTRUMENTACAO.para_prometheus())
+
+    with instrumentacao.perfilar("execucao.prof", memoria=True):
+        ...
+"""
+import json
+import os
+import re
+import time
+from contextlib import contextmanager, nullcontext
+
+
+_NULO = nullcontext()
+
+
+class _Etapa:
+    # Contexto que acumula o tempo de uma etapa no registro ao sair
+    __slots__ = ("registro", "nome", "itens", "inicio")
+
+    def __init__(self, registro, nome, itens):
+        self.registro = registro
+        self.nome = nome
+        self.itens = itens
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excecao):
+        duracao = time.perf_counter() - self.inicio
+        acumulado = self.registro.etapas.get(self.nome)
+        if acumulado is None:
+            self.registro.etapas[self.nome] = [1, duracao, duracao, self.itens]
+        else:
+            acumulado[0] += 1
+            acumulado[1] += duracao
+            acumulado[2] = max(acumulado[2], duracao)
+            acumulado[3] += self.itens
+
+
+class Instrumentacao:
+    """
+    Registro de etapas (chamadas, tempo total, maior tempo, itens processados) e contadores.
+    """
+
+    def __init__(self, ativo=False):
+        self.ativo = ativo
+        self.etapas = {}
+        self.contadores = {}
+
+    def etapa(self, nome, itens=0):
+        """
+        Contexto que cronometra uma etapa; ``itens`` (séries, passos, ...) entra no cálculo
+        da vazão da etapa.
+        """
+        if not self.ativo:
+            return _NULO
+        return _Etapa(self, nome, itens)
+
+    def contar(self, nome, quantidade=1):
+        if self.ativo:
+            self.contadores[nome] = self.contadores.get(nome, 0) + quantidade
+
+    def zerar(self):
+        self.etapas.clear()
+        self.contadores.clear()
+
+    def resumo(self):
+        """
+        Dicionário com as etapas (incluindo itens por segundo) e os contadores.
+        """
+        etapas = {}
+        for nome, (chamadas, segundos, maximo, itens) in self.etapas.items():
+            etapas[nome] = {"chamadas": chamadas, "segundos": segundos, "maximo_segundos": maximo, "itens": itens,
+                            "itens_por_segundo": itens / segundos if segundos > 0 else 0.0}
+        return {"etapas": etapas, "contadores": dict(self.contadores)}
+
+    def para_json(self):
+        return json.dumps(self.resumo(), ensure_ascii=False, indent=2)
+
+    def para_prometheus(self, prefixo="previsao"):
+        """
+        Resumo no formato de texto do Prometheus (uma métrica por etapa, com rótulo ``etapa``).
+        """
+        linhas = []
+        series = [
+            ("etapa_segundos_total", "counter", "Tempo acumulado em cada etapa.", 1),
+            ("etapa_chamadas_total", "counter", "Número de execuções de cada etapa.", 0),
+            ("etapa_itens_total", "counter", "Itens processados em cada etapa.", 3),
+            ("etapa_maximo_segundos", "gauge", "Maior duração de uma execução da etapa.", 2),
+        ]
+        for nome, tipo, ajuda, indice in series:
+            linhas += [f"# HELP {prefixo}_{nome} {ajuda}", f"# TYPE {prefixo}_{nome} {tipo}"]
+            linhas += [f'{prefixo}_{nome}{{etapa="{etapa}"}} {valores[indice]}' for etapa, valores in self.etapas.items()]
+        for nome, valor in self.contadores.items():
+            metrica = f"{prefixo}_{re.sub(r'[^a-zA-Z0-9_]', '_', nome)}_total"
+            linhas += [f"# TYPE {metrica} counter", f"{metrica} {valor}"]
+        return "\n".join(linhas) + "\n"
+
+    def exportar(self, caminho):
+        """
+        Grava o resumo em ``caminho``: texto do Prometheus para .prom/.txt, JSON nos demais casos.
+        """
+        texto = self.para_prometheus() if caminho.endswith((".prom", ".txt")) else self.para_json()
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto)
+
+
+# Registro usado pelo motor de previsão
+INSTRUMENTACAO = Instrumentacao(ativo=os.environ.get("PREVISAO_INSTRUMENTACAO", "") not in ("", "0"))
+
+
+def ativar():
+    INSTRUMENTACAO.ativo = True
+
+
+def desativar():
+    INSTRUMENTACAO.ativo = False
+
+
+def etapa(nome, itens=0):
+    return INSTRUMENTACAO.etapa(nome, itens)
+
+
+def contar(nome, quantidade=1):
+    if INSTRUMENTACAO.ativo:
+        INSTRUMENTACAO.contar(nome, quantidade)
+
+
+@contextmanager
+def perfilar(caminho, memoria=False, linhas_memoria=25):
+    """
+    Perfil de uma execução: grava as estatísticas do cProfile em ``caminho`` (para
+    ``pstats``/snakeviz) e, se ``memoria`` for True, as linhas que mais alocaram memória
+    (``tracemalloc``) em ``caminho + ".memoria.txt"``.
+    """
+    import cProfile
+    import tracemalloc
+
+    perfil = cProfile.Profile()
+    if memoria:
+        tracemalloc.start()
+    perfil.enable()
+    try:
+        yield perfil
+    finally:
+        perfil.disable()
+        perfil.dump_stats(caminho)
+        if memoria:
+            foto = tracemalloc.take_snapshot()
+            atual, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            with open(caminho + ".memoria.txt", "w", encoding="utf-8") as arquivo:
+                arquivo.write(f"Memória alocada ao final: {atual / 2**20:.1f} MB; pico: {pico / 2**20:.1f} MB\n")
+                for estatistica in foto.statistics("lineno")[:linhas_memoria]:
+                    arquivo.write(f"{estatistica}\n")
@@ -0,0 +1,195 @@
+from collections import namedtuple
+
+import numpy as np
+
+from holt_winters_lote import (
+    aplicar_sazonalidade, atualizar_lote, como_indicador_aditivo, inicializar_lote, prever_lote,
+)
+from otimizacao import ajustar_parametros
+
+
+# quantis: níveis pedidos; valores: matriz (quantis x séries x h); previsao: previsão pontual (séries x h)
+IntervalosPrevisao = namedtuple("IntervalosPrevisao", ["quantis", "valores", "previsao"])
+
+# Memória usada pelos caminhos simulados de um bloco de séries (bytes)
+MEMORIA_BLOCO_PADRAO = 256 * 2**20
+
+
+def _residuos_um_passo(dados, L, alpha, beta, gamma, phi, aditivo):
+    """
+    Percorre a série guardando o erro de previsão de 1 passo de cada instante.
+
+    O erro é relativo (valor / previsto - 1) no modelo multiplicativo e absoluto
+    (valor - previsto) no aditivo, para que possa ser reaplicado a qualquer nível futuro.
+
+    :return: tupla (nivel, tendencia, fatores_sazonais, residuos), com o estado ao final da
+        série e os resíduos em uma matriz (séries x (n - L))
+    """
+    n_series, n = dados.shape
+    nivel, tendencia, fatores_sazonais = inicializar_lote(dados, L, aditivo)
+    residuos = np.empty((n_series, n - L))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for t in range(L, n):
+            previsto = aplicar_sazonalidade(nivel + phi * tendencia, fatores_sazonais[:, t % L], aditivo)
+            residuos[:, t - L] = np.where(aditivo, dados[:, t] - previsto, dados[:, t] / previsto - 1)
+            nivel, tendencia, _ = atualizar_lote(
+                nivel, tendencia, fatores_sazonais, t % L, dados[:, t], alpha, beta, gamma, phi, aditivo
+            )
+    return nivel, tendencia, fatores_sazonais, residuos
+
+
+def _simular_bloco(dados, L, h, alpha, beta, gamma, phi, aditivo, n_caminhos, quantis, gerador):
+    """
+    Simula ``n_caminhos`` trajetórias futuras para cada série do bloco e resume nos quantis.
+
+    Caminhos e séries são achatados em linhas (caminho-major), de modo que a recursão de
+    ``holt_winters_lote`` avança todas as trajetórias de uma vez a cada passo do horizonte.
+    Em cada passo, um resíduo histórico da própria série é sorteado com reposição e
+    aplicado à previsão de 1 passo, e o valor simulado realimenta o estado.
+    """
+    n_series, n = dados.shape
+    nivel, tendencia, fatores_sazonais, residuos = _residuos_um_passo(dados, L, alpha, beta, gamma, phi, aditivo)
+    previsao = prever_lote(nivel, tendencia, fatores_sazonais, h, posicao=n % L, phi=phi, aditivo=aditivo)
+
+    # Resíduos inválidos (série com zeros, divergência) não são sorteados
+    validos = np.isfinite(residuos)
+    n_validos = validos.sum(axis=1)
+    residuos = np.where(validos, residuos, 0.0)
+    ordem = np.argsort(~validos, axis=1, kind="stable")
+    residuos = np.take_along_axis(residuos, ordem, axis=1)
+
+    def repetir(valor):
+        return np.tile(np.broadcast_to(valor, (n_series,)), n_caminhos)
+
+    nivel, tendencia = repetir(nivel), repetir(tendencia)
+    fatores_sazonais = np.tile(fatores_sazonais, (n_caminhos, 1))
+    alpha, beta, gamma, phi = repetir(alpha), repetir(beta), repetir(gamma), repetir(phi)
+    aditivo_linhas = repetir(aditivo) if not isinstance(aditivo, bool) else aditivo
+
+    linhas_serie = np.arange(n_series)
+    caminhos = np.empty((n_caminhos * n_series, h))
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for k in range(h):
+            coluna = (n + k) % L
+            previsto = aplicar_sazonalidade(nivel + phi * tendencia, fatores_sazonais[:, coluna], aditivo_linhas)
+
+            sorteio = (gerador.random((n_caminhos, n_series)) * np.maximum(n_validos, 1)).astype(np.intp)
+            erro = residuos[linhas_serie, sorteio].ravel()
+            valor = np.where(aditivo_linhas, previsto + erro, previsto * (1 + erro))
+
+            caminhos[:, k] = valor
+            nivel, tendencia, _ = atualizar_lote(
+                nivel, tendencia, fatores_sazonais, coluna, valor, alpha, beta, gamma, phi, aditivo_linhas
+            )
+
+    valores = np.quantile(caminhos.reshape(n_caminhos, n_series, h), quantis, axis=0)
+    return valores, previsao
+
+
+def intervalos_em_blocos(series, L, h, alpha, beta, gamma, phi=1.0, sazonalidade="multiplicativa",
+                         n_caminhos=10000, quantis=(0.1, 0.5, 0.9), memoria_bloco=MEMORIA_BLOCO_PADRAO,
+                         semente=None):
+    """
+    Gera os quantis da previsão bloco a bloco de séries.
+
+    O tamanho do bloco é escolhido para que os caminhos simulados de um bloco, junto com a
+    cópia que ``np.quantile`` faz deles, ocupem no máximo ``memoria_bloco`` bytes; os caminhos de um bloco são descartados assim que seus
+    quantis são calculados, então a memória não cresce com o número de séries.
+
+    :param series: matriz (séries x tempo)
+    :param alpha: escalar ou um valor por série (idem para beta, gamma e phi)
+    :param sazonalidade: "multiplicativa", "aditiva" ou um vetor com uma delas por série
+    :return: gerador de tuplas (primeira, valores, previsao), em que ``valores`` tem forma
+        (quantis x séries do bloco x h) e ``primeira`` é o índice da primeira série do bloco
+    """
+    dados = np.asarray(series, dtype=np.float64)
+    n_series, n = dados.shape
+    if n <= L:
+        raise ValueError("A série temporal precisa ter mais de um ciclo sazonal completo (L) para gerar resíduos.")
+
+    alpha, beta, gamma, phi = (
+        np.broadcast_to(np.asarray(p, dtype=np.float64), (n_series,)) for p in (alpha, beta, gamma, phi)
+    )
+    aditivo = np.broadcast_to(como_indicador_aditivo(sazonalidade, None if isinstance(sazonalidade, str) else n_series),
+                              (n_series,))
+    quantis = np.asarray(quantis, dtype=np.float64)
+    gerador = np.random.default_rng(semente)
+
+    # Por linha simulada, em float64: os caminhos, a cópia que np.quantile ordena (do mesmo
+    # tamanho), o buffer sazonal e o estado e os temporários de cada passo (sorteio, erro, ...)
+    bytes_por_serie = n_caminhos * (2 * h + L + 16) * 8
+    tamanho_bloco = max(1, memoria_bloco // bytes_por_serie)
+
+    for primeira in range(0, n_series, tamanho_bloco):
+        fatia = slice(primeira, primeira + tamanho_bloco)
+        aditivo_bloco = aditivo[fatia]
+        if aditivo_bloco.all() or not aditivo_bloco.any():
+            aditivo_bloco = bool(aditivo_bloco[0])
+        valores, previsao = _simular_bloco(
+            dados[fatia], L, h, alpha[fatia], beta[fatia], gamma[fatia], phi[fatia], aditivo_bloco,
+            n_caminhos, quantis, gerador
+        )
+        yield primeira, valores, previsao
+
+
+def prever_intervalos(series, L, h, alpha=None, beta=None, gamma=None, phi=1.0, sazonalidade="multiplicativa",
+                      n_caminhos=10000, quantis=(0.1, 0.5, 0.9), metrica="sse", memoria_bloco=MEMORIA_BLOCO_PADRAO,
+                      semente=None):
+    """
+    Previsão com intervalos (ex: P10/P50/P90) por simulação a partir dos resíduos do ajuste.
+
+    Para cada série são simuladas ``n_caminhos`` trajetórias dos próximos h meses sorteando
+    os erros de previsão de 1 passo do histórico (bootstrap) e realimentando a recursão com
+    os valores simulados, de modo que a incerteza se acumula ao longo do horizonte.
+
+    :param series: matriz (séries x tempo) ou uma única série
+    :param L: comprimento do período sazonal
+    :param h: número de passos à frente para prever
+    :param alpha: se alpha, beta e gamma forem None, os parâmetros de cada série são
+        ajustados com ``ajustar_parametros``
+    :param beta: ver alpha
+    :param gamma: ver alpha
+    :param phi: amortecimento da tendência; escalar ou um valor por série
+    :param sazonalidade: "multiplicativa", "aditiva" ou um vetor com uma delas por série
+    :param n_caminhos: número de trajetórias simuladas por série
+    :param quantis: níveis dos quantis, entre 0 e 1
+    :param metrica: métrica usada no ajuste ("sse" ou "mape")
+    :param memoria_bloco: memória máxima (bytes) usada pelos caminhos de um bloco de séries
+    :param semente: semente do gerador aleatório, para resultados reproduzíveis
+    :return: IntervalosPrevisao; com uma única série, ``valores`` tem forma (quantis x h) e
+        ``previsao`` forma (h,)
+    """
+    dados = np.asarray(series, dtype=np.float64)
+    serie_unica = dados.ndim == 1
+    if serie_unica:
+        dados = dados[np.newaxis, :]
+    n_series = dados.shape[0]
+
+    if alpha is None:
+        parametros = ajustar_parametros(dados, L, metrica=metrica, phi=phi, sazonalidade=sazonalidade)
+        alpha, beta, gamma = parametros.alpha, parametros.beta, parametros.gamma
+
+    valores = np.empty((len(quantis), n_series, h))
+    previsao = np.empty((n_series, h))
+    for primeira, valores_bloco, previsao_bloco in intervalos_em_blocos(
+        dados, L, h, alpha, beta, gamma, phi, sazonalidade, n_caminhos, quantis, memoria_bloco, semente
+    ):
+        ultima = primeira + previsao_bloco.shape[0]
+        valores[:, primeira:ultima] = valores_bloco
+        previsao[primeira:ultima] = previsao_bloco
+
+    if serie_unica:
+        return IntervalosPrevisao(tuple(quantis), valores[:, 0], previsao[0])
+    return IntervalosPrevisao(tuple(quantis), valores, previsao)
+
+
+if __name__ == "__main__":
+    from dados_regionais import carregar_consumo_regional
+
+    consumo = carregar_consumo_regional()
+    intervalos = prever_intervalos(list(consumo.values()), L=12, h=12, semente=0)
+    for k, regiao in enumerate(consumo):
+        p10, p50, p90 = intervalos.valores[:, k, 0]
+        print(f"{regiao} (próximo mês): P10={p10:,.0f}  P50={p50:,.0f}  P90={p90:,.0f}  "
+              f"pontual={intervalos.previsao[k, 0]:,.0f}")
@@ -0,0 +1,134 @@
+import numpy as np
+
+from instrumentacao import etapa
+
+
+# Métricas calculadas por ``calcular_metricas``
+METRICAS = ("mape", "smape", "mae", "rmse", "vies", "mase")
+
+
+def _como_matrizes(previsto, real, dtype=np.float64):
+    previsto = np.asarray(previsto, dtype=dtype)
+    real = np.asarray(real, dtype=dtype)
+    if previsto.shape != real.shape:
+        raise ValueError("Os valores previstos e reais precisam ter a mesma forma (séries x horizonte).")
+    return previsto, real
+
+
+def _media(valores, eixo):
+    # Média que ignora as posições marcadas com NaN (ex: valor real igual a zero no MAPE)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        validos = ~np.isnan(valores)
+        soma = np.where(validos, valores, 0.0).sum(axis=eixo)
+        return soma / validos.sum(axis=eixo, dtype=valores.dtype)
+
+
+def _media_presentes(valores, presentes, eixo):
+    # Média só sobre as posições com valor real conhecido; um NaN em outra posição (previsão
+    # que divergiu) continua aparecendo no resultado
+    with np.errstate(invalid="ignore", divide="ignore"):
+        soma = np.where(presentes, valores, valores.dtype.type(0)).sum(axis=eixo)
+        return soma / presentes.sum(axis=eixo, dtype=valores.dtype)
+
+
+def erro_relativo(previsto, real, dtype=np.float64):
+    """
+    Erro relativo |previsto - real| / |real| de cada posição, para matrizes inteiras.
+
+    Versão vetorizada de ``erro_relativo``/``lista_de_erros`` de Comparação.py. Posições com
+    valor real igual a zero não têm erro relativo definido e recebem NaN.
+
+    :param previsto: valores previstos (qualquer forma)
+    :param real: valores reais, com a mesma forma
+    :param dtype: np.float64 (padrão) ou np.float32
+    :return: matriz com os erros relativos
+    """
+    previsto, real = _como_matrizes(previsto, real, dtype)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        erro = np.abs(previsto - real) / np.abs(real)
+    erro[real == 0] = np.nan
+    return erro
+
+
+def escala_mase(historico, L=1, dtype=np.float64):
+    """
+    Escala do MASE: erro absoluto médio da previsão ingênua sazonal no histórico de cada série.
+
+    :param historico: matriz (séries x tempo) com os dados usados no ajuste; pares com valor
+        ausente (NaN) ficam fora da média
+    :param L: período sazonal da previsão ingênua (1 = ingênua simples)
+    :param dtype: np.float64 (padrão) ou np.float32
+    :return: vetor com a escala de cada série
+    """
+    historico = np.asarray(historico, dtype=dtype)
+    if historico.shape[-1] <= L:
+        raise ValueError("O histórico precisa ter mais de L observações para calcular a escala do MASE.")
+    erro_ingenuo = np.abs(historico[..., L:] - historico[..., :-L])
+    if np.isnan(erro_ingenuo).any():
+        return _media(erro_ingenuo, -1)
+    return erro_ingenuo.mean(axis=-1)
+
+
+def calcular_metricas(previsto, real, historico=None, L=1, eixo=-1, escala=None, dtype=np.float64):
+    """
+    Calcula MAPE, sMAPE, MAE, RMSE, MASE e viés de uma só vez sobre matrizes (séries x horizonte).
+
+    A diferença e o erro absoluto são calculados uma única vez e reaproveitados por todas as
+    métricas. Tratamento de zeros: no MAPE as posições com valor real zero são ignoradas; no
+    sMAPE, posições em que previsto e real são ambos zero contam como erro zero. Posições com
+    valor real ausente (NaN) ficam fora de todas as médias, como no ajuste do modelo; uma série
+    sem nenhum valor real recebe NaN.
+
+    Com ``dtype=np.float32`` todas as contas (e as métricas devolvidas) ficam em precisão
+    simples; as médias do NumPy somam aos pares, então o erro de arredondamento cresce pouco
+    com o horizonte.
+
+    :param previsto: valores previstos (séries x horizonte), ou uma única série
+    :param real: valores reais, com a mesma forma
+    :param historico: matriz (séries x tempo) usada no ajuste; necessária para o MASE
+    :param L: período sazonal da previsão ingênua usada na escala do MASE
+    :param eixo: -1 para uma métrica por série; None para um único valor agregado
+    :param escala: escala do MASE já calculada (forma de ``previsto`` sem o último eixo);
+        alternativa a ``historico``
+    :param dtype: np.float64 (padrão) ou np.float32
+    :return: dicionário {métrica: valor por série (ou agregado)}; o MASE é NaN sem histórico
+    """
+    previsto, real = _como_matrizes(previsto, real, dtype)
+
+    with etapa("metricas", itens=previsto.size):
+        presentes = ~np.isnan(real)
+        if presentes.all():
+            def media(valores):
+                return valores.mean(axis=eixo)
+        else:
+            def media(valores):
+                return _media_presentes(valores, presentes, eixo)
+
+        diferenca = previsto - real
+        erro_absoluto = np.abs(diferenca)
+        absoluto_real = np.abs(real)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            percentual = np.where(absoluto_real > 0, erro_absoluto / absoluto_real, np.nan)
+            denominador = np.abs(previsto) + absoluto_real
+            simetrico = np.where(denominador > 0, 2 * erro_absoluto / denominador, 0.0)
+
+        metricas = {
+            "mape": _media(percentual, eixo),
+            "smape": media(simetrico),
+            "mae": media(erro_absoluto),
+            "rmse": np.sqrt(media(diferenca * diferenca)),
+            "vies": media(diferenca),
+        }
+
+        if historico is not None:
+            escala = escala_mase(historico, L, dtype)
+        if escala is not None:
+            escala = np.asarray(escala, dtype=dtype)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                escalado = erro_absoluto / escala[..., np.newaxis]
+            metricas["mase"] = media(escalado)
+        else:
+            metricas["mase"] = metricas["mae"] * np.nan
+
+    return metricas
@@ -0,0 +1,240 @@
+"""
+Holt-Winters com vários períodos sazonais (ex: diário e semanal em dados horários ou de
+15 minutos), na forma do Holt-Winters duplamente sazonal de Taylor generalizada para
+qualquer número de períodos.
+
+Cada período tem o seu buffer circular de fatores (séries x período), com a mesma
+convenção de ``holt_winters_lote``: a coluna t % P guarda o fator do instante t - P. O
+estado de todas as séries avança junto, um passo de tempo por vez, e os dados são lidos em
+blocos de colunas, então anos de medições de milhares de alimentadores podem ser
+processados (até de um ``np.memmap``) sem carregar a matriz inteira nem guardar os valores
+ajustados.
+
+Uso::
+
+    previsao, estado = holt_winters_multisazonal(dados, (96, 672), 0.1, 0.01, (0.2, 0.1), h=96)
+    estado.atualizar(novas_medicoes)      # matriz (séries x novos instantes)
+    previsao = estado.prever(96)
+"""
+import numpy as np
+
+from holt_winters_lote import (
+    _como_vetor, _preencher_faltantes, aplicar_sazonalidade, como_indicador_aditivo, remover_sazonalidade,
+)
+from instrumentacao import etapa
+
+
+def _combinar(fatores, aditivo):
+    # Efeito conjunto dos fatores de todos os períodos: soma (aditivo) ou produto (multiplicativo)
+    if aditivo is True:
+        return sum(fatores)
+    produto = np.prod(fatores, axis=0)
+    if aditivo is False:
+        return produto
+    return np.where(aditivo, sum(fatores), produto)
+
+
+class EstadoMultiSazonalLote:
+    """
+    Estado do Holt-Winters multissazonal para um lote de séries, atualizado por blocos de
+    novas observações (``atualizar``) e usado para prever (``prever``).
+
+    :param periodos: comprimentos dos períodos sazonais, em ordem crescente
+    :param gammas: suavização de cada período; um escalar ou um vetor por série, para cada período
+    :param fatores: lista com o buffer circular (séries x período) de cada período
+    :param n_observacoes: quantas observações já entraram no estado (define a coluna de cada buffer)
+    """
+
+    def __init__(self, periodos, alpha, beta, gammas, nivel, tendencia, fatores, n_observacoes, phi=1.0,
+                 aditivo=False):
+        self.periodos = tuple(periodos)
+        self.alpha = alpha
+        self.beta = beta
+        self.gammas = gammas
+        self.nivel = nivel
+        self.tendencia = tendencia
+        self.fatores = fatores
+        self.n_observacoes = n_observacoes
+        self.phi = phi
+        self.aditivo = aditivo
+        self.sse = np.zeros(len(nivel))
+
+    @classmethod
+    def inicializar(cls, dados, periodos, alpha, beta, gammas, phi=1.0, sazonalidade="multiplicativa"):
+        """
+        Estado inicial a partir do início de cada série, por decomposição clássica.
+
+        O nível é a média do primeiro ciclo do maior período e a tendência vem da diferença
+        entre os dois primeiros ciclos (ou do primeiro ciclo, se houver só um). Os fatores
+        são estimados do menor para o maior período: os de cada período são a média, por
+        fase, do que sobra do primeiro ciclo depois de retirar o nível e os períodos
+        anteriores, normalizados para média 1 (ou 0, no modelo aditivo). Valores ausentes
+        nesse trecho são trocados pela média da mesma fase do menor período.
+
+        :param dados: matriz (séries x tempo) com pelo menos um ciclo do maior período; só
+            os dois primeiros ciclos são usados
+        :return: EstadoMultiSazonalLote que já consumiu o primeiro ciclo do maior período
+        """
+        periodos = tuple(int(p) for p in periodos)
+        if len(periodos) == 0 or len(gammas) != len(periodos):
+            raise ValueError("Informe um gamma para cada período sazonal.")
+        ordem = np.argsort(periodos, kind="stable")
+        periodos = tuple(periodos[i] for i in ordem)
+        gammas = [gammas[i] for i in ordem]
+        maior = periodos[-1]
+
+        n_series, n = dados.shape
+        if n < maior:
+            raise ValueError("A série temporal precisa ter pelo menos um ciclo completo do maior período sazonal.")
+        trecho = np.asarray(dados[:, :2 * maior], dtype=np.float64)
+        if np.isnan(trecho).any():
+            trecho = _preencher_faltantes(trecho, periodos[0])
+        primeiro = trecho[:, :maior]
+        nivel = primeiro.mean(axis=1)
+        if n >= 2 * maior:
+            tendencia = (trecho[:, maior:].mean(axis=1) - nivel) / maior
+        else:
+            tendencia = (primeiro[:, -1] - primeiro[:, 0]) / (maior - 1)
+
+        aditivo = como_indicador_aditivo(sazonalidade, None if isinstance(sazonalidade, str) else n_series)
+        aditivo_coluna = aditivo if isinstance(aditivo, bool) else aditivo[:, np.newaxis]
+        restante = remover_sazonalidade(primeiro, nivel[:, np.newaxis], aditivo_coluna)
+        fatores = []
+        for periodo in periodos:
+            ciclos = maior // periodo
+            fator = restante[:, :ciclos * periodo].reshape(n_series, ciclos, periodo).mean(axis=1)
+            fator = remover_sazonalidade(fator, fator.mean(axis=1, keepdims=True), aditivo_coluna)
+            fatores.append(fator)
+            restante = remover_sazonalidade(restante, fator[:, np.arange(maior) % periodo], aditivo_coluna)
+
+        return cls(periodos, _como_vetor(alpha, n_series, "alpha"), _como_vetor(beta, n_series, "beta"),
+                   [_como_vetor(g, n_series, "gamma") for g in gammas], nivel, tendencia, fatores, maior,
+                   _como_vetor(phi, n_series, "phi"), aditivo)
+
+    def atualizar(self, bloco, ajustados=False):
+        """
+        Incorpora um bloco de novas observações (séries x instantes) ao estado.
+
+        A soma dos quadrados dos erros de 1 passo fica acumulada em ``sse``. Valores ausentes
+        (NaN) são trocados pela previsão de 1 passo e não entram no ``sse``.
+
+        :param ajustados: se True, devolve a matriz (séries x instantes) dos valores ajustados
+            (previsões de 1 passo) do bloco
+        :return: os valores ajustados, ou None
+        """
+        # Instantes nas linhas: cada passo lê uma linha contígua
+        por_instante = np.ascontiguousarray(np.asarray(bloco, dtype=np.float64).T)
+        n_instantes = por_instante.shape[0]
+        saida = np.empty_like(por_instante) if ajustados else None
+        alpha, beta, gammas, phi, aditivo = self.alpha, self.beta, self.gammas, self.phi, self.aditivo
+        nivel, tendencia, sse = self.nivel, self.tendencia, self.sse
+
+        with etapa("recursao_multisazonal", itens=por_instante.size):
+            for j in range(n_instantes):
+                t = self.n_observacoes + j
+                valor_atual = por_instante[j]
+                colunas = [t % periodo for periodo in self.periodos]
+                anteriores = [fator[:, coluna] for fator, coluna in zip(self.fatores, colunas)]
+                combinado = _combinar(anteriores, aditivo)
+                tendencia_amortecida = phi * tendencia
+
+                ajustado = aplicar_sazonalidade(nivel + tendencia_amortecida, combinado, aditivo)
+                faltantes = np.isnan(valor_atual)
+                if faltantes.any():
+                    valor_atual = np.where(faltantes, ajustado, valor_atual)
+                sse += (valor_atual - ajustado) ** 2
+                if ajustados:
+                    saida[j] = ajustado
+
+                nivel_atual = (alpha * remover_sazonalidade(valor_atual, combinado, aditivo)
+                               + (1 - alpha) * (nivel + tendencia_amortecida))
+                tendencia = beta * (nivel_atual - nivel) + (1 - beta) * tendencia_amortecida
+                for fator, coluna, anterior, gamma in zip(self.fatores, colunas, anteriores, gammas):
+                    # Observação sem o nível e sem os demais períodos
+                    outros = remover_sazonalidade(combinado, anterior, aditivo)
+                    sem_outros = remover_sazonalidade(valor_atual, aplicar_sazonalidade(nivel_atual, outros, aditivo), aditivo)
+                    fator[:, coluna] = gamma * sem_outros + (1 - gamma) * anterior
+                nivel = nivel_atual
+
+        self.nivel, self.tendencia = nivel, tendencia
+        self.n_observacoes += n_instantes
+        return None if saida is None else saida.T
+
+    def prever(self, h):
+        """
+        Previsão de h passos à frente a partir do estado atual.
+
+        :return: matriz (séries x h)
+        """
+        passos = np.arange(1, h + 1, dtype=np.float64)
+        if np.any(self.phi != 1):
+            passos = np.cumsum(self.phi[:, np.newaxis] ** passos, axis=1)
+        base = self.nivel[:, np.newaxis] + self.tendencia[:, np.newaxis] * passos
+        instantes = self.n_observacoes + np.arange(h)
+        aditivo = self.aditivo if isinstance(self.aditivo, bool) else self.aditivo[:, np.newaxis]
+        combinado = _combinar([fator[:, instantes % periodo] for fator, periodo in zip(self.fatores, self.periodos)],
+                              aditivo)
+        return aplicar_sazonalidade(base, combinado, aditivo)
+
+
+def holt_winters_multisazonal(series, periodos, alpha, beta, gammas, h, phi=1.0, sazonalidade="multiplicativa",
+                              tamanho_bloco=2048):
+    """
+    Holt-Winters com vários períodos sazonais para várias séries de uma vez.
+
+    Os dados são percorridos em blocos de ``tamanho_bloco`` instantes; só o bloco atual e o
+    estado (nível, tendência e um buffer por período) ficam em memória. Com um único período
+    a previsão é a mesma de ``holt_winters_lote`` e o SSE o mesmo de ``erro_um_passo_lote``.
+
+    :param series: matriz (séries x tempo), ``np.memmap`` ou uma única série
+    :param periodos: comprimentos dos períodos sazonais, ex: (24, 168) para dados horários
+        ou (96, 672) para dados de 15 minutos
+    :param alpha: suavização do nível; escalar ou um valor por série
+    :param beta: suavização da tendência; escalar ou um valor por série
+    :param gammas: suavização de cada período (na ordem de ``periodos``); cada uma escalar
+        ou um valor por série
+    :param h: número de passos à frente para prever
+    :param phi: amortecimento da tendência (1 = sem amortecimento)
+    :param sazonalidade: "multiplicativa", "aditiva" ou um vetor com uma delas por série
+    :param tamanho_bloco: quantos instantes são lidos e processados por vez
+    :return: tupla (previsao, estado): matriz (séries x h) (vetor, para uma única série) e o
+        EstadoMultiSazonalLote final, com o SSE de 1 passo de cada série em ``estado.sse``
+    """
+    dados = np.asanyarray(series)
+    serie_unica = dados.ndim == 1
+    if serie_unica:
+        dados = dados[np.newaxis, :]
+
+    with etapa("inicializacao", itens=dados.shape[0]):
+        estado = EstadoMultiSazonalLote.inicializar(dados, periodos, alpha, beta, gammas, phi, sazonalidade)
+    for inicio in range(estado.n_observacoes, dados.shape[1], tamanho_bloco):
+        estado.atualizar(dados[:, inicio:inicio + tamanho_bloco])
+
+    previsao = estado.prever(h)
+    return (previsao[0] if serie_unica else previsao), estado
+
+
+if __name__ == "__main__":
+    import time
+
+    from holt_winters_lote import holt_winters_lote
+    from metricas import calcular_metricas
+
+    # Um ano de medições de 15 minutos de 1000 alimentadores com ciclos diário e semanal
+    rng = np.random.default_rng(0)
+    dia, semana = 96, 672
+    n_series, n, h = 1000, 365 * dia, dia
+    instantes = np.arange(n + h)
+    diario = 1 + 0.3 * np.sin(2 * np.pi * instantes / dia - rng.uniform(0, 1, (n_series, 1)))
+    semanal = np.where(instantes % semana < 5 * dia, 1.0, 0.8)
+    dados = (100 * rng.uniform(0.5, 2, (n_series, 1)) * diario * semanal
+             * (1 + 0.02 * rng.standard_normal((n_series, n + h))))
+
+    inicio = time.perf_counter()
+    previsao, estado = holt_winters_multisazonal(dados[:, :n], (dia, semana), 0.1, 0.01, (0.2, 0.2), h)
+    duracao = time.perf_counter() - inicio
+    previsao_simples, _ = holt_winters_lote(dados[:, :n], dia, 0.1, 0.01, 0.2, h)
+
+    print(f"{n_series} séries x {n} instantes em {duracao:.1f} s ({n_series * n / duracao:,.0f} pontos/s)")
+    print(f"MAPE do próximo dia, só sazonalidade diária:   {calcular_metricas(previsao_simples, dados[:, n:])['mape'].mean():.2%}")
+    print(f"MAPE do próximo dia, diária + semanal:         {calcular_metricas(previsao, dados[:, n:])['mape'].mean():.2%}")
@@ -0,0 +1,285 @@
+import math
+
+import numpy as np
+
+# O Numba é opcional: quando está instalado, os núcleos abaixo são compilados; sem ele,
+# as mesmas funções rodam como Python puro (sobre listas, como holt_winters_multiplicativo)
+try:
+    from numba import njit
+    JIT_DISPONIVEL = True
+except ImportError:
+    JIT_DISPONIVEL = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda funcao: funcao
+
+# Peso de cada novo resíduo (já limitado) na escala robusta usada pelo limite de Huber
+SUAVIZACAO_ESCALA = 0.1
+
+
+@njit(cache=True)
+def _inicializar(series, L, aditivo, fatores_sazonais):
+    # Mesmas regras de holt_winters_multiplicativo; preenche fatores_sazonais e retorna nível e tendência
+    n = len(series)
+    soma_primeiro_ciclo = 0.0
+    for i in range(L):
+        soma_primeiro_ciclo += series[i]
+    nivel = soma_primeiro_ciclo / L
+    if n >= 2 * L:
+        soma_segundo_ciclo = 0.0
+        for i in range(L, 2 * L):
+            soma_segundo_ciclo += series[i]
+        tendencia = (soma_segundo_ciclo - soma_primeiro_ciclo) / (L * L)
+    else:
+        tendencia = (series[L - 1] - series[0]) / (L - 1)
+    for i in range(L):
+        fatores_sazonais[i] = series[i] - nivel if aditivo else series[i] / nivel
+    return nivel, tendencia
+
+
+@njit(cache=True)
+def _observacao_efetiva(valor_atual, previsto, limite_huber, escala):
+    # Mesma regra de holt_winters_lote.limitar_observacao: ausente vira a previsão de 1 passo
+    # e, com limite_huber > 0, o desvio é cortado em limite_huber escalas; retorna (valor, escala)
+    if math.isnan(valor_atual):
+        return previsto, escala
+    if limite_huber > 0:
+        residuo = valor_atual - previsto
+        corte = limite_huber * escala
+        if residuo > corte:
+            residuo = corte
+        elif residuo < -corte:
+            residuo = -corte
+        if not math.isnan(residuo):
+            escala = math.sqrt((1 - SUAVIZACAO_ESCALA) * escala * escala + SUAVIZACAO_ESCALA * residuo * residuo)
+        return previsto + residuo, escala
+    return valor_atual, escala
+
+
+@njit(cache=True)
+def _recursao(series, L, alpha, beta, gamma, phi, aditivo, h, nivel, tendencia, fatores_sazonais, limite_huber, escala,
+              ajustados, previsao):
+    """
+    Núcleo do Holt-Winters (multiplicativo ou aditivo, com tendência amortecida por phi) para
+    uma série, a partir do estado inicial (nivel, tendencia e ``fatores_sazonais``, que é
+    atualizado no lugar); escreve em ``ajustados`` e ``previsao``.
+
+    Valores ausentes (NaN) são trocados pela previsão de 1 passo; com ``limite_huber`` > 0 o
+    desvio de cada observação é limitado a ``limite_huber`` vezes a ``escala`` robusta.
+    """
+    n = len(series)
+
+    for t in range(L, n):
+        coluna = t % L
+        fator_sazonal_anterior = fatores_sazonais[coluna]
+        tendencia_amortecida = phi * tendencia
+        valor_atual = series[t]
+        if limite_huber > 0 or math.isnan(valor_atual):
+            if aditivo:
+                previsto = (nivel + tendencia_amortecida) + fator_sazonal_anterior
+            else:
+                previsto = (nivel + tendencia_amortecida) * fator_sazonal_anterior
+            valor_atual, escala = _observacao_efetiva(valor_atual, previsto, limite_huber, escala)
+
+        if aditivo:
+            nivel_atual = alpha * (valor_atual - fator_sazonal_anterior) + (1 - alpha) * (nivel + tendencia_amortecida)
+        else:
+            nivel_atual = alpha * (valor_atual / fator_sazonal_anterior) + (1 - alpha) * (nivel + tendencia_amortecida)
+        tendencia = beta * (nivel_atual - nivel) + (1 - beta) * tendencia_amortecida
+        if aditivo:
+            fatores_sazonais[coluna] = gamma * (valor_atual - nivel_atual) + (1 - gamma) * fator_sazonal_anterior
+        else:
+            fatores_sazonais[coluna] = gamma * (valor_atual / nivel_atual) + (1 - gamma) * fator_sazonal_anterior
+        nivel = nivel_atual
+
+        if aditivo:
+            ajustados[t - L] = (nivel + phi * tendencia) + fator_sazonal_anterior
+        else:
+            ajustados[t - L] = (nivel + phi * tendencia) * fator_sazonal_anterior
+
+    amortecimento = 0.0
+    potencia = 1.0
+    for i in range(h):
+        potencia *= phi
+        amortecimento += potencia
+        if aditivo:
+            previsao[i] = (nivel + amortecimento * tendencia) + fatores_sazonais[(n + i) % L]
+        else:
+            previsao[i] = (nivel + amortecimento * tendencia) * fatores_sazonais[(n + i) % L]
+
+
+@njit(cache=True)
+def _recursao_lote(dados, L, alpha, beta, gamma, phi, aditivo, h, nivel, tendencia, fatores_iniciais, limite_huber,
+                   escala, ajustados, previsao):
+    """
+    Aplica ``_recursao`` a cada linha de ``dados`` (parâmetros, variante, estado inicial e
+    escala com um valor por série). O buffer de fatores tem o tipo de ``fatores_iniciais``.
+    """
+    fatores_sazonais = np.empty_like(fatores_iniciais[0])
+    for s in range(dados.shape[0]):
+        fatores_sazonais[:] = fatores_iniciais[s]
+        _recursao(dados[s], L, alpha[s], beta[s], gamma[s], phi[s], aditivo[s], h,
+                  nivel[s], tendencia[s], fatores_sazonais, limite_huber, escala[s], ajustados[s], previsao[s])
+
+
+@njit(cache=True)
+def _erro_um_passo(dados, L, alpha, beta, gamma, phi, aditivo, nivel_inicial, tendencia_inicial, fatores_iniciais,
+                   limite_huber, escala_inicial, usar_mape, erro):
+    """
+    Erro de previsão de 1 passo para cada série (linha de ``dados``) e cada candidato (coluna
+    de alpha, beta, gamma, phi e aditivo); escreve o resultado em ``erro`` (séries x candidatos).
+
+    O estado inicial de cada série vem em duas versões, multiplicativa (índice 0) e aditiva
+    (índice 1): ``nivel_inicial`` e ``tendencia_inicial`` são (séries x 2) e
+    ``fatores_iniciais`` é (séries x 2 x L). Valores ausentes não entram no erro; com
+    ``limite_huber`` > 0 o erro usa o desvio já limitado.
+    """
+    n_series, n = dados.shape
+    n_candidatos = alpha.shape[1]
+    fatores_sazonais = np.empty(L)
+
+    for s in range(n_series):
+        series = dados[s]
+        validos = 0
+        for t in range(L, n):
+            if not math.isnan(series[t]):
+                validos += 1
+
+        for p in range(n_candidatos):
+            a = alpha[s, p]
+            b = beta[s, p]
+            g = gamma[s, p]
+            f = phi[s, p]
+            ad = aditivo[s, p]
+            variante = 1 if ad else 0
+            fatores_sazonais[:] = fatores_iniciais[s, variante]
+            nivel = nivel_inicial[s, variante]
+            tendencia = tendencia_inicial[s, variante]
+            escala = escala_inicial[s]
+            acumulado = 0.0
+
+            for t in range(L, n):
+                coluna = t % L
+                fator_sazonal_anterior = fatores_sazonais[coluna]
+                tendencia_amortecida = f * tendencia
+
+                if ad:
+                    previsto = (nivel + tendencia_amortecida) + fator_sazonal_anterior
+                else:
+                    previsto = (nivel + tendencia_amortecida) * fator_sazonal_anterior
+                valor_atual, escala = _observacao_efetiva(series[t], previsto, limite_huber, escala)
+                residuo = valor_atual - previsto
+                if usar_mape:
+                    if not math.isnan(series[t]):
+                        acumulado += abs(residuo / series[t])
+                else:
+                    acumulado += residuo * residuo
+
+                if ad:
+                    nivel_atual = a * (valor_atual - fator_sazonal_anterior) + (1 - a) * (nivel + tendencia_amortecida)
+                else:
+                    nivel_atual = a * (valor_atual / fator_sazonal_anterior) + (1 - a) * (nivel + tendencia_amortecida)
+                tendencia = b * (nivel_atual - nivel) + (1 - b) * tendencia_amortecida
+                if ad:
+                    fatores_sazonais[coluna] = g * (valor_atual - nivel_atual) + (1 - g) * fator_sazonal_anterior
+                else:
+                    fatores_sazonais[coluna] = g * (valor_atual / nivel_atual) + (1 - g) * fator_sazonal_anterior
+                nivel = nivel_atual
+
+            if usar_mape:
+                acumulado /= max(validos, 1)
+            erro[s, p] = acumulado if math.isfinite(acumulado) else math.inf
+
+
+def holt_winters_multiplicativo_rapido(series, L, alpha, beta, gamma, h):
+    """
+    Mesmo resultado de ``holt_winters_multiplicativo``, usando o núcleo compilado quando o
+    Numba está disponível e o laço em Python puro caso contrário.
+
+    :return: tupla (previsao, ajustados) como vetores NumPy
+    """
+    if len(series) < L:
+        raise ValueError("A série temporal precisa ter pelo menos um ciclo sazonal completo (L).")
+    n = len(series)
+
+    if JIT_DISPONIVEL:
+        dados = np.ascontiguousarray(series, dtype=np.float64)
+        fatores_sazonais, ajustados, previsao = np.empty(L), np.empty(n - L), np.empty(h)
+    else:
+        # Listas são bem mais rápidas que vetores NumPy para acesso elemento a elemento em Python
+        dados = [float(v) for v in series]
+        fatores_sazonais, ajustados, previsao = [0.0] * L, [0.0] * (n - L), [0.0] * h
+
+    nivel, tendencia = _inicializar(dados, L, False, fatores_sazonais)
+    _recursao(dados, L, float(alpha), float(beta), float(gamma), 1.0, False, h, nivel, tendencia, fatores_sazonais,
+              0.0, math.inf, ajustados, previsao)
+    return np.asarray(previsao, dtype=np.float64), np.asarray(ajustados, dtype=np.float64)
+
+
+def recursao_lote_jit(dados, L, alpha, beta, gamma, h, phi, aditivo, nivel, tendencia, fatores_sazonais,
+                      limite_huber=None, escala=None):
+    """
+    Versão compilada de ``holt_winters_lote`` (sem o Numba roda em Python puro, devagar).
+
+    Os vetores de entrada e de saída têm o tipo de ``dados`` (float64 ou float32); com
+    float32, cada passo é calculado em float64 e gravado em float32.
+
+    :param dados: matriz (séries x tempo) float64 ou float32
+    :param alpha: vetor com um valor por série (idem para beta, gamma, phi e aditivo)
+    :param nivel: estado inicial de ``holt_winters_lote.inicializar_lote`` (idem para
+        tendencia e fatores_sazonais)
+    :param limite_huber: corte dos desvios em número de escalas; None não corta
+    :param escala: escala inicial de cada série (``holt_winters_lote.escala_inicial_lote``)
+    :return: tupla (previsao, ajustados) com formas (séries x h) e (séries x (n - L))
+    """
+    n_series, n = dados.shape
+    dtype = dados.dtype
+    ajustados = np.empty((n_series, n - L), dtype=dtype)
+    previsao = np.empty((n_series, h), dtype=dtype)
+    _recursao_lote(np.ascontiguousarray(dados), L, *_contiguos(alpha, beta, gamma, phi, dtype=dtype),
+                   np.ascontiguousarray(aditivo, dtype=np.bool_), h,
+                   *_contiguos(nivel, tendencia, fatores_sazonais, dtype=dtype),
+                   *_huber(limite_huber, escala, n_series, dtype), ajustados, previsao)
+    return previsao, ajustados
+
+
+def erro_um_passo_jit(dados, L, alpha, beta, gamma, phi, aditivo, metrica, nivel_inicial, tendencia_inicial,
+                      fatores_iniciais, limite_huber=None, escala=None):
+    """
+    Versão compilada de ``otimizacao.erro_um_passo_lote`` (sem o Numba roda em Python puro, devagar).
+
+    :param alpha: matriz (séries x candidatos) já expandida (idem para beta, gamma, phi e aditivo)
+    :param nivel_inicial: matriz (séries x 2) com o nível inicial das variantes multiplicativa
+        e aditiva (idem para tendencia_inicial; fatores_iniciais é séries x 2 x L)
+    :param limite_huber: corte dos desvios em número de escalas; None não corta
+    :param escala: escala inicial de cada série, como em ``recursao_lote_jit``
+    :return: matriz (séries x candidatos) com o erro de cada combinação
+    """
+    erro = np.empty(alpha.shape)
+    _erro_um_passo(np.ascontiguousarray(dados), L, *_contiguos(alpha, beta, gamma, phi),
+                   np.ascontiguousarray(aditivo, dtype=np.bool_),
+                   *_contiguos(nivel_inicial, tendencia_inicial, fatores_iniciais),
+                   *_huber(limite_huber, escala, dados.shape[0]), metrica == "mape", erro)
+    return erro
+
+
+def _contiguos(*parametros, dtype=np.float64):
+    return tuple(np.ascontiguousarray(p, dtype=dtype) for p in parametros)
+
+
+def _huber(limite_huber, escala, n_series, dtype=np.float64):
+    # Nos núcleos, limite 0 desliga o corte; a escala só é lida quando ele está ligado
+    if limite_huber is None:
+        return 0.0, np.full(n_series, math.inf, dtype=dtype)
+    return float(limite_huber), np.ascontiguousarray(escala, dtype=dtype)
+
+
+if __name__ == "__main__":
+    # A comparação com a versão NumPy fica em test_nucleo_jit.py (roda com o pytest)
+    import os
+
+    import pytest
+
+    raise SystemExit(pytest.main(["-q", os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_nucleo_jit.py")]))
@@ -0,0 +1,427 @@
+from collections import namedtuple
+from itertools import product
+
+import numpy as np
+
+import nucleo_jit
+from instrumentacao import etapa
+
+from holt_winters_lote import (
+    _como_vetor, aplicar_sazonalidade, atualizar_lote, como_indicador_aditivo, escala_inicial_lote, estado_inicial_lote,
+    holt_winters_lote, limitar_observacao, remover_sazonalidade,
+)
+
+
+# Resultado do ajuste: um valor por série (ou escalares, quando a entrada é uma única série)
+ParametrosAjustados = namedtuple("ParametrosAjustados", ["alpha", "beta", "gamma", "erro"])
+
+METRICAS = ("sse", "mape")
+
+# Deslocamentos (-1, 0, +1) em cada eixo do cubo (alpha, beta, gamma) usados no refinamento
+_VIZINHANCA = np.array(list(product((-1, 0, 1), repeat=3)), dtype=np.float64)
+
+
+def erro_um_passo_lote(dados, L, alpha, beta, gamma, metrica="sse", usar_jit=None, phi=1.0, aditivo=False,
+                       inicializacao="primeiro_ciclo", limite_huber=None):
+    """
+    Calcula o erro de previsão de 1 passo do Holt-Winters para várias séries e vários
+    candidatos (trios de parâmetros, amortecimento e variante sazonal) ao mesmo tempo, sem
+    guardar os valores ajustados.
+
+    A previsão de 1 passo no instante t usa apenas o que era conhecido em t - 1:
+    (nivel + phi * tendencia) combinado com o fator sazonal do ciclo anterior, calculada antes
+    de atualizar o estado com o valor observado. Por padrão, a inicialização é a mesma de
+    ``holt_winters_multiplicativo``.
+
+    Valores ausentes (NaN) são atravessados pela previsão de 1 passo e não entram no erro (o
+    MAPE é a média sobre as observações presentes). Com ``limite_huber``, o estado é
+    atualizado com a observação limitada, como em ``holt_winters_lote``, e o erro usa o
+    desvio já limitado, o que tira o peso dos picos na escolha dos parâmetros.
+
+    :param dados: matriz (séries x tempo)
+    :param L: comprimento do período sazonal
+    :param alpha: matriz (séries x candidatos), ou qualquer forma que se expanda para ela
+    :param beta: idem para beta
+    :param gamma: idem para gamma
+    :param metrica: "sse" (soma dos quadrados dos erros) ou "mape" (erro percentual médio)
+    :param usar_jit: True usa o núcleo de ``nucleo_jit``, False usa NumPy; None escolhe o
+        núcleo compilado quando o Numba estiver instalado
+    :param phi: amortecimento da tendência, com a mesma regra de forma de alpha
+    :param aditivo: True para sazonalidade aditiva; bool ou matriz de bools que se expanda
+        para (séries x candidatos)
+    :param inicializacao: estratégia de ``holt_winters_lote.inicializar_lote`` ou um estado
+        inicial (nivel, tendencia, fatores_sazonais) usado por todos os candidatos da série
+    :param limite_huber: corte dos desvios em número de escalas; None não corta
+    :return: matriz (séries x candidatos) com o erro de cada combinação; combinações que
+        divergem (divisão por zero, estouro) recebem infinito
+    """
+    if metrica not in METRICAS:
+        raise ValueError(f"Métrica desconhecida: {metrica}. Use uma de {METRICAS}.")
+
+    dados = np.asarray(dados, dtype=np.float64)
+    n_series, n = dados.shape
+    if n <= L:
+        raise ValueError("A série temporal precisa ter mais de um ciclo sazonal completo (L) para ser ajustada.")
+
+    alpha = np.asarray(alpha, dtype=np.float64)
+    beta = np.asarray(beta, dtype=np.float64)
+    gamma = np.asarray(gamma, dtype=np.float64)
+    phi = np.asarray(phi, dtype=np.float64)
+    aditivo = np.asarray(aditivo, dtype=bool)
+    forma = np.broadcast_shapes(alpha.shape, beta.shape, gamma.shape, phi.shape, aditivo.shape, (n_series, 1))
+
+    # Estado inicial das variantes multiplicativa e aditiva (o mesmo para todos os candidatos
+    # de uma série); só as variantes presentes são calculadas
+    variantes = [variante for variante in (False, True) if (aditivo == variante).any()]
+    estados = {variante: estado_inicial_lote(dados, L, variante, inicializacao) for variante in variantes}
+    multiplicativo, aditivo_inicial = estados.get(False, estados.get(True)), estados.get(True, estados.get(False))
+    escala = None if limite_huber is None else escala_inicial_lote(dados, L)
+
+    if usar_jit is None:
+        usar_jit = nucleo_jit.JIT_DISPONIVEL
+    if usar_jit:
+        alpha, beta, gamma, phi, aditivo = (np.broadcast_to(p, forma) for p in (alpha, beta, gamma, phi, aditivo))
+        nivel_inicial, tendencia_inicial, fatores_iniciais = (
+            np.stack([m, a], axis=1) for m, a in zip(multiplicativo, aditivo_inicial)
+        )
+        return nucleo_jit.erro_um_passo_jit(dados, L, alpha, beta, gamma, phi, aditivo, metrica,
+                                            nivel_inicial, tendencia_inicial, fatores_iniciais, limite_huber, escala)
+
+    # Variante única vira um bool, para evitar o np.where a cada passo
+    if aditivo.all() or not aditivo.any():
+        aditivo = bool(aditivo.flat[0])
+    else:
+        aditivo = np.broadcast_to(aditivo, forma)
+
+    nivel = np.broadcast_to(np.where(aditivo, aditivo_inicial[0][:, np.newaxis], multiplicativo[0][:, np.newaxis]),
+                            forma).copy()
+    tendencia = np.broadcast_to(np.where(aditivo, aditivo_inicial[1][:, np.newaxis], multiplicativo[1][:, np.newaxis]),
+                                forma).copy()
+
+    # Buffer circular (L x séries x candidatos): fatores[t % L] é contíguo em memória
+    fatores_sazonais = np.empty((L,) + forma)
+    fatores_sazonais[:] = np.where(aditivo, aditivo_inicial[2].T[:, :, np.newaxis],
+                                   multiplicativo[2].T[:, :, np.newaxis])
+
+    erro = np.zeros(forma)
+    faltantes = np.isnan(dados)
+    tem_faltantes = faltantes[:, L:].any()
+    if escala is not None:
+        escala = np.broadcast_to(escala[:, np.newaxis], forma).copy()
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for t in range(L, n):
+            observado = dados[:, t, np.newaxis]
+            fator_sazonal_anterior = fatores_sazonais[t % L]
+            tendencia_amortecida = phi * tendencia
+
+            previsto = aplicar_sazonalidade(nivel + tendencia_amortecida, fator_sazonal_anterior, aditivo)
+            if escala is not None:
+                valor_atual, escala = limitar_observacao(observado, previsto, escala, limite_huber)
+            elif tem_faltantes:
+                valor_atual = np.where(faltantes[:, t, np.newaxis], previsto, observado)
+            else:
+                valor_atual = observado
+
+            residuo = valor_atual - previsto
+            if metrica == "sse":
+                erro += residuo * residuo
+            elif tem_faltantes:
+                erro += np.where(faltantes[:, t, np.newaxis], 0.0, np.abs(residuo / observado))
+            else:
+                erro += np.abs(residuo / observado)
+
+            nivel_atual = alpha * remover_sazonalidade(valor_atual, fator_sazonal_anterior, aditivo) + (1 - alpha) * (nivel + tendencia_amortecida)
+            tendencia = beta * (nivel_atual - nivel) + (1 - beta) * tendencia_amortecida
+            fatores_sazonais[t % L] = gamma * remover_sazonalidade(valor_atual, nivel_atual, aditivo) + (1 - gamma) * fator_sazonal_anterior
+            nivel = nivel_atual
+
+    if metrica == "mape":
+        erro /= np.maximum((~faltantes[:, L:]).sum(axis=1), 1)[:, np.newaxis]
+    erro[~np.isfinite(erro)] = np.inf
+    return erro
+
+
+def refinar_parametros(dados, L, melhor, melhor_erro, passo, iteracoes_refino=8, limites=(0.01, 0.99),
+                       metrica="sse", phi=1.0, aditivo=False, inicializacao="primeiro_ciclo", limite_huber=None):
+    """
+    Refinamento limitado de (alpha, beta, gamma) ao redor de um ponto de partida por série.
+
+    Avalia os 27 vizinhos do cubo (passo -1, 0 ou +1 em cada eixo), fica com o melhor e divide
+    o passo por dois, sempre respeitando ``limites``. O erro nunca piora, pois o ponto atual
+    é um dos vizinhos.
+
+    :param dados: matriz (séries x tempo)
+    :param melhor: matriz (séries x 3) com o ponto de partida de cada série
+    :param melhor_erro: vetor com o erro do ponto de partida
+    :param passo: passo inicial
+    :param phi: amortecimento; escalar ou matriz (séries x 1)
+    :param aditivo: variante sazonal; bool ou matriz (séries x 1)
+    :param inicializacao: estratégia ou estado inicial, como em ``erro_um_passo_lote``
+    :param limite_huber: corte dos desvios, como em ``erro_um_passo_lote``
+    :return: tupla (melhor, melhor_erro) após o refinamento
+    """
+    limite_inferior, limite_superior = limites
+    linhas = np.arange(dados.shape[0])
+    for _ in range(iteracoes_refino):
+        candidatos = np.clip(melhor[:, np.newaxis, :] + passo * _VIZINHANCA, limite_inferior, limite_superior)
+        erro_candidatos = erro_um_passo_lote(
+            dados, L, candidatos[..., 0], candidatos[..., 1], candidatos[..., 2], metrica, phi=phi, aditivo=aditivo,
+            inicializacao=inicializacao, limite_huber=limite_huber
+        )
+        indice = np.argmin(erro_candidatos, axis=1)
+        melhor = candidatos[linhas, indice]
+        melhor_erro = erro_candidatos[linhas, indice]
+        passo /= 2
+    return melhor, melhor_erro
+
+
+def ajustar_parametros(series, L, metrica="sse", pontos_grade=6, iteracoes_refino=8,
+                       limites=(0.01, 0.99), tamanho_bloco=2048, phi=1.0, sazonalidade="multiplicativa",
+                       inicializacao="primeiro_ciclo", limite_huber=None):
+    """
+    Procura os parâmetros (alpha, beta, gamma) com menor erro de previsão de 1 passo.
+
+    A busca tem duas etapas, ambas vetorizadas sobre séries e trios de parâmetros:
+
+    1. Grade grossa: ``pontos_grade``³ trios avaliados de uma vez para cada série.
+    2. Refinamento limitado (``refinar_parametros``) a partir do melhor trio da grade.
+
+    :param series: matriz (séries x tempo) ou uma única série
+    :param L: comprimento do período sazonal
+    :param metrica: "sse" ou "mape"
+    :param pontos_grade: número de valores por eixo na grade grossa
+    :param iteracoes_refino: quantas vezes o passo do refinamento é reduzido à metade
+    :param limites: intervalo (mínimo, máximo) permitido para alpha, beta e gamma
+    :param tamanho_bloco: quantas séries são avaliadas juntas (limita o uso de memória)
+    :param phi: amortecimento da tendência (fixo); escalar ou um valor por série
+    :param sazonalidade: "multiplicativa", "aditiva" ou um vetor com uma delas por série
+    :param inicializacao: estratégia de ``holt_winters_lote.inicializar_lote`` ou um estado
+        inicial (nivel, tendencia, fatores_sazonais) com um valor por série
+    :param limite_huber: corte dos desvios em número de escalas (ver ``erro_um_passo_lote``);
+        None não corta
+    :return: ParametrosAjustados com alpha, beta, gamma e o erro de cada série
+    """
+    dados = np.asarray(series, dtype=np.float64)
+    serie_unica = dados.ndim == 1
+    if serie_unica:
+        dados = dados[np.newaxis, :]
+
+    limite_inferior, limite_superior = limites
+    if not 0 < limite_inferior < limite_superior < 1:
+        raise ValueError("Os limites dos parâmetros devem satisfazer 0 < mínimo < máximo < 1.")
+
+    grade = np.linspace(limite_inferior, limite_superior, pontos_grade)
+    trios = np.array(list(product(grade, repeat=3)), dtype=np.float64)
+    passo_inicial = (limite_superior - limite_inferior) / max(pontos_grade - 1, 1) / 2
+
+    n_series = dados.shape[0]
+    phi = np.broadcast_to(np.asarray(phi, dtype=np.float64), (n_series,))
+    aditivo = np.broadcast_to(como_indicador_aditivo(sazonalidade, None if isinstance(sazonalidade, str) else n_series),
+                              (n_series,))
+    melhores = np.empty((n_series, 3))
+    erros = np.empty(n_series)
+
+    for inicio in range(0, n_series, tamanho_bloco):
+        fatia = slice(inicio, inicio + tamanho_bloco)
+        bloco = dados[fatia]
+        phi_bloco = phi[fatia, np.newaxis]
+        aditivo_bloco = aditivo[fatia, np.newaxis]
+        inicializacao_bloco = (inicializacao if isinstance(inicializacao, str)
+                               else tuple(componente[fatia] for componente in inicializacao))
+        linhas = np.arange(bloco.shape[0])
+
+        # 1. Grade grossa
+        with etapa("ajuste_grade", itens=len(linhas)):
+            erro_grade = erro_um_passo_lote(bloco, L, trios[:, 0], trios[:, 1], trios[:, 2], metrica,
+                                            phi=phi_bloco, aditivo=aditivo_bloco, inicializacao=inicializacao_bloco,
+                                            limite_huber=limite_huber)
+            indice = np.argmin(erro_grade, axis=1)
+
+        # 2. Refinamento na vizinhança do melhor trio, com passo decrescente
+        with etapa("ajuste_refino", itens=len(linhas)):
+            melhor, melhor_erro = refinar_parametros(
+                bloco, L, trios[indice], erro_grade[linhas, indice], passo_inicial, iteracoes_refino, limites,
+                metrica, phi=phi_bloco, aditivo=aditivo_bloco, inicializacao=inicializacao_bloco,
+                limite_huber=limite_huber
+            )
+
+        melhores[fatia] = melhor
+        erros[fatia] = melhor_erro
+
+    if serie_unica:
+        return ParametrosAjustados(*(float(v) for v in melhores[0]), float(erros[0]))
+    return ParametrosAjustados(melhores[:, 0], melhores[:, 1], melhores[:, 2], erros)
+
+
+def ajustar_e_prever(series, L, h, metrica="sse", **opcoes_ajuste):
+    """
+    Modo de ajuste: escolhe alpha, beta e gamma para cada série e faz a previsão com eles.
+
+    :param series: matriz (séries x tempo) ou uma única série
+    :param L: comprimento do período sazonal
+    :param h: número de passos à frente para prever
+    :param metrica: "sse" ou "mape"
+    :param opcoes_ajuste: repassadas para ``ajustar_parametros``
+    :return: tupla (previsao, ajustados, parametros)
+    """
+    parametros = ajustar_parametros(series, L, metrica=metrica, **opcoes_ajuste)
+    previsao, ajustados = holt_winters_lote(
+        series, L, parametros.alpha, parametros.beta, parametros.gamma, h, opcoes_ajuste.get("phi", 1.0),
+        opcoes_ajuste.get("sazonalidade", "multiplicativa"),
+        inicializacao=opcoes_ajuste.get("inicializacao", "primeiro_ciclo"),
+        limite_huber=opcoes_ajuste.get("limite_huber")
+    )
+    return previsao, ajustados, parametros
+
+
+def _residuos_a_partir_do_estado(dados, L, alpha, beta, gamma, phi, aditivo, nivel, tendencia, fatores_sazonais,
+                                 limite_huber=None):
+    # Erros de 1 passo (séries x (n - L)) de cada linha a partir do estado dado; os fatores são atualizados no lugar.
+    # Instantes sem observação têm erro zero; com limite_huber, o erro e a atualização usam o desvio limitado
+    n = dados.shape[1]
+    residuos = np.empty((dados.shape[0], n - L))
+    escala = None if limite_huber is None else escala_inicial_lote(dados, L)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for t in range(L, n):
+            previsto = aplicar_sazonalidade(nivel + phi * tendencia, fatores_sazonais[:, t % L], aditivo)
+            valor_atual = dados[:, t]
+            if escala is not None:
+                valor_atual, escala = limitar_observacao(valor_atual, previsto, escala, limite_huber)
+            residuos[:, t - L] = valor_atual - previsto
+            nivel, tendencia, _ = atualizar_lote(
+                nivel, tendencia, fatores_sazonais, t % L, valor_atual, alpha, beta, gamma, phi, aditivo
+            )
+    residuos[np.isnan(dados[:, L:])] = 0.0
+    return residuos
+
+
+def _levenberg_marquardt_estado(dados, L, estado, alpha, beta, gamma, phi, aditivo, iteracoes, limite_huber=None):
+    """
+    Passos de Levenberg-Marquardt sobre o estado inicial (séries x (L + 2): nível, tendência
+    e fatores) de um bloco de séries, com o jacobiano dos erros de 1 passo por diferenças
+    finitas. As L + 3 versões do estado (a atual e uma perturbação por componente) de todas as
+    séries correm juntas em uma única recursão vetorizada, e os sistemas (L + 2) x (L + 2) de
+    todas as séries são resolvidos de uma vez.
+    """
+    n_series, k = estado.shape
+    dados_repetidos = np.repeat(dados, k + 1, axis=0)
+    parametros = (alpha, beta, gamma, phi, aditivo)
+    parametros_repetidos = [np.repeat(v, k + 1) for v in parametros]
+    componentes = np.arange(k)
+
+    def erros(estados, linhas_dados, parametros):
+        return _residuos_a_partir_do_estado(linhas_dados, L, *parametros, estados[:, 0].copy(), estados[:, 1].copy(),
+                                            estados[:, 2:].copy(), limite_huber)
+
+    sse = (erros(estado, dados, parametros) ** 2).sum(axis=1)
+    amortecimento = np.full(n_series, 1e-6)
+    for _ in range(iteracoes):
+        # Variáveis em escala relativa: nível, tendência e fatores têm ordens de grandeza
+        # muito diferentes, e sem isso o sistema fica mal condicionado
+        escala = np.maximum(np.abs(estado), 1e-3 * np.abs(estado[:, :1]))
+        perturbacao = 1e-7 * escala
+        estados = np.repeat(estado[:, np.newaxis, :], k + 1, axis=1)
+        estados[:, componentes + 1, componentes] += perturbacao
+        residuos = erros(estados.reshape(-1, k), dados_repetidos, parametros_repetidos).reshape(n_series, k + 1, -1)
+        base = residuos[:, 0]
+        # Jacobiano transposto (séries x componentes x instantes) nas variáveis escaladas
+        jacobiano = (residuos[:, 1:] - base[:, np.newaxis]) / 1e-7
+
+        # Séries que divergem ficam onde estão
+        validos = np.isfinite(jacobiano).all(axis=(1, 2)) & np.isfinite(base).all(axis=1)
+        jacobiano[~validos] = 0.0
+        base = np.where(validos[:, np.newaxis], base, 0.0)
+        normal = jacobiano @ jacobiano.transpose(0, 2, 1)
+        normal += (amortecimento * np.trace(normal, axis1=1, axis2=2) + 1e-300)[:, np.newaxis, np.newaxis] * np.eye(k)
+        passo = -np.linalg.solve(normal, jacobiano @ base[:, :, np.newaxis])[..., 0]
+
+        candidato = estado + passo * escala
+        sse_candidato = (erros(candidato, dados, parametros) ** 2).sum(axis=1)
+        melhorou = validos & (sse_candidato < sse)
+        estado = np.where(melhorou[:, np.newaxis], candidato, estado)
+        sse = np.where(melhorou, sse_candidato, sse)
+        amortecimento = np.where(melhorou, amortecimento / 10, amortecimento * 100)
+    return estado
+
+
+def otimizar_estado_inicial(dados, L, alpha, beta, gamma, phi=1.0, sazonalidade="multiplicativa",
+                            inicializacao="decomposicao", iteracoes=5, tamanho_bloco=256, limite_huber=None):
+    """
+    Estado inicial (nível, tendência e fatores sazonais) que minimiza a soma dos quadrados dos
+    erros de 1 passo para parâmetros (alpha, beta, gamma) fixos.
+
+    A otimização é por Levenberg-Marquardt, vetorizada sobre as séries; cada passo só é aceito
+    se reduzir o erro da série (senão o amortecimento dela aumenta), então o resultado nunca é
+    pior que o ponto de partida.
+
+    :param dados: matriz (séries x tempo)
+    :param alpha: escalar ou um valor por série (idem para beta, gamma e phi)
+    :param sazonalidade: "multiplicativa", "aditiva" ou um vetor com uma delas por série
+    :param inicializacao: ponto de partida: estratégia de ``inicializar_lote`` ou um estado
+    :param iteracoes: número de passos de Levenberg-Marquardt
+    :param tamanho_bloco: quantas séries são otimizadas juntas (a recursão roda L + 3 cópias
+        de cada série)
+    :param limite_huber: corte dos desvios, como em ``erro_um_passo_lote``; com ele, a soma
+        minimizada é a dos desvios limitados
+    :return: tupla (nivel, tendencia, fatores_sazonais), aceita como ``inicializacao`` por
+        ``holt_winters_lote`` e ``ajustar_parametros``
+    """
+    dados = np.asarray(dados, dtype=np.float64)
+    n_series = dados.shape[0]
+    parametros = [_como_vetor(v, n_series, nome) for v, nome in ((alpha, "alpha"), (beta, "beta"),
+                                                                (gamma, "gamma"), (phi, "phi"))]
+    aditivo = np.broadcast_to(como_indicador_aditivo(sazonalidade, None if isinstance(sazonalidade, str) else n_series),
+                              (n_series,))
+    nivel, tendencia, fatores_sazonais = estado_inicial_lote(dados, L, aditivo, inicializacao)
+    estado = np.column_stack([nivel, tendencia, fatores_sazonais])
+
+    with etapa("estado_inicial", itens=n_series):
+        for inicio in range(0, n_series, tamanho_bloco):
+            fatia = slice(inicio, inicio + tamanho_bloco)
+            estado[fatia] = _levenberg_marquardt_estado(dados[fatia], L, estado[fatia], *(p[fatia] for p in parametros),
+                                                 aditivo[fatia], iteracoes, limite_huber)
+    return estado[:, 0], estado[:, 1], estado[:, 2:]
+
+
+def ajustar_parametros_e_estado(series, L, metrica="sse", inicializacao="decomposicao", rodadas=2,
+                                phi=1.0, sazonalidade="multiplicativa", **opcoes_ajuste):
+    """
+    Ajusta alpha, beta, gamma e o estado inicial juntos, por otimização alternada.
+
+    Primeiro os parâmetros são ajustados com o estado de ``inicializacao``; depois, a cada
+    rodada, o estado é otimizado para os parâmetros atuais (``otimizar_estado_inicial``) e os
+    parâmetros são refinados ao redor do ponto atual com o novo estado. O erro nunca piora de
+    uma rodada para outra na métrica SSE.
+
+    :param series: matriz (séries x tempo)
+    :param inicializacao: estratégia de ``inicializar_lote`` para o estado de partida
+    :param rodadas: quantas alternâncias estado/parâmetros são feitas
+    :param opcoes_ajuste: repassadas para ``ajustar_parametros``; ``limite_huber`` vale também
+        para a otimização do estado
+    :return: tupla (ParametrosAjustados, estado inicial), com o estado no formato aceito por
+        ``holt_winters_lote(..., inicializacao=estado)``
+    """
+    dados = np.asarray(series, dtype=np.float64)
+    n_series = dados.shape[0]
+    parametros = ajustar_parametros(dados, L, metrica=metrica, phi=phi, sazonalidade=sazonalidade,
+                                    inicializacao=inicializacao, **opcoes_ajuste)
+    limites = opcoes_ajuste.get("limites", (0.01, 0.99))
+    limite_huber = opcoes_ajuste.get("limite_huber")
+    phi_coluna = np.broadcast_to(np.asarray(phi, dtype=np.float64), (n_series,))[:, np.newaxis]
+    aditivo_coluna = np.broadcast_to(
+        como_indicador_aditivo(sazonalidade, None if isinstance(sazonalidade, str) else n_series), (n_series,)
+    )[:, np.newaxis]
+
+    estado = inicializacao
+    melhor = np.column_stack([parametros.alpha, parametros.beta, parametros.gamma])
+    erro = parametros.erro
+    for _ in range(rodadas):
+        estado = otimizar_estado_inicial(dados, L, melhor[:, 0], melhor[:, 1], melhor[:, 2], phi, sazonalidade,
+                                         inicializacao=estado, limite_huber=limite_huber)
+        erro = erro_um_passo_lote(dados, L, melhor[:, 0:1], melhor[:, 1:2], melhor[:, 2:3], metrica,
+                                  phi=phi_coluna, aditivo=aditivo_coluna, inicializacao=estado,
+                                  limite_huber=limite_huber)[:, 0]
+        melhor, erro = refinar_parametros(dados, L, melhor, erro, 0.05, 4, limites, metrica, phi=phi_coluna,
+                                          aditivo=aditivo_coluna, inicializacao=estado, limite_huber=limite_huber)
+    return ParametrosAjustados(melhor[:, 0], melhor[:, 1], melhor[:, 2], erro), estado
@@ -0,0 +1,355 @@
+"""
+Linha de comando única para as previsões de consumo (substitui os scripts de cada região).
+
+Exemplos::
+
+    python previsao.py                                  # todas as regiões, parâmetros padrão
+    python previsao.py --serie Norte --serie Sul -H 6
+    python previsao.py --ajustar --formato csv --saida previsoes.csv
+    python previsao.py --intervalos --graficos graficos
+    python previsao.py --ajustar --instrumentacao etapas.prom --perfil execucao.prof
+
+Uma previsão simples (parâmetros fixos, saída em texto, CSV ou JSON) usa só a biblioteca
+padrão, para que o comando inicie rápido; NumPy, pandas e matplotlib só são importados
+quando o ajuste, os intervalos, a leitura de Parquet ou os gráficos são pedidos.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+
+from dados_regionais import ARQUIVO_CONSUMO
+from estado import EstadoHoltWinters
+from instrumentacao import INSTRUMENTACAO, ativar, etapa, perfilar
+
+
+MESES = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho",
+         "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
+
+FORMATOS_SAIDA = ("texto", "csv", "json")
+
+# Estratégias de holt_winters_lote.INICIALIZACOES mais o estado otimizado junto com os parâmetros
+INICIALIZACOES = ("primeiro_ciclo", "decomposicao", "minimos_quadrados", "otimizada")
+
+
+def _mes_seguinte(mes, passos=1):
+    # "AAAA-MM" somado de alguns meses, sem depender de pandas
+    ano, numero = int(mes[:4]), int(mes[5:7])
+    total = ano * 12 + numero - 1 + passos
+    return f"{total // 12:04d}-{total % 12 + 1:02d}"
+
+
+def ler_series(caminho, coluna_serie="serie", coluna_mes="mes", coluna_valor="valor"):
+    """
+    Lê um arquivo em formato longo (série, mês, valor) como {série: (primeiro mês, valores)}.
+
+    CSV é lido com o módulo ``csv`` da biblioteca padrão; Parquet passa por
+    ``carregamento.carregar_series`` (pandas).
+
+    Valores vazios e meses que faltam entre o primeiro e o último de cada série viram NaN,
+    que o motor em lote atravessa com a previsão de 1 passo.
+
+    :return: dicionário na ordem em que as séries aparecem no arquivo; meses como "AAAA-MM"
+    """
+    if os.path.splitext(caminho)[1].lower() in (".parquet", ".pq"):
+        import numpy as np
+
+        from carregamento import carregar_series
+
+        colecao = carregar_series(caminho, coluna_serie, coluna_mes, coluna_valor)
+        series = {}
+        for id_serie in colecao.ids:
+            meses = colecao.meses_da_serie(id_serie)
+            posicoes = (meses - meses[0]).astype(np.int64)
+            valores = np.full(posicoes[-1] + 1, np.nan)
+            valores[posicoes] = colecao[id_serie]
+            series[id_serie] = (str(meses[0]), valores.tolist())
+        return series
+
+    observacoes = {}
+    with open(caminho, newline="", encoding="utf-8") as arquivo:
+        for linha in csv.DictReader(arquivo):
+            valor = float(linha[coluna_valor]) if linha[coluna_valor].strip() else math.nan
+            observacoes.setdefault(linha[coluna_serie], []).append((linha[coluna_mes][:7], valor))
+
+    series = {}
+    for id_serie, pares in observacoes.items():
+        pares.sort()
+        valores, esperado = [], pares[0][0]
+        for mes, valor in pares:
+            while esperado < mes:
+                valores.append(math.nan)
+                esperado = _mes_seguinte(esperado)
+            valores.append(valor)
+            esperado = _mes_seguinte(mes)
+        series[id_serie] = (pares[0][0], valores)
+    return series
+
+
+def _prever_simples(series, args):
+    # Parâmetros fixos: o estado em Python puro basta, sem NumPy
+    resultados = {}
+    for id_serie, (_, valores) in series.items():
+        estado = EstadoHoltWinters.a_partir_da_serie(valores, args.L, args.alpha, args.beta, args.gamma,
+                                                     args.phi, args.sazonalidade)
+        resultados[id_serie] = {
+            "previsao": estado.prever(args.H),
+            "parametros": {"alpha": args.alpha, "beta": args.beta, "gamma": args.gamma,
+                           "phi": args.phi, "sazonalidade": args.sazonalidade},
+        }
+    return resultados
+
+
+def _prever_lote(series, args):
+    # Ajuste, seleção de modelo, intervalos ou cache: motor vetorizado, um lote por comprimento
+    import numpy as np
+
+    from exportacao import nome_quantil
+    from holt_winters_lote import holt_winters_lote
+
+    grupos = {}
+    for id_serie, (_, valores) in series.items():
+        grupos.setdefault(len(valores), []).append(id_serie)
+
+    resultados = {}
+    for ids in grupos.values():
+        dados = np.array([series[id_serie][1] for id_serie in ids])
+        n_series = len(ids)
+        phi = np.full(n_series, args.phi)
+        sazonalidade = np.full(n_series, args.sazonalidade)
+        alpha = beta = gamma = None
+        inicializacao = args.inicializacao
+
+        if args.selecionar:
+            from selecao import selecionar_modelo
+
+            modelo = selecionar_modelo(dados, args.L)
+            alpha, beta, gamma = modelo.alpha, modelo.beta, modelo.gamma
+            phi, sazonalidade = modelo.phi, modelo.sazonalidade
+        elif not args.ajustar:
+            alpha, beta, gamma = (np.full(n_series, p) for p in (args.alpha, args.beta, args.gamma))
+
+        if args.cache and not args.selecionar:
+            from cache import CachePrevisao, prever_com_cache
+
+            with CachePrevisao(args.cache) as cache:
+                previsao, _, parametros = prever_com_cache(dados, args.L, args.H, cache, alpha, beta, gamma,
+                                                           args.phi, args.sazonalidade, args.metrica,
+                                                           inicializacao=args.inicializacao,
+                                                           limite_huber=args.limite_huber)
+            inicializacao = None
+            alpha, beta, gamma = parametros.alpha, parametros.beta, parametros.gamma
+        elif alpha is None:
+            from otimizacao import ajustar_parametros, ajustar_parametros_e_estado
+
+            if inicializacao == "otimizada":
+                parametros, inicializacao = ajustar_parametros_e_estado(dados, args.L, metrica=args.metrica,
+                                                                        phi=args.phi, sazonalidade=args.sazonalidade,
+                                                                        limite_huber=args.limite_huber)
+            else:
+                parametros = ajustar_parametros(dados, args.L, metrica=args.metrica, phi=args.phi,
+                                                sazonalidade=args.sazonalidade, inicializacao=inicializacao,
+                                                limite_huber=args.limite_huber)
+            alpha, beta, gamma = parametros.alpha, parametros.beta, parametros.gamma
+
+        if inicializacao == "otimizada":
+            from otimizacao import otimizar_estado_inicial
+
+            inicializacao = otimizar_estado_inicial(dados, args.L, alpha, beta, gamma, phi, sazonalidade,
+                                                    limite_huber=args.limite_huber)
+
+        if args.intervalos:
+            from intervalos import prever_intervalos
+
+            quantis = sorted(args.quantis)
+            intervalos = prever_intervalos(dados, args.L, args.H, alpha, beta, gamma, phi, sazonalidade,
+                                           n_caminhos=args.caminhos, quantis=quantis, semente=args.semente)
+            previsao = intervalos.previsao
+        elif not args.cache or args.selecionar:
+            previsao, _ = holt_winters_lote(dados, args.L, alpha, beta, gamma, args.H, phi, sazonalidade,
+                                            inicializacao=inicializacao, limite_huber=args.limite_huber)
+
+        for k, id_serie in enumerate(ids):
+            resultado = {
+                "previsao": previsao[k].tolist(),
+                "parametros": {"alpha": float(alpha[k]), "beta": float(beta[k]), "gamma": float(gamma[k]),
+                               "phi": float(phi[k]), "sazonalidade": str(sazonalidade[k])},
+            }
+            if args.intervalos:
+                resultado["quantis"] = {nome_quantil(q): intervalos.valores[j, k].tolist()
+                                        for j, q in enumerate(quantis)}
+            resultados[id_serie] = resultado
+    return resultados
+
+
+def escrever_resultados(series, resultados, formato, arquivo):
+    """
+    Escreve as previsões em texto (como os scripts regionais), CSV longo ou JSON.
+    """
+    if formato == "json":
+        saida = {}
+        for id_serie, resultado in resultados.items():
+            primeiro_mes, valores = series[id_serie]
+            inicio = _mes_seguinte(primeiro_mes, len(valores))
+            saida[id_serie] = dict(resultado, meses=[_mes_seguinte(inicio, i) for i in range(len(resultado["previsao"]))])
+        json.dump(saida, arquivo, ensure_ascii=False, indent=2)
+        arquivo.write("\n")
+        return
+
+    if formato == "csv":
+        escritor = csv.writer(arquivo, lineterminator="\n")
+        quantis = list(next(iter(resultados.values()), {}).get("quantis", {}))
+        escritor.writerow(["serie", "mes", "previsao"] + quantis)
+
+    for id_serie, resultado in resultados.items():
+        primeiro_mes, valores = series[id_serie]
+        inicio = _mes_seguinte(primeiro_mes, len(valores))
+        if formato == "texto":
+            print(f"Resultados para região {id_serie}", file=arquivo)
+        for i, valor in enumerate(resultado["previsao"]):
+            mes = _mes_seguinte(inicio, i)
+            if formato == "texto":
+                faixa = "".join(f"  {nome.upper()}={v[i]:.1f}" for nome, v in resultado.get("quantis", {}).items())
+                print(f"{MESES[int(mes[5:7]) - 1]} de {mes[:4]}: {valor:.1f}{faixa}", file=arquivo)
+            else:
+                escritor.writerow([id_serie, mes, repr(valor)] + [repr(v[i]) for v in resultado.get("quantis", {}).values()])
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog="previsao", description="Previsão de consumo de energia com Holt-Winters.")
+    parser.add_argument("--entrada", default=ARQUIVO_CONSUMO,
+                        help="CSV ou Parquet em formato longo (serie, mes, valor); padrão: dados/consumo_mensal.csv")
+    parser.add_argument("--serie", action="append", dest="series", metavar="ID",
+                        help="série (região) a prever; pode ser repetido; padrão: todas")
+    parser.add_argument("-L", type=int, default=12, help="comprimento do período sazonal (padrão: 12)")
+    parser.add_argument("-H", type=int, default=12, help="meses à frente para prever (padrão: 12)")
+    parser.add_argument("--alpha", type=float, default=0.3)
+    parser.add_argument("--beta", type=float, default=0.1)
+    parser.add_argument("--gamma", type=float, default=0.2)
+    parser.add_argument("--phi", type=float, default=1.0, help="amortecimento da tendência (1 = sem amortecimento)")
+    parser.add_argument("--sazonalidade", choices=("multiplicativa", "aditiva"), default="multiplicativa")
+
+    modo = parser.add_mutually_exclusive_group()
+    modo.add_argument("--ajustar", action="store_true", help="ajusta alpha, beta e gamma de cada série")
+    modo.add_argument("--selecionar", action="store_true",
+                      help="escolhe variante (aditiva/multiplicativa, amortecida ou não) e parâmetros por série")
+    parser.add_argument("--metrica", choices=("sse", "mape"), default="sse", help="métrica usada no ajuste")
+    parser.add_argument("--cache", metavar="ARQUIVO", help="cache SQLite de previsões (só refaz séries alteradas)")
+    parser.add_argument("--inicializacao", choices=INICIALIZACOES, default="primeiro_ciclo",
+                        help="estado inicial do modelo; 'otimizada' o ajusta junto com os parâmetros")
+    parser.add_argument("--limite-huber", type=float, metavar="K",
+                        help="corta, dentro da recursão, desvios maiores que K escalas robustas (ex: 2.5)")
+
+    parser.add_argument("--intervalos", action="store_true", help="inclui quantis da previsão por simulação")
+    parser.add_argument("--quantis", type=float, nargs="+", default=[0.1, 0.5, 0.9])
+    parser.add_argument("--caminhos", type=int, default=10000, help="trajetórias simuladas por série")
+    parser.add_argument("--semente", type=int, help="semente da simulação")
+
+    parser.add_argument("--formato", choices=FORMATOS_SAIDA, default="texto", help="formato da saída")
+    parser.add_argument("--saida", metavar="ARQUIVO", help="arquivo de saída (padrão: tela)")
+    parser.add_argument("--graficos", metavar="PASTA", help="grava um gráfico por série nessa pasta")
+    parser.add_argument("--formato-grafico", choices=("png", "svg"), default="png")
+    parser.add_argument("--parquet", metavar="PASTA", help="grava previsões, quantis e parâmetros em Parquet")
+    parser.add_argument("--excel", metavar="ARQUIVO", help="grava um resumo em Excel (uma planilha por tabela)")
+
+    parser.add_argument("--instrumentacao", metavar="ARQUIVO",
+                        help="grava tempos por etapa e contadores (.prom/.txt: Prometheus; senão JSON)")
+    parser.add_argument("--perfil", metavar="ARQUIVO", help="grava o perfil cProfile da execução (para pstats)")
+    parser.add_argument("--perfil-memoria", action="store_true",
+                        help="com --perfil, grava também as maiores alocações (tracemalloc) em ARQUIVO.memoria.txt")
+    return parser
+
+
+def main(argv=None):
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+    if args.perfil_memoria and not args.perfil:
+        parser.error("--perfil-memoria exige --perfil")
+    if args.inicializacao != "primeiro_ciclo" and (args.selecionar or args.intervalos):
+        parser.error("--inicializacao não se combina com --selecionar ou --intervalos")
+    if args.limite_huber is not None and (args.selecionar or args.intervalos):
+        parser.error("--limite-huber não se combina com --selecionar ou --intervalos")
+    if args.limite_huber is not None and args.limite_huber <= 0:
+        parser.error("--limite-huber deve ser positivo")
+
+    if args.instrumentacao:
+        ativar()
+    if args.perfil:
+        with perfilar(args.perfil, memoria=args.perfil_memoria):
+            codigo = _executar(parser, args)
+    else:
+        codigo = _executar(parser, args)
+    if args.instrumentacao:
+        INSTRUMENTACAO.exportar(args.instrumentacao)
+    return codigo
+
+
+def _executar(parser, args):
+    with etapa("leitura"):
+        series = ler_series(args.entrada)
+    if args.series:
+        desconhecidas = [id_serie for id_serie in args.series if id_serie not in series]
+        if desconhecidas:
+            parser.error(f"série(s) não encontrada(s): {', '.join(desconhecidas)}. Disponíveis: {', '.join(series)}")
+        series = {id_serie: series[id_serie] for id_serie in args.series}
+
+    with etapa("previsao_total", itens=len(series)):
+        # Valores ausentes só são tratados pelo motor em lote
+        faltantes = any(math.isnan(valor) for _, valores in series.values() for valor in valores)
+        if (args.ajustar or args.selecionar or args.intervalos or args.cache or args.inicializacao != "primeiro_ciclo"
+                or args.limite_huber is not None or faltantes):
+            resultados = _prever_lote(series, args)
+        else:
+            resultados = _prever_simples(series, args)
+
+    with etapa("saida", itens=len(resultados)):
+        if args.saida:
+            with open(args.saida, "w", newline="", encoding="utf-8") as arquivo:
+                escrever_resultados(series, resultados, args.formato, arquivo)
+        else:
+            escrever_resultados(series, resultados, args.formato, sys.stdout)
+
+    if args.graficos:
+        from graficos import renderizar_graficos
+
+        ids = list(resultados)
+        intervalos = None
+        if args.intervalos and len(args.quantis) > 1:
+            # Faixa entre o menor e o maior quantil pedido
+            faixas = [list(resultados[i]["quantis"].values()) for i in ids]
+            intervalos = ([faixa[0] for faixa in faixas], [faixa[-1] for faixa in faixas])
+        renderizar_graficos(args.graficos, ids, [series[i][1] for i in ids], [resultados[i]["previsao"] for i in ids],
+                            inicio=[series[i][0] for i in ids], intervalos=intervalos, formato=args.formato_grafico)
+
+    if args.parquet or args.excel:
+        with etapa("exportacao", itens=len(resultados)):
+            _exportar(series, resultados, args)
+    return 0
+
+
+def _exportar(series, resultados, args):
+    import numpy as np
+
+    from exportacao import exportar_parquet, resumo_excel
+    from intervalos import IntervalosPrevisao
+
+    ids = list(resultados)
+    previsao = np.array([resultados[i]["previsao"] for i in ids])
+    inicios = [_mes_seguinte(series[i][0], len(series[i][1])) for i in ids]
+    parametros = {campo: [resultados[i]["parametros"][campo] for i in ids] for campo in resultados[ids[0]]["parametros"]}
+
+    if args.parquet:
+        intervalos = None
+        if args.intervalos:
+            quantis = sorted(args.quantis)
+            valores = np.array([[resultados[i]["quantis"][nome] for i in ids] for nome in resultados[ids[0]]["quantis"]])
+            intervalos = IntervalosPrevisao(tuple(quantis), valores, previsao)
+        exportar_parquet(args.parquet, ids, previsao, inicios, intervalos=intervalos, parametros=parametros)
+    if args.excel:
+        resumo_excel(args.excel, ids, previsao, inicios, parametros=parametros)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
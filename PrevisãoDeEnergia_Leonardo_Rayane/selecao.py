@@ -0,0 +1,125 @@
+from collections import namedtuple
+from itertools import product
+
+import numpy as np
+
+from holt_winters_lote import SAZONALIDADES, holt_winters_lote
+from otimizacao import erro_um_passo_lote, refinar_parametros
+
+
+# Modelo escolhido para cada série (vetores; escalares quando a entrada é uma única série)
+ModeloSelecionado = namedtuple("ModeloSelecionado", ["sazonalidade", "phi", "alpha", "beta", "gamma", "sse", "aic"])
+
+CRITERIOS = ("aic", "sse")
+
+
+def selecionar_modelo(series, L, criterio="aic", valores_phi=(0.9, 0.98), pontos_grade=6,
+                      iteracoes_refino=8, limites=(0.01, 0.99)):
+    """
+    Escolhe, para cada série, a variante do Holt-Winters (sazonalidade multiplicativa ou
+    aditiva, tendência com ou sem amortecimento) e os seus parâmetros.
+
+    Todas as variantes são avaliadas juntas: a grade grossa de (alpha, beta, gamma) é
+    repetida para cada variante e vira uma única chamada de ``erro_um_passo_lote``; depois o
+    melhor ponto de cada par (série, variante) é refinado, também em lote. Por fim cada série
+    fica com a variante de menor critério.
+
+    O AIC usa a soma dos quadrados dos erros de 1 passo: m * ln(SSE / m) + 2k, em que m é o
+    número de erros de cada série (meses após o primeiro ciclo, sem os ausentes) e k conta os
+    três parâmetros de suavização, o phi (variantes amortecidas) e os L + 2 valores iniciais.
+
+    :param series: matriz (séries x tempo) ou uma única série
+    :param L: comprimento do período sazonal
+    :param criterio: "aic" ou "sse"
+    :param valores_phi: amortecimentos testados além de phi = 1 (sem amortecimento)
+    :param pontos_grade: número de valores por eixo na grade grossa
+    :param iteracoes_refino: quantas vezes o passo do refinamento é reduzido à metade
+    :param limites: intervalo (mínimo, máximo) permitido para alpha, beta e gamma
+    :return: ModeloSelecionado; variantes que divergem (ex: multiplicativa com zeros na
+        série) nunca são escolhidas
+    """
+    if criterio not in CRITERIOS:
+        raise ValueError(f"Critério desconhecido: {criterio}. Use um de {CRITERIOS}.")
+
+    dados = np.asarray(series, dtype=np.float64)
+    serie_unica = dados.ndim == 1
+    if serie_unica:
+        dados = dados[np.newaxis, :]
+    n_series = dados.shape[0]
+
+    limite_inferior, limite_superior = limites
+    grade = np.linspace(limite_inferior, limite_superior, pontos_grade)
+    trios = np.array(list(product(grade, repeat=3)), dtype=np.float64)
+    passo_inicial = (limite_superior - limite_inferior) / max(pontos_grade - 1, 1) / 2
+
+    variantes = list(product(SAZONALIDADES, (1.0,) + tuple(valores_phi)))
+    n_variantes, n_trios = len(variantes), len(trios)
+    aditivo_variante = np.array([sazonalidade == "aditiva" for sazonalidade, _ in variantes])
+    phi_variante = np.array([phi for _, phi in variantes], dtype=np.float64)
+
+    # 1. Grade grossa de todas as variantes em uma passada: candidatos (variante x trio)
+    erro_grade = erro_um_passo_lote(
+        dados, L, np.tile(trios[:, 0], n_variantes), np.tile(trios[:, 1], n_variantes),
+        np.tile(trios[:, 2], n_variantes), "sse",
+        phi=np.repeat(phi_variante, n_trios), aditivo=np.repeat(aditivo_variante, n_trios),
+    ).reshape(n_series, n_variantes, n_trios)
+    indice = np.argmin(erro_grade, axis=2)
+
+    # 2. Refinamento de cada par (série, variante), como linhas de um único lote
+    dados_pares = np.repeat(dados, n_variantes, axis=0)
+    phi_pares = np.tile(phi_variante, n_series)[:, np.newaxis]
+    aditivo_pares = np.tile(aditivo_variante, n_series)[:, np.newaxis]
+    melhor, sse = refinar_parametros(
+        dados_pares, L, trios[indice.ravel()], np.take_along_axis(erro_grade, indice[..., np.newaxis], 2).ravel(),
+        passo_inicial, iteracoes_refino, limites, "sse", phi=phi_pares, aditivo=aditivo_pares,
+    )
+    melhor = melhor.reshape(n_series, n_variantes, 3)
+    sse = sse.reshape(n_series, n_variantes)
+
+    # 3. Critério de informação e escolha da variante
+    # Meses ausentes não geram erro de 1 passo, então só os observados contam em m
+    m = np.count_nonzero(~np.isnan(dados[:, L:]), axis=1)[:, np.newaxis]
+    k = 3 + (phi_variante < 1) + (L + 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        aic = m * np.log(sse / m) + 2 * k
+    aic[~np.isfinite(aic)] = np.inf
+    escolha = np.argmin(aic if criterio == "aic" else sse, axis=1)
+
+    linhas = np.arange(n_series)
+    parametros = melhor[linhas, escolha]
+    modelo = ModeloSelecionado(
+        np.array(SAZONALIDADES)[aditivo_variante[escolha].astype(int)],
+        phi_variante[escolha],
+        parametros[:, 0], parametros[:, 1], parametros[:, 2],
+        sse[linhas, escolha], aic[linhas, escolha],
+    )
+    if serie_unica:
+        return ModeloSelecionado(str(modelo.sazonalidade[0]), *(float(v[0]) for v in modelo[1:]))
+    return modelo
+
+
+def selecionar_e_prever(series, L, h, **opcoes_selecao):
+    """
+    Escolhe a variante e os parâmetros de cada série e faz a previsão com eles.
+
+    :param series: matriz (séries x tempo) ou uma única série
+    :param L: comprimento do período sazonal
+    :param h: número de passos à frente para prever
+    :param opcoes_selecao: repassadas para ``selecionar_modelo``
+    :return: tupla (previsao, ajustados, modelo)
+    """
+    modelo = selecionar_modelo(series, L, **opcoes_selecao)
+    previsao, ajustados = holt_winters_lote(
+        series, L, modelo.alpha, modelo.beta, modelo.gamma, h, phi=modelo.phi, sazonalidade=modelo.sazonalidade
+    )
+    return previsao, ajustados, modelo
+
+
+if __name__ == "__main__":
+    from dados_regionais import carregar_consumo_regional
+
+    consumo = carregar_consumo_regional()
+    modelo = selecionar_modelo(list(consumo.values()), L=12)
+    for k, regiao in enumerate(consumo):
+        print(f"{regiao}: {modelo.sazonalidade[k]}, phi={modelo.phi[k]:.2f}, alpha={modelo.alpha[k]:.3f}, "
+              f"beta={modelo.beta[k]:.3f}, gamma={modelo.gamma[k]:.3f}, AIC={modelo.aic[k]:.1f}")
@@ -0,0 +1,354 @@
+"""
+Serviço HTTP de previsão (asyncio, só biblioteca padrão + o motor vetorizado).
+
+Rotas (POST com corpo JSON):
+
+- ``/fit``: ajusta alpha, beta e gamma de uma série e devolve os parâmetros e o estado
+  (``EstadoHoltWinters.para_dict``), que pode ser reenviado depois para prever.
+- ``/forecast``: previsão de h passos. Aceita ``{"serie": [...]}`` (com ou sem alpha, beta
+  e gamma; sem eles a série é ajustada) ou ``{"estado": {...}}`` vindo de ``/fit``.
+
+O corpo deve ser um objeto JSON e a série uma lista plana de números com pelo menos 2L
+valores (``null`` marca um valor ausente; na variante multiplicativa os valores devem ser
+positivos). alpha, beta e gamma ficam em (0, 1) e phi em (0, 1]. Cada pedido é validado antes
+de entrar em um lote, então um pedido inválido recebe 400 sem afetar os outros. Um ajuste que
+diverge (estado ou previsão não finitos) também recebe 400, nunca um JSON com ``NaN``.
+
+Campos opcionais: ``L`` (12), ``h`` (12), ``phi`` (1), ``sazonalidade`` ("multiplicativa"),
+``metrica`` ("sse"). ``GET /estatisticas`` mostra os contadores de lotes e do cache e
+``GET /metrics`` devolve os tempos por etapa (``instrumentacao``) no formato do Prometheus,
+quando o serviço é iniciado com ``--instrumentacao``.
+
+Requisições que chegam com poucos milissegundos de diferença e são compatíveis (mesmo
+L, comprimento de série e variante) são juntadas em um único lote para o motor vetorizado.
+O estado de cada série ajustada fica em um cache LRU em memória, indexado pelo conteúdo da
+série e pelos parâmetros; uma nova previsão para a mesma série sai direto do estado.
+
+Uso::
+
+    python servico.py --porta 8080
+"""
+import argparse
+import asyncio
+import json
+from collections import OrderedDict
+from http import HTTPStatus
+
+import numpy as np
+
+from cache import chave_serie
+from estado import EstadoHoltWinters
+from holt_winters_lote import atualizar_lote, como_indicador_aditivo, inicializar_lote
+from instrumentacao import INSTRUMENTACAO, ativar, contar, etapa
+from otimizacao import ajustar_parametros
+
+
+def estados_finais_lote(dados, L, alpha, beta, gamma, phi=1.0, sazonalidade="multiplicativa"):
+    """
+    Percorre as séries de ``dados`` com o motor vetorizado e devolve o estado final de cada
+    uma como ``EstadoHoltWinters``, pronto para prever ou receber novas observações.
+
+    :param dados: matriz (séries x tempo)
+    :param alpha: vetor com um valor por série (idem para beta e gamma)
+    :return: lista de EstadoHoltWinters, na ordem das séries
+    """
+    n_series, n = dados.shape
+    aditivo = como_indicador_aditivo(sazonalidade)
+    nivel, tendencia, fatores_sazonais = inicializar_lote(dados, L, aditivo)
+    for t in range(L, n):
+        nivel, tendencia, _ = atualizar_lote(nivel, tendencia, fatores_sazonais, t % L, dados[:, t],
+                                             alpha, beta, gamma, phi, aditivo)
+    return [
+        EstadoHoltWinters(L, float(alpha[k]), float(beta[k]), float(gamma[k]), float(nivel[k]), float(tendencia[k]),
+                          fatores_sazonais[k].tolist(), posicao=n % L, n_observacoes=n, phi=phi,
+                          sazonalidade=sazonalidade)
+        for k in range(n_series)
+    ]
+
+
+class CacheLRU:
+    """
+    Dicionário com limite de entradas; ao passar do limite, sai a entrada usada há mais tempo.
+    """
+
+    def __init__(self, max_entradas):
+        self.max_entradas = max_entradas
+        self._itens = OrderedDict()
+
+    def __len__(self):
+        return len(self._itens)
+
+    def obter(self, chave):
+        valor = self._itens.get(chave)
+        if valor is not None:
+            self._itens.move_to_end(chave)
+        return valor
+
+    def guardar(self, chave, valor):
+        self._itens[chave] = valor
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.max_entradas:
+            self._itens.popitem(last=False)
+
+
+class AgrupadorLotes:
+    """
+    Junta pedidos compatíveis que chegam em uma janela curta e os processa de uma vez.
+
+    O primeiro pedido de um grupo agenda o processamento para daqui a ``espera`` segundos;
+    os que chegam até lá entram no mesmo lote (que também é processado assim que atinge
+    ``max_lote`` itens). O processamento roda em uma thread, para não travar o laço de
+    eventos enquanto o NumPy trabalha.
+
+    :param processar: função (grupo, itens) -> lista de resultados, um por item
+    """
+
+    def __init__(self, processar, espera=0.002, max_lote=1024):
+        self.processar = processar
+        self.espera = espera
+        self.max_lote = max_lote
+        self.lotes = 0
+        self.itens = 0
+        self._pendentes = {}
+
+    async def enviar(self, grupo, item):
+        laco = asyncio.get_running_loop()
+        futuro = laco.create_future()
+        pendentes = self._pendentes.get(grupo)
+        if pendentes is None:
+            pendentes = self._pendentes[grupo] = []
+            laco.call_later(self.espera, self._disparar, grupo, pendentes)
+        pendentes.append((item, futuro))
+        if len(pendentes) >= self.max_lote:
+            self._disparar(grupo, pendentes)
+        return await futuro
+
+    def _disparar(self, grupo, pendentes):
+        # O temporizador pode disparar depois que o lote já saiu por tamanho
+        if self._pendentes.get(grupo) is not pendentes:
+            return
+        del self._pendentes[grupo]
+        asyncio.ensure_future(self._executar(grupo, pendentes))
+
+    async def _executar(self, grupo, pendentes):
+        self.lotes += 1
+        self.itens += len(pendentes)
+        contar("servico_lotes")
+        contar("servico_pedidos_em_lote", len(pendentes))
+        itens = [item for item, _ in pendentes]
+        try:
+            resultados = await asyncio.get_running_loop().run_in_executor(None, self.processar, grupo, itens)
+        except Exception as erro:
+            for _, futuro in pendentes:
+                if not futuro.done():
+                    futuro.set_exception(erro)
+            return
+        for (_, futuro), resultado in zip(pendentes, resultados):
+            if not futuro.done():
+                futuro.set_result(resultado)
+
+
+class ServicoPrevisao:
+    """
+    Lógica das rotas ``/fit`` e ``/forecast``, independente do transporte HTTP.
+
+    :param espera: janela (segundos) para juntar pedidos em um lote
+    :param max_lote: tamanho máximo de um lote
+    :param max_estados: quantos estados ajustados ficam no cache
+    """
+
+    def __init__(self, espera=0.002, max_lote=1024, max_estados=100000):
+        self.estados = CacheLRU(max_estados)
+        self.agrupador = AgrupadorLotes(self._processar_lote, espera, max_lote)
+        self.acertos_cache = 0
+
+    @staticmethod
+    def _processar_lote(grupo, itens):
+        operacao, L, _, phi, sazonalidade, metrica = grupo
+        dados = np.array([serie for serie, _ in itens], dtype=np.float64)
+        if operacao == "ajustar":
+            parametros = ajustar_parametros(dados, L, metrica=metrica, phi=phi, sazonalidade=sazonalidade)
+            alpha, beta, gamma = parametros.alpha, parametros.beta, parametros.gamma
+        else:
+            alpha, beta, gamma = np.array([fixos for _, fixos in itens], dtype=np.float64).T
+        with etapa("servico_estados", itens=dados.size):
+            return estados_finais_lote(dados, L, alpha, beta, gamma, phi, sazonalidade)
+
+    async def obter_estado(self, corpo):
+        """
+        Estado da série do pedido: do cache, ou calculado em lote com outros pedidos.
+        """
+        L = int(corpo.get("L", 12))
+        if L < 2:
+            raise ValueError("O período sazonal L deve ser pelo menos 2.")
+        phi = float(corpo.get("phi", 1.0))
+        if not 0 < phi <= 1:
+            raise ValueError("O amortecimento phi deve estar em (0, 1].")
+        sazonalidade = corpo.get("sazonalidade", "multiplicativa")
+        aditivo = como_indicador_aditivo(sazonalidade)
+        serie = _validar_serie(corpo.get("serie"), L, positiva=not aditivo)
+        metrica = corpo.get("metrica", "sse")
+
+        if all(corpo.get(nome) is not None for nome in ("alpha", "beta", "gamma")):
+            fixos = tuple(float(corpo[nome]) for nome in ("alpha", "beta", "gamma"))
+            if not all(0 < valor < 1 for valor in fixos):
+                raise ValueError("alpha, beta e gamma devem estar em (0, 1).")
+            operacao = "fixos"
+        else:
+            operacao, fixos = "ajustar", None
+
+        chave = chave_serie(serie, operacao=operacao, L=L, phi=phi, sazonalidade=sazonalidade,
+                            metrica=metrica if fixos is None else None, parametros=fixos)
+        estado = self.estados.obter(chave)
+        if estado is not None:
+            self.acertos_cache += 1
+            contar("servico_cache_acertos")
+            return estado
+
+        # A série já foi validada aqui: um pedido malformado não pode derrubar o lote dos outros
+        grupo = (operacao, L, len(serie), phi, sazonalidade, metrica)
+        estado = await self.agrupador.enviar(grupo, (serie, fixos))
+        _exigir_finito([estado.alpha, estado.beta, estado.gamma, estado.nivel, estado.tendencia]
+                       + list(estado.fatores_sazonais.em_ordem()))
+        self.estados.guardar(chave, estado)
+        return estado
+
+    async def ajustar(self, corpo):
+        estado = await self.obter_estado(corpo)
+        return {"alpha": estado.alpha, "beta": estado.beta, "gamma": estado.gamma, "estado": estado.para_dict()}
+
+    async def prever(self, corpo):
+        h = int(corpo.get("h", 12))
+        if h < 1:
+            raise ValueError("O horizonte h deve ser pelo menos 1.")
+        if "estado" in corpo:
+            if not isinstance(corpo["estado"], dict):
+                raise ValueError("O campo 'estado' deve ser um objeto (o estado devolvido por /fit).")
+            estado = EstadoHoltWinters.de_dict(corpo["estado"])
+        else:
+            estado = await self.obter_estado(corpo)
+        previsao = estado.prever(h)
+        _exigir_finito(previsao)
+        return {"previsao": previsao, "alpha": estado.alpha, "beta": estado.beta, "gamma": estado.gamma}
+
+    def estatisticas(self):
+        return {"lotes": self.agrupador.lotes, "pedidos_em_lote": self.agrupador.itens,
+                "acertos_cache": self.acertos_cache, "estados_em_cache": len(self.estados)}
+
+
+def _validar_serie(serie, L, positiva=False):
+    # Lista de números (null vira valor ausente), sem infinitos, com pelo menos dois ciclos;
+    # a variante multiplicativa divide pelos valores, então eles precisam ser positivos
+    if not isinstance(serie, list) or not serie:
+        raise ValueError("O campo 'serie' deve ser uma lista de números.")
+    if not all(valor is None or (isinstance(valor, (int, float)) and not isinstance(valor, bool)) for valor in serie):
+        raise ValueError("O campo 'serie' deve ser uma lista de números (use null para valores ausentes).")
+    valores = np.array([np.nan if valor is None else valor for valor in serie], dtype=np.float64)
+    if np.isinf(valores).any():
+        raise ValueError("A série não pode ter valores infinitos.")
+    if len(valores) < 2 * L:
+        raise ValueError("A série precisa ter pelo menos dois ciclos sazonais completos (2L valores).")
+    if positiva and (valores <= 0).any():
+        raise ValueError("Na sazonalidade multiplicativa os valores da série devem ser positivos.")
+    return valores
+
+
+def _exigir_finito(valores):
+    # Um ajuste que diverge não vira resposta: NaN e infinito não existem em JSON
+    if not np.isfinite(np.asarray(valores, dtype=np.float64)).all():
+        raise ValueError("O modelo divergiu para esta série (estado ou previsão não finitos).")
+
+
+async def _responder(escritor, status, corpo, manter_conexao, tipo="application/json"):
+    dados = corpo.encode() if isinstance(corpo, str) else json.dumps(corpo, ensure_ascii=False, allow_nan=False).encode()
+    cabecalho = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                 f"Content-Type: {tipo}; charset=utf-8\r\n"
+                 f"Content-Length: {len(dados)}\r\n"
+                 f"Connection: {'keep-alive' if manter_conexao else 'close'}\r\n\r\n")
+    escritor.write(cabecalho.encode() + dados)
+    await escritor.drain()
+
+
+async def _tratar_conexao(servico, leitor, escritor):
+    rotas = {("POST", "/forecast"): servico.prever, ("POST", "/fit"): servico.ajustar}
+    try:
+        while True:
+            try:
+                cabecalho = await leitor.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+            linhas = cabecalho.decode("latin-1").split("\r\n")
+            campos = {}
+            for linha in linhas[1:]:
+                if ":" in linha:
+                    nome, valor = linha.split(":", 1)
+                    campos[nome.strip().lower()] = valor.strip()
+            try:
+                metodo, caminho, versao = linhas[0].split(" ", 2)
+                tamanho = int(campos.get("content-length", 0))
+                if tamanho < 0:
+                    raise ValueError
+            except ValueError:
+                # Sem uma linha de pedido ou um tamanho válidos não dá para achar o próximo pedido
+                await _responder(escritor, HTTPStatus.BAD_REQUEST, {"erro": "Pedido HTTP malformado."}, False)
+                return
+            try:
+                corpo = await leitor.readexactly(tamanho)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+            manter_conexao = campos.get("connection", "").lower() != "close" and versao == "HTTP/1.1"
+
+            if (metodo, caminho) == ("GET", "/estatisticas"):
+                await _responder(escritor, HTTPStatus.OK, servico.estatisticas(), manter_conexao)
+            elif (metodo, caminho) == ("GET", "/metrics"):
+                await _responder(escritor, HTTPStatus.OK, INSTRUMENTACAO.para_prometheus(), manter_conexao,
+                                 "text/plain; version=0.0.4")
+            elif (metodo, caminho) not in rotas:
+                status = HTTPStatus.METHOD_NOT_ALLOWED if caminho in ("/forecast", "/fit") else HTTPStatus.NOT_FOUND
+                await _responder(escritor, status, {"erro": status.phrase}, manter_conexao)
+            else:
+                try:
+                    pedido = json.loads(corpo or b"{}")
+                    if not isinstance(pedido, dict):
+                        raise TypeError("O corpo do pedido deve ser um objeto JSON.")
+                    resposta = await rotas[metodo, caminho](pedido)
+                    await _responder(escritor, HTTPStatus.OK, resposta, manter_conexao)
+                except (ValueError, TypeError, KeyError, ArithmeticError) as erro:
+                    await _responder(escritor, HTTPStatus.BAD_REQUEST, {"erro": str(erro)}, manter_conexao)
+            if not manter_conexao:
+                return
+    finally:
+        escritor.close()
+
+
+async def iniciar_servidor(host="127.0.0.1", porta=8080, **opcoes):
+    """
+    Inicia o servidor no laço de eventos atual.
+
+    :param opcoes: repassadas para ``ServicoPrevisao``
+    :return: tupla (asyncio.Server, ServicoPrevisao)
+    """
+    servico = ServicoPrevisao(**opcoes)
+    servidor = await asyncio.start_server(lambda leitor, escritor: _tratar_conexao(servico, leitor, escritor),
+                                          host, porta)
+    return servidor, servico
+
+
+async def _executar(host, porta, **opcoes):
+    servidor, _ = await iniciar_servidor(host, porta, **opcoes)
+    async with servidor:
+        await servidor.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serviço HTTP de previsão com Holt-Winters.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8080)
+    parser.add_argument("--espera-ms", type=float, default=2.0, help="janela para juntar pedidos em um lote")
+    parser.add_argument("--max-lote", type=int, default=1024)
+    parser.add_argument("--instrumentacao", action="store_true", help="mede as etapas (exposto em GET /metrics)")
+    args = parser.parse_args()
+    if args.instrumentacao:
+        ativar()
+    print(f"Servindo em http://{args.host}:{args.porta}")
+    asyncio.run(_executar(args.host, args.porta, espera=args.espera_ms / 1000, max_lote=args.max_lote))
@@ -0,0 +1,55 @@
+"""
+Limites e remoção LRU do cache em disco (cache.py).
+"""
+import sqlite3
+
+import numpy as np
+
+from cache import CachePrevisao
+
+
+def _chaves(cache):
+    return [chave for (chave,) in cache._conexao.execute("SELECT chave FROM entradas ORDER BY ultimo_acesso, rowid")]
+
+
+def test_remove_as_entradas_usadas_ha_mais_tempo(tmp_path):
+    # Cada entrada tem 800 bytes (100 float64); cabem 10
+    with CachePrevisao(str(tmp_path / "cache.sqlite"), tamanho_maximo=8000) as cache:
+        for i in range(30):
+            cache.guardar(f"k{i}", np.arange(100.0))
+        assert _chaves(cache) == [f"k{i}" for i in range(20, 30)]
+        assert (len(cache), cache.tamanho()) == (10, 8000)
+
+        cache.obter("k20")
+        cache.guardar("k30", np.arange(100.0))
+        assert "k21" not in cache and "k20" in cache and len(cache) == 10
+
+
+def test_substituir_e_limite_de_entradas(tmp_path):
+    with CachePrevisao(str(tmp_path / "cache.sqlite"), max_entradas=3) as cache:
+        for i in range(5):
+            cache.guardar(f"k{i}", np.arange(10.0))
+        cache.guardar("k4", np.arange(50.0))
+        assert _chaves(cache) == ["k2", "k3", "k4"]
+        # Os totais mantidos pelos gatilhos batem com o conteúdo da tabela
+        assert (len(cache), cache.tamanho()) == (3, 2 * 80 + 400)
+        assert cache._conexao.execute("SELECT COUNT(*), SUM(tamanho) FROM entradas").fetchone() == (3, 560)
+        np.testing.assert_array_equal(cache.obter("k4")[0], np.arange(50.0))
+
+        cache.limpar()
+        assert (len(cache), cache.tamanho()) == (0, 0)
+
+
+def test_arquivo_sem_tabela_de_totais(tmp_path):
+    caminho = str(tmp_path / "antigo.sqlite")
+    conexao = sqlite3.connect(caminho)
+    conexao.execute("CREATE TABLE entradas (chave TEXT PRIMARY KEY, comprimentos TEXT NOT NULL,"
+                    " valores BLOB NOT NULL, tamanho INTEGER NOT NULL, ultimo_acesso INTEGER NOT NULL)")
+    conexao.execute("INSERT INTO entradas VALUES ('x', '[1]', ?, 8, 1)", (np.ones(1).tobytes(),))
+    conexao.commit()
+    conexao.close()
+
+    with CachePrevisao(caminho) as cache:
+        assert (len(cache), cache.tamanho()) == (1, 8)
+        cache.guardar("y", np.ones(2))
+        assert (len(cache), cache.tamanho()) == (2, 24)
@@ -0,0 +1,67 @@
+"""
+Paridade entre o núcleo compilado (nucleo_jit) e as versões vetorizadas com NumPy.
+
+Compara previsões, valores ajustados e o erro de 1 passo (SSE e MAPE) de
+``holt_winters_lote`` e ``erro_um_passo_lote`` com e sem o núcleo, nas variantes
+multiplicativa e aditiva, com e sem amortecimento da tendência, e também com valores
+ausentes e picos, sem e com o limite de Huber.
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("numba")
+
+from dados_regionais import carregar_consumo_regional
+from holt_winters_lote import SAZONALIDADES, holt_winters_lote
+from otimizacao import erro_um_passo_lote
+
+
+L = 12
+H = 12
+ALPHA, BETA, GAMMA = 0.3, 0.1, 0.2
+TOLERANCIA = 1e-9
+
+# Trios (alpha, beta, gamma) avaliados de uma vez no erro de 1 passo
+TRIOS = np.array([[ALPHA, BETA, GAMMA], [0.05, 0.05, 0.05], [0.9, 0.5, 0.7]])
+
+
+def _conjuntos():
+    dados = np.array(list(carregar_consumo_regional().values()), dtype=np.float64)
+    com_falhas = dados.copy()
+    com_falhas[:, L + 1::7] = np.nan
+    com_falhas[:, L + 3::11] *= 3
+    return {"completos": dados, "com_ausentes": com_falhas}
+
+
+CONJUNTOS = _conjuntos()
+
+VARIANTES = [
+    pytest.param(conjunto, limite_huber, sazonalidade, phi,
+                 id=f"{conjunto}-{'huber' if limite_huber else 'sem_huber'}-{sazonalidade}-phi{phi}")
+    for conjunto, limite_huber in (("completos", None), ("com_ausentes", None), ("com_ausentes", 2.5))
+    for sazonalidade in SAZONALIDADES
+    for phi in (1.0, 0.9)
+]
+
+
+@pytest.mark.parametrize("conjunto, limite_huber, sazonalidade, phi", VARIANTES)
+def test_previsao_e_ajustados_iguais_ao_numpy(conjunto, limite_huber, sazonalidade, phi):
+    dados = CONJUNTOS[conjunto]
+    opcoes = dict(phi=phi, sazonalidade=sazonalidade, limite_huber=limite_huber)
+    previsao_ref, ajustados_ref = holt_winters_lote(dados, L, ALPHA, BETA, GAMMA, H, usar_jit=False, **opcoes)
+    previsao, ajustados = holt_winters_lote(dados, L, ALPHA, BETA, GAMMA, H, usar_jit=True, **opcoes)
+
+    np.testing.assert_allclose(previsao, previsao_ref, rtol=TOLERANCIA)
+    np.testing.assert_allclose(ajustados, ajustados_ref, rtol=TOLERANCIA)
+
+
+@pytest.mark.parametrize("metrica", ["sse", "mape"])
+@pytest.mark.parametrize("conjunto, limite_huber, sazonalidade, phi", VARIANTES)
+def test_erro_um_passo_igual_ao_numpy(conjunto, limite_huber, sazonalidade, phi, metrica):
+    dados = CONJUNTOS[conjunto]
+    opcoes = dict(phi=phi, aditivo=sazonalidade == "aditiva", limite_huber=limite_huber)
+    erro_ref = erro_um_passo_lote(dados, L, TRIOS[:, 0], TRIOS[:, 1], TRIOS[:, 2], metrica, usar_jit=False, **opcoes)
+    erro = erro_um_passo_lote(dados, L, TRIOS[:, 0], TRIOS[:, 1], TRIOS[:, 2], metrica, usar_jit=True, **opcoes)
+
+    assert np.isfinite(erro).all()
+    np.testing.assert_allclose(erro, erro_ref, rtol=TOLERANCIA)
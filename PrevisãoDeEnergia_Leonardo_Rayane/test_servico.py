@@ -0,0 +1,152 @@
+"""
+Testes de ida e volta do serviço HTTP (servico.py) em localhost.
+"""
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from dados_regionais import carregar_consumo_regional
+from holt_winters_lote import holt_winters_lote
+from servico import iniciar_servidor
+
+
+NORTE = [float(valor) for valor in carregar_consumo_regional()["Norte"]]
+
+
+async def _pedir(porta, metodo, caminho, corpo=None, bruto=None):
+    # Um pedido por conexão; devolve (status, corpo JSON decodificado)
+    leitor, escritor = await asyncio.open_connection("127.0.0.1", porta)
+    if bruto is None:
+        dados = b"" if corpo is None else (corpo if isinstance(corpo, bytes) else json.dumps(corpo).encode())
+        bruto = (f"{metodo} {caminho} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(dados)}\r\n"
+                 "Connection: close\r\n\r\n").encode() + dados
+    escritor.write(bruto)
+    await escritor.drain()
+    resposta = await asyncio.wait_for(leitor.read(), timeout=30)
+    escritor.close()
+    cabecalho, _, conteudo = resposta.partition(b"\r\n\r\n")
+    status = int(cabecalho.split(b" ", 2)[1])
+    # Toda resposta tem que ser JSON válido (sem NaN/Infinity)
+    return status, json.loads(conteudo, parse_constant=lambda nome: pytest.fail(f"JSON com {nome}"))
+
+
+def _com_servidor(cenario):
+    async def executar():
+        servidor, servico = await iniciar_servidor("127.0.0.1", 0)
+        porta = servidor.sockets[0].getsockname()[1]
+        try:
+            return await cenario(porta, servico)
+        finally:
+            servidor.close()
+            await servidor.wait_closed()
+    return asyncio.run(executar())
+
+
+def test_forecast_com_parametros_fixos_igual_ao_motor():
+    async def cenario(porta, _):
+        return await _pedir(porta, "POST", "/forecast",
+                            {"serie": NORTE, "alpha": 0.3, "beta": 0.1, "gamma": 0.2, "h": 12})
+
+    status, resposta = _com_servidor(cenario)
+    esperado, _ = holt_winters_lote(NORTE, 12, 0.3, 0.1, 0.2, 12)
+    assert status == 200
+    np.testing.assert_allclose(resposta["previsao"], esperado, rtol=1e-9)
+
+
+def test_fit_e_forecast_a_partir_do_estado():
+    async def cenario(porta, servico):
+        ajuste = await _pedir(porta, "POST", "/fit", {"serie": NORTE})
+        pela_serie = await _pedir(porta, "POST", "/forecast", {"serie": NORTE, "h": 6})
+        pelo_estado = await _pedir(porta, "POST", "/forecast", {"estado": ajuste[1]["estado"], "h": 6})
+        return ajuste, pela_serie, pelo_estado, servico.estatisticas()
+
+    (status_ajuste, ajuste), pela_serie, pelo_estado, estatisticas = _com_servidor(cenario)
+    assert status_ajuste == 200
+    assert all(0 < ajuste[nome] < 1 for nome in ("alpha", "beta", "gamma"))
+    assert pela_serie[0] == pelo_estado[0] == 200
+    assert pela_serie[1]["previsao"] == pelo_estado[1]["previsao"]
+    # O segundo pedido com a mesma série sai do cache de estados
+    assert estatisticas["acertos_cache"] == 1
+
+
+def test_pedidos_simultaneos_viram_um_lote():
+    async def cenario(porta, servico):
+        pedidos = [_pedir(porta, "POST", "/forecast", {"serie": [v * (1 + k / 100) for v in NORTE],
+                                                       "alpha": 0.3, "beta": 0.1, "gamma": 0.2})
+                   for k in range(20)]
+        return await asyncio.gather(*pedidos), servico.estatisticas()
+
+    respostas, estatisticas = _com_servidor(cenario)
+    assert [status for status, _ in respostas] == [200] * 20
+    assert estatisticas["pedidos_em_lote"] == 20
+    assert estatisticas["lotes"] < 20
+
+
+@pytest.mark.parametrize("corpo", [
+    b"[1, 2]",
+    b'"x"',
+    b"42",
+    b"null",
+    b"{nao e json",
+    {"serie": [[1, 2], [3, 4]]},
+    {"serie": NORTE[:20]},
+    {"serie": NORTE[:-1] + ["x"]},
+    {"serie": [0.0] * 36},
+    {"serie": NORTE, "phi": 1.5},
+    {"serie": NORTE, "phi": 0},
+    {"serie": NORTE, "alpha": 1.2, "beta": 0.1, "gamma": 0.2},
+    {"serie": NORTE, "sazonalidade": "cubica"},
+    {"serie": NORTE, "h": 1e999},
+    {"estado": [1, 2]},
+    {"estado": {"L": 0, "alpha": 0.3, "beta": 0.1, "gamma": 0.2, "nivel": 1.0, "tendencia": 0.0,
+                "fatores_sazonais": []}},
+])
+def test_forecast_malformado_recebe_400(corpo):
+    async def cenario(porta, _):
+        return await _pedir(porta, "POST", "/forecast", corpo)
+
+    status, resposta = _com_servidor(cenario)
+    assert status == 400
+    assert "erro" in resposta
+
+
+@pytest.mark.parametrize("corpo", [b"[1, 2]", b'"x"', {"serie": "abc"}])
+def test_fit_malformado_recebe_400(corpo):
+    async def cenario(porta, _):
+        return await _pedir(porta, "POST", "/fit", corpo)
+
+    assert _com_servidor(cenario)[0] == 400
+
+
+def test_previsao_divergente_nao_gera_nan():
+    # Estado que estoura em float: a previsão não é finita e o pedido recebe 400, não "NaN"
+    estado = {"L": 2, "alpha": 0.3, "beta": 0.1, "gamma": 0.2, "nivel": 1e308, "tendencia": 1e308,
+              "fatores_sazonais": [10.0, 10.0]}
+
+    async def cenario(porta, _):
+        return await _pedir(porta, "POST", "/forecast", {"estado": estado, "h": 3})
+
+    assert _com_servidor(cenario)[0] == 400
+
+
+def test_pedido_http_malformado_recebe_400_e_nao_afeta_os_validos():
+    async def cenario(porta, _):
+        return await asyncio.gather(
+            _pedir(porta, None, None, bruto=b"LIXO\r\n\r\n"),
+            _pedir(porta, None, None, bruto=b"POST /forecast HTTP/1.1\r\nContent-Length: abc\r\n\r\n"),
+            _pedir(porta, "POST", "/forecast", {"serie": NORTE, "alpha": 0.3, "beta": 0.1, "gamma": 0.2}),
+        )
+
+    (status_lixo, _), (status_tamanho, _), (status_valido, _) = _com_servidor(cenario)
+    assert (status_lixo, status_tamanho, status_valido) == (400, 400, 200)
+
+
+def test_rotas_desconhecidas():
+    async def cenario(porta, _):
+        return (await _pedir(porta, "GET", "/forecast"), await _pedir(porta, "POST", "/outra", {}),
+                await _pedir(porta, "GET", "/estatisticas"))
+
+    (nao_permitido, _), (nao_encontrado, _), (estatisticas, _) = _com_servidor(cenario)
+    assert (nao_permitido, nao_encontrado, estatisticas) == (405, 404, 200)
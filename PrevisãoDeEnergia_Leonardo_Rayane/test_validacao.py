@@ -0,0 +1,45 @@
+"""
+Backtest e métricas com valores reais ausentes.
+"""
+import numpy as np
+
+from dados_regionais import carregar_consumo_regional
+from metricas import METRICAS, calcular_metricas
+from validacao import backtest
+
+
+DADOS = np.array(list(carregar_consumo_regional().values()), dtype=np.float64)
+
+
+def test_metricas_ignoram_reais_ausentes():
+    previsto = DADOS[:, -12:] * 1.05
+    real = DADOS[:, -12:].copy()
+    real[0, [2, 7]] = np.nan
+
+    metricas = calcular_metricas(previsto, real, historico=DADOS[:, :-12], L=12)
+    sem_ausentes = calcular_metricas(np.delete(previsto[0], [2, 7]), np.delete(real[0], [2, 7]),
+                                     historico=DADOS[0, :-12], L=12)
+
+    for nome in METRICAS:
+        assert np.isfinite(metricas[nome]).all(), nome
+        np.testing.assert_allclose(metricas[nome][0], sem_ausentes[nome], rtol=1e-12)
+
+
+def test_backtest_com_reais_ausentes():
+    completo = backtest(DADOS, 12, 6, 0.3, 0.1, 0.2)
+    dados = DADOS.copy()
+    dados[0, 27] = np.nan
+    resultado = backtest(dados, 12, 6, 0.3, 0.1, 0.2)
+
+    tabela = resultado.tabela
+    assert not tabela[list(METRICAS)].isna().any().any()
+    # As séries sem ausentes não mudam
+    outras = tabela.serie != 0
+    np.testing.assert_allclose(tabela.loc[outras, list(METRICAS)], completo.tabela.loc[outras, list(METRICAS)])
+
+    # Na origem 24 o mês 27 cai na janela e fica fora do MAE
+    k = list(resultado.origens).index(24)
+    reais = dados[0, 24:30]
+    presentes = ~np.isnan(reais)
+    mae = np.abs(resultado.previsoes[0, k][presentes] - reais[presentes]).mean()
+    assert tabela[(tabela.serie == 0) & (tabela.origem == 24)].mae.item() == mae
@@ -0,0 +1,137 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from holt_winters_lote import atualizar_lote, inicializar_lote, prever_lote
+from metricas import METRICAS, calcular_metricas
+from otimizacao import ajustar_parametros
+
+
+# tabela: uma linha por (série, origem) com as métricas da previsão feita naquela origem
+# previsoes: matriz (séries x origens x h); origens: índice do primeiro mês previsto em cada origem
+ResultadoBacktest = namedtuple("ResultadoBacktest", ["tabela", "previsoes", "origens"])
+
+
+def _backtest_bloco(tarefa):
+    """
+    Percorre as origens de um bloco de séries em uma única passada pelo tempo.
+
+    O estado da recursão na origem o é exatamente o que ``holt_winters_multiplicativo``
+    obteria com os dados até o - 1; para passar à origem seguinte basta avançar o estado
+    pelos meses entre as duas origens, em vez de reajustar desde o início.
+    """
+    bloco, L, h, origens, parametros, metrica = tarefa
+    n_series = bloco.shape[0]
+
+    if parametros is None:
+        # Ajuste apenas com os dados anteriores à primeira origem (sem olhar o futuro)
+        ajuste = ajustar_parametros(bloco[:, :origens[0]], L, metrica=metrica)
+        alpha, beta, gamma = ajuste.alpha, ajuste.beta, ajuste.gamma
+    else:
+        alpha, beta, gamma = parametros
+
+    nivel, tendencia, fatores_sazonais = inicializar_lote(bloco, L)
+    previsoes = np.empty((n_series, len(origens), h))
+
+    t = L
+    for k, origem in enumerate(origens):
+        while t < origem:
+            nivel, tendencia, _ = atualizar_lote(nivel, tendencia, fatores_sazonais, t % L, bloco[:, t], alpha, beta, gamma)
+            t += 1
+        previsoes[:, k] = prever_lote(nivel, tendencia, fatores_sazonais, h, posicao=origem % L)
+
+    return previsoes
+
+
+def backtest(series, L, h, alpha=None, beta=None, gamma=None, origem_inicial=None, passo_origem=1,
+             metrica="sse", ids=None, max_workers=1, tamanho_bloco=None):
+    """
+    Validação com origem móvel: a origem da previsão avança mês a mês pelo histórico.
+
+    Em cada origem o modelo prevê os próximos h meses usando só os dados anteriores a ela,
+    e a previsão é comparada com o que de fato aconteceu. O estado é reaproveitado de uma
+    origem para a seguinte, então cada série é percorrida uma única vez, e as séries são
+    processadas juntas pelo motor vetorizado (opcionalmente em vários processos).
+
+    Meses ausentes (NaN) são atravessados pela previsão de 1 passo e, quando caem na janela
+    avaliada, ficam fora das métricas daquela origem.
+
+    :param series: matriz (séries x tempo), todas com o mesmo comprimento
+    :param L: comprimento do período sazonal
+    :param h: horizonte de previsão avaliado em cada origem
+    :param alpha: se alpha, beta e gamma forem None, os parâmetros de cada série são ajustados
+        com os dados anteriores à primeira origem; caso contrário são usados como estão
+    :param beta: ver alpha
+    :param gamma: ver alpha
+    :param origem_inicial: primeiro mês previsto na primeira origem; por padrão 2L. Deve ser
+        pelo menos 2L, para que a inicialização use apenas dados anteriores à origem
+    :param passo_origem: quantos meses a origem avança de cada vez
+    :param metrica: métrica usada no ajuste ("sse" ou "mape")
+    :param ids: identificadores das séries para a tabela; por padrão 0..séries-1
+    :param max_workers: número de processos; 1 executa tudo no processo atual
+    :param tamanho_bloco: séries por tarefa quando há mais de um processo
+    :return: ResultadoBacktest com a tabela de erros (pandas.DataFrame), as previsões e as origens
+    """
+    import pandas as pd
+
+    dados = np.asarray(series, dtype=np.float64)
+    if dados.ndim == 1:
+        dados = dados[np.newaxis, :]
+    n_series, n = dados.shape
+
+    if origem_inicial is None:
+        origem_inicial = 2 * L
+    if origem_inicial < 2 * L:
+        raise ValueError("A primeira origem precisa ter pelo menos dois ciclos (2L) de histórico.")
+    origens = np.arange(origem_inicial, n - h + 1, passo_origem)
+    if len(origens) == 0:
+        raise ValueError("A série é curta demais para o horizonte e a origem inicial pedidos.")
+
+    parametros = None
+    if alpha is not None:
+        parametros = tuple(
+            np.broadcast_to(np.asarray(p, dtype=np.float64), (n_series,)) for p in (alpha, beta, gamma)
+        )
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if tamanho_bloco is None:
+        tamanho_bloco = max(-(-n_series // (4 * max_workers)), 64)
+
+    tarefas = []
+    for inicio in range(0, n_series, tamanho_bloco):
+        fatia = slice(inicio, inicio + tamanho_bloco)
+        parametros_bloco = None if parametros is None else tuple(p[fatia] for p in parametros)
+        tarefas.append((dados[fatia], L, h, origens, parametros_bloco, metrica))
+
+    if max_workers == 1 or len(tarefas) == 1:
+        previsoes = np.concatenate(list(map(_backtest_bloco, tarefas)))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            previsoes = np.concatenate(list(executor.map(_backtest_bloco, tarefas)))
+
+    # Valores reais de cada origem: janelas deslizantes de tamanho h (visão, sem cópia)
+    reais = sliding_window_view(dados, h, axis=1)[:, origens]
+
+    # Escala do MASE com o histórico disponível em cada origem, por soma acumulada; pares com
+    # valor ausente não entram na soma nem na contagem
+    erro_ingenuo = np.abs(dados[:, L:] - dados[:, :-L])
+    presentes = ~np.isnan(erro_ingenuo)
+    soma = np.where(presentes, erro_ingenuo, 0.0).cumsum(axis=1)
+    contagem = presentes.cumsum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        escala = soma[:, origens - L - 1] / contagem[:, origens - L - 1]
+
+    metricas = calcular_metricas(previsoes, reais, eixo=-1, escala=escala)
+
+    if ids is None:
+        ids = np.arange(n_series)
+    tabela = pd.DataFrame({
+        "serie": np.repeat(np.asarray(ids, dtype=object), len(origens)),
+        "origem": np.tile(origens, n_series),
+        **{nome: metricas[nome].ravel() for nome in METRICAS},
+    })
+    return ResultadoBacktest(tabela, previsoes, origens)